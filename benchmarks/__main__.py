@@ -0,0 +1,60 @@
+"""
+Benchmark suite command line.
+
+    python -m benchmarks list [--quick]
+    python -m benchmarks run [--quick] [--repeat N] [--warmup N] [-k FILTER] [-o report.json]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.1]
+
+compare exits with status 1 when a regression is found, so it can gate CI.
+The single-purpose scripts (python -m benchmarks.bench_*) are still available.
+"""
+import argparse
+import sys
+
+from .compare import compare, format_comparisons
+from .runner import case_id, read_report, run_suite, suite, write_report
+
+
+def _selected(args):
+    return [case for case in suite(args.quick) if not args.filter or args.filter in case_id(case)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="DSL_Labs benchmark suite")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_command = commands.add_parser('list', help="list the benchmark cases")
+    run_command = commands.add_parser('run', help="run the benchmark cases")
+    for command in (list_command, run_command):
+        command.add_argument('--quick', action='store_true', help="small sizes only")
+        command.add_argument('-k', '--filter', help="only cases whose id contains this text")
+    run_command.add_argument('--repeat', type=int, default=5, help="timed runs per case (default 5)")
+    run_command.add_argument('--warmup', type=int, default=1, help="untimed runs per case (default 1)")
+    run_command.add_argument('-o', '--output', help="write the JSON report to this file")
+
+    compare_command = commands.add_parser('compare', help="compare a report against a baseline")
+    compare_command.add_argument('baseline')
+    compare_command.add_argument('current')
+    compare_command.add_argument('--threshold', type=float, default=0.10,
+                                 help="relative slowdown counted as a regression (default 0.10)")
+    compare_command.add_argument('--memory-threshold', type=float,
+                                 help="relative peak memory growth counted as a regression (default: --threshold)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'list':
+        for case in _selected(args):
+            print(case_id(case))
+        return 0
+    if args.command == 'run':
+        report = run_suite(_selected(args), repeat=args.repeat, warmup=args.warmup)
+        if args.output:
+            write_report(report, args.output)
+        return 0
+    comparisons, added, removed = compare(read_report(args.baseline), read_report(args.current),
+                                          args.threshold, args.memory_threshold)
+    print(format_comparisons(comparisons, added, removed))
+    return 1 if any(row.regression for row in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Memory per node and printing time of ASTNode compared with the previous
+dataclass representation (per-instance __dict__, recursive string printer).
+
+Run with: python -m benchmarks.bench_ast
+"""
+import io
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Union
+
+from src.ast import ASTNode, ASTNodeType
+
+
+@dataclass
+class DataclassNode:
+    """The ASTNode implementation before slots and iterative printing."""
+    node_type: ASTNodeType
+    value: Union[str, None] = None
+    children: List['DataclassNode'] = None
+
+    def __post_init__(self):
+        if self.children is None:
+            self.children = []
+
+    def __repr__(self):
+        return self._pretty_print()
+
+    def _pretty_print(self, level=0):
+        indent = "  " * level
+        result = f"{indent}{self.node_type.name}"
+        if self.value is not None:
+            result += f": {self.value}"
+        result += "\n"
+        for child in self.children:
+            result += child._pretty_print(level + 1)
+        return result
+
+
+def build_wide(node_class, n):
+    """A column list with n identifiers."""
+    columns = node_class(ASTNodeType.COLUMN_LIST)
+    for i in range(n):
+        columns.children.append(node_class(ASTNodeType.IDENTIFIER, f"c{i}"))
+    return node_class(ASTNodeType.SELECT_STATEMENT, None, [columns, node_class(ASTNodeType.TABLE, "t")])
+
+
+def build_deep(node_class, depth):
+    """A chain of depth nested conditions."""
+    root = node = node_class(ASTNodeType.CONDITION)
+    for _ in range(depth):
+        child = node_class(ASTNodeType.CONDITION)
+        node.children.append(child)
+        node = child
+    return root
+
+
+def bytes_per_node(node_class, n):
+    tracemalloc.start()
+    tree = build_wide(node_class, n)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+    return size / (n + 3)
+
+
+def print_time(tree):
+    start = time.perf_counter()
+    try:
+        repr(tree)
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+
+def stream_time(tree):
+    start = time.perf_counter()
+    tree.write(io.StringIO())
+    return time.perf_counter() - start
+
+
+def main(n=200_000, depth=5_000):
+    print(f"{'':24}{'dataclass':>14}{'slots':>14}")
+    print(f"{'bytes per node':24}{bytes_per_node(DataclassNode, n):14.1f}{bytes_per_node(ASTNode, n):14.1f}")
+    old, new = build_wide(DataclassNode, n), build_wide(ASTNode, n)
+    print(f"{'repr, wide tree (s)':24}{print_time(old):14.4f}{print_time(new):14.4f}")
+    old, new = build_deep(DataclassNode, depth), build_deep(ASTNode, depth)
+    old_time = print_time(old)
+    print(f"{'repr, deep tree (s)':24}{'RecursionError' if old_time is None else f'{old_time:.4f}':>14}"
+          f"{print_time(new):14.4f}")
+    print(f"{'write(), deep tree (s)':24}{'':14}{stream_time(new):14.4f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,35 @@
+"""
+Scaling of the CNF pipeline (src.ChomskyNormalForm.Grammar.to_cnf) on random
+grammars of 1k to 100k productions. With the indexed worklist steps the time
+per production should stay roughly flat as the grammar grows.
+
+Run with: python -m benchmarks.bench_cnf
+"""
+import sys
+import time
+
+from .workloads import random_cfg
+
+SIZES = (1_000, 10_000, 100_000)
+STEPS = ('eliminate_epsilon', 'eliminate_renaming', 'eliminate_inaccessible', 'eliminate_non_productive')
+
+
+def main(*sizes):
+    print(f"{'productions':>11}  " + ''.join(f"{step[10:]:>15}" for step in STEPS) + f"{'to_cnf':>10}{'µs/prod':>9}")
+    for size in sizes or SIZES:
+        grammar = random_cfg(size)
+        times = []
+        for step in STEPS:
+            start = time.perf_counter()
+            getattr(grammar, step)()
+            times.append(time.perf_counter() - start)
+
+        grammar = random_cfg(size)
+        start = time.perf_counter()
+        grammar.to_cnf()
+        total = time.perf_counter() - start
+        print(f"{size:>11}  " + ''.join(f"{t:>14.3f}s" for t in times) + f"{total:>9.3f}s{total / size * 1e6:>9.1f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""
+CYK recognition and parsing (src.cyk) with the CNF of the lab-5 grammar,
+on inputs of length 100 to 2000. 'a' * n is the worst case: every span is
+derivable in many ways, so the chart is dense.
+
+Run with: python -m benchmarks.bench_cyk
+"""
+import random
+import sys
+import time
+
+from main_lab5 import create_grammar
+
+LENGTHS = (100, 250, 500, 1000, 2000)
+
+
+def main(*lengths):
+    parser = create_grammar().to_cnf().cyk()
+    rng = random.Random(0)
+    print(f"{'length':>6}  {'input':<8} {'member':<6} {'recognize':>10} {'tree':>10}")
+    for n in lengths or LENGTHS:
+        inputs = {
+            'a^n': 'a' * n,
+            'random': ''.join(rng.choice('aaab') for _ in range(n)),
+        }
+        for name, word in inputs.items():
+            start = time.perf_counter()
+            member = parser.recognize(word)
+            recognize_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parser.parse(word)
+            tree_time = time.perf_counter() - start
+            print(f"{n:>6}  {name:<8} {str(member):<6} {recognize_time:>9.3f}s {tree_time:>9.3f}s")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
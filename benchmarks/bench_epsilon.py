@@ -0,0 +1,35 @@
+"""
+ε-elimination cost of the two to_cnf modes on grammars with one long
+nullable right side: S → A1 A2 ... Ak b with every Ai → a | ε.
+mode="classic" expands that production into about 2^k productions,
+mode="bin_first" binarizes it first and stays small.
+
+Run with: python -m benchmarks.bench_epsilon
+"""
+import sys
+import time
+
+from .workloads import long_nullable_cfg
+
+LENGTHS = (4, 8, 12, 16, 18)
+CLASSIC_LIMIT = 18  # 2^k productions: beyond this classic takes minutes
+
+
+def main(*lengths):
+    print(f"{'k':>3}  {'classic':>20}  {'bin_first':>20}")
+    for k in lengths or LENGTHS:
+        row = f"{k:>3}  "
+        for mode in ('classic', 'bin_first'):
+            if mode == 'classic' and k > CLASSIC_LIMIT:
+                row += f"{'skipped':>20}  "
+                continue
+            grammar = long_nullable_cfg(k)
+            start = time.perf_counter()
+            grammar.to_cnf(mode=mode)
+            elapsed = time.perf_counter() - start
+            row += f"{len(grammar.P):>9} rules {elapsed:>6.2f}s  "
+        print(row)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Compiled WHERE predicates (src.predicate) against a naive interpreter that
+walks the condition tree for every row.
+
+Run with: python -m benchmarks.bench_predicate
+"""
+import operator
+import random
+import sys
+import time
+
+from src.ast import ASTNodeType, literal_value
+from src.parser import sql_parser
+from src.predicate import filter_rows
+
+OPERATORS = {
+    '=': operator.eq, '!=': operator.ne, '<>': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+}
+
+
+def interpret(node, row, columns):
+    """Evaluate a condition tree for one row by walking it."""
+    node_type = node.node_type
+    if node_type in (ASTNodeType.SELECT_STATEMENT, ASTNodeType.WHERE_CLAUSE, ASTNodeType.CONDITION):
+        return interpret(node.children[-1], row, columns)
+    if node_type == ASTNodeType.IDENTIFIER:
+        return row[columns.index(node.value)]
+    if node_type == ASTNodeType.LITERAL:
+        return literal_value(node.value)
+    return OPERATORS[node.value](interpret(node.children[0], row, columns),
+                                 interpret(node.children[1], row, columns))
+
+
+def naive_filter_rows(ast, rows, columns):
+    for row in rows:
+        if interpret(ast, row, columns):
+            yield row
+
+
+def main(n=1_000_000):
+    rng = random.Random(0)
+    columns = ['id', 'price', 'name']
+    rows = [(i, rng.randint(0, 1000), f"item{i % 97}") for i in range(n)]
+    ast = sql_parser("SELECT id FROM items WHERE price >= 900")
+
+    start = time.perf_counter()
+    naive = sum(1 for _ in naive_filter_rows(ast, rows, columns))
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = sum(1 for _ in filter_rows(ast, rows, columns))
+    compiled_time = time.perf_counter() - start
+
+    assert naive == compiled
+    print(f"{n} rows, {compiled} matches")
+    print(f"tree-walking interpreter: {naive_time:.3f} s ({n / naive_time:,.0f} rows/s)")
+    print(f"compiled predicate:       {compiled_time:.3f} s ({n / compiled_time:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
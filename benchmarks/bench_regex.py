@@ -0,0 +1,42 @@
+"""
+String generation from the lab-4 patterns (src.regex): one string per call
+with step tracing, one per call without, and whole batches with generate_many.
+
+Run with: python -m benchmarks.bench_regex
+"""
+import random
+import sys
+import time
+
+from src.regex import compile_pattern, generate_from_regex, generate_many, patterns
+
+
+def main(n=1_000_000):
+    for pattern in patterns:
+        compiled = compile_pattern(pattern)
+        calls = n // 10
+
+        start = time.perf_counter()
+        for _ in range(calls):
+            generate_from_regex(pattern, trace=True)
+        traced_time = time.perf_counter() - start
+
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(calls):
+            compiled.generate(rng)
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        strings = generate_many(pattern, n, seed=0)
+        batch_time = time.perf_counter() - start
+
+        assert all(compiled.match_many(strings[:10_000]))
+        print(f"{pattern}")
+        print(f"  generate_from_regex, traced: {calls / traced_time:12,.0f} strings/s")
+        print(f"  CompiledPattern.generate:    {calls / single_time:12,.0f} strings/s")
+        print(f"  generate_many:               {n / batch_time:12,.0f} strings/s ({n} strings)")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
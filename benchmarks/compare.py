@@ -0,0 +1,53 @@
+"""
+Compare a benchmark report against a stored baseline and flag regressions:
+a case regresses when its median time or its peak memory grows by more than
+the threshold.
+"""
+from collections import namedtuple
+
+Comparison = namedtuple('Comparison', ['case', 'metric', 'baseline', 'current', 'change', 'regression'])
+
+# metric -> lower is better
+METRICS = ('p50', 'peak_memory')
+
+
+def compare(baseline, current, threshold=0.10, memory_threshold=None):
+    """
+    Compare two reports (as written by runner.write_report) case by case.
+    Returns (comparisons, added, removed): one Comparison per case and metric
+    present in both, plus the case ids found in only one of the reports.
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    old = {result['case']: result for result in baseline['results']}
+    new = {result['case']: result for result in current['results']}
+    comparisons = []
+    for case, result in new.items():
+        if case not in old:
+            continue
+        for metric in METRICS:
+            before, after = old[case][metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            limit = memory_threshold if metric == 'peak_memory' else threshold
+            comparisons.append(Comparison(case, metric, before, after, change, change > limit))
+    added = [case for case in new if case not in old]
+    removed = [case for case in old if case not in new]
+    return comparisons, added, removed
+
+
+def _format_value(metric, value):
+    if metric == 'peak_memory':
+        return f"{value / 2 ** 20:.2f} MiB"
+    return f"{value * 1e3:.2f} ms"
+
+
+def format_comparisons(comparisons, added=(), removed=()) -> str:
+    lines = []
+    for row in comparisons:
+        flag = 'REGRESSION' if row.regression else ''
+        lines.append(f"{row.case:<48} {row.metric:<12} {_format_value(row.metric, row.baseline):>14} -> "
+                     f"{_format_value(row.metric, row.current):>14} {row.change:>+8.1%}  {flag}")
+    lines.extend(f"{case:<48} new case, no baseline" for case in added)
+    lines.extend(f"{case:<48} missing from this run" for case in removed)
+    regressions = sum(row.regression for row in comparisons)
+    lines.append(f"{regressions} regression(s) in {len(comparisons)} comparison(s)")
+    return '\n'.join(lines)
@@ -0,0 +1,181 @@
+"""
+Benchmark runner: times a list of cases, records latency percentiles,
+throughput and peak memory, and writes the report as JSON.
+"""
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from src.lexer import sql_lexer
+from src.parser import parse_script, sql_parser
+
+from .workloads import lab1_grammar, long_nullable_cfg, random_cfg, random_nfa, sql_queries, sql_script
+
+# setup() builds the input (untimed, once per repetition, since some cases
+# mutate it); run(input) does the timed work and returns how many units it processed
+Case = namedtuple('Case', ['name', 'params', 'setup', 'run', 'units'])
+
+
+def case_id(case) -> str:
+    params = ','.join(f"{key}={value}" for key, value in case.params.items())
+    return f"{case.name}[{params}]"
+
+
+def _count(result):
+    return len(result)
+
+
+def _parse_all(queries):
+    for query in queries:
+        sql_parser(query)
+    return len(queries)
+
+
+def _to_cnf(grammar, mode):
+    productions = len(grammar.P)
+    grammar.to_cnf(mode)
+    return productions
+
+
+def _generate_words(state):
+    grammar, n = state
+    return len(grammar.generate_words(n))
+
+
+def _seeded_lab1(n):
+    random.seed(0)
+    return lab1_grammar(), n
+
+
+def suite(quick=False):
+    """The standard cases; quick uses small sizes for a fast smoke run."""
+    statements = (100, 1_000) if quick else (100, 1_000, 10_000)
+    nfa_states = (8, 16) if quick else (8, 16, 32)
+    productions = (1_000,) if quick else (1_000, 10_000, 100_000)
+    nullable_lengths = (8,) if quick else (8, 14)
+    words = (100,) if quick else (100, 1_000)
+
+    cases = []
+    for n in statements:
+        cases.append(Case('sql_lexer', {'statements': n},
+                          lambda n=n: sql_script(n), lambda script: _count(sql_lexer(script)), 'tokens'))
+        cases.append(Case('sql_parser', {'statements': n},
+                          lambda n=n: sql_queries(n), _parse_all, 'statements'))
+        cases.append(Case('parse_script', {'statements': n},
+                          lambda n=n: sql_script(n), lambda script: _count(parse_script(script)), 'statements'))
+    for n in nfa_states:
+        cases.append(Case('nfa_to_dfa', {'states': n},
+                          lambda n=n: random_nfa(n), lambda nfa: _count(nfa.nfa_to_dfa().Q), 'dfa states'))
+        cases.append(Case('nfa_to_dfa', {'states': n, 'minimize': True},
+                          lambda n=n: random_nfa(n), lambda nfa: _count(nfa.nfa_to_dfa(minimize=True).Q),
+                          'dfa states'))
+    for n in productions:
+        for mode in ('classic', 'bin_first'):
+            cases.append(Case('to_cnf', {'productions': n, 'mode': mode},
+                              lambda n=n: random_cfg(n), lambda g, mode=mode: _to_cnf(g, mode),
+                              'productions'))
+    for k in nullable_lengths:
+        for mode in ('classic', 'bin_first'):
+            cases.append(Case('to_cnf_long_nullable', {'k': k, 'mode': mode},
+                              lambda k=k: long_nullable_cfg(k), lambda g, mode=mode: _to_cnf(g, mode),
+                              'productions'))
+    for n in words:
+        cases.append(Case('generate_words', {'words': n},
+                          lambda n=n: _seeded_lab1(n), _generate_words, 'words'))
+    return cases
+
+
+def percentile(values, q) -> float:
+    """The q-th percentile (0-100) of values, linearly interpolated."""
+    ordered = sorted(values)
+    if not ordered:
+        return float('nan')
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def measure(case, repeat=5, warmup=1) -> dict:
+    """
+    Run a case warmup + repeat times and summarize the timed runs. Peak memory
+    is measured in one extra run under tracemalloc, which would skew the timings.
+    """
+    for _ in range(warmup):
+        case.run(case.setup())
+    times = []
+    units = 0
+    for _ in range(repeat):
+        state = case.setup()
+        start = time.perf_counter()
+        units = case.run(state)
+        times.append(time.perf_counter() - start)
+
+    state = case.setup()
+    tracemalloc.start()
+    try:
+        case.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50 = percentile(times, 50)
+    return {
+        'case': case_id(case),
+        'name': case.name,
+        'params': case.params,
+        'units': case.units,
+        'items': units,
+        'repeat': repeat,
+        'times': times,
+        'min': min(times),
+        'mean': sum(times) / len(times),
+        'p50': p50,
+        'p90': percentile(times, 90),
+        'p99': percentile(times, 99),
+        'throughput': units / p50 if p50 > 0 else float('inf'),
+        'peak_memory': peak,
+    }
+
+
+def environment() -> dict:
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(cases, repeat=5, warmup=1, out=sys.stdout) -> dict:
+    """Measure every case, printing one line per case to out, and return the report."""
+    results = []
+    for case in cases:
+        result = measure(case, repeat, warmup)
+        results.append(result)
+        if out is not None:
+            print(format_result(result), file=out, flush=True)
+    return {'environment': environment(), 'results': results}
+
+
+def format_result(result) -> str:
+    return (f"{result['case']:<48} p50 {result['p50'] * 1e3:>10.2f} ms  p90 {result['p90'] * 1e3:>10.2f} ms  "
+            f"{result['throughput']:>14,.0f} {result['units']}/s  peak {result['peak_memory'] / 2 ** 20:>8.2f} MiB")
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def read_report(path) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,114 @@
+"""
+Synthetic, seeded workloads for the benchmarks: SQL scripts, random NFAs,
+random context-free grammars and the lab-1 regular grammar.
+The same parameters and seed always give the same workload.
+"""
+import random
+
+from src.ChomskyNormalForm import Grammar as CFG
+from src.finite_automation import FiniteAutomaton
+from src.grammar import Grammar
+
+COLUMNS = ['id', 'name', 'price', 'quantity', 'category', 'created']
+TABLES = ['items', 'orders', 'customers', 'events']
+
+
+def sql_query(rng: random.Random, conditions=3) -> str:
+    """One SELECT with a WHERE clause of up to conditions comparisons joined by AND / OR."""
+    columns = ', '.join(rng.sample(COLUMNS, rng.randint(1, 4)))
+    query = f"SELECT {columns} FROM {rng.choice(TABLES)}"
+    terms = []
+    for _ in range(rng.randint(1, conditions)):
+        column = rng.choice(COLUMNS)
+        kind = rng.random()
+        if kind < 0.5:
+            terms.append(f"{column} {rng.choice(['=', '!=', '<', '<=', '>', '>='])} {rng.randint(0, 10_000)}")
+        elif kind < 0.8:
+            terms.append(f"{column} = '{rng.choice(['red', 'green', 'blue', 'item 42'])}'")
+        else:
+            terms.append(f"{column} LIKE '{rng.choice(['%a%', 'b%', '%c', 'a_b'])}'")
+    condition = terms[0]
+    for term in terms[1:]:
+        condition += f" {rng.choice(['AND', 'OR'])} {term}"
+    if len(terms) > 1 and rng.random() < 0.3:
+        condition = f"({condition})"
+    return f"{query} WHERE {condition}"
+
+
+def sql_queries(statements, seed=0):
+    rng = random.Random(seed)
+    return [sql_query(rng) for _ in range(statements)]
+
+
+def sql_script(statements, seed=0) -> str:
+    """statements queries separated by ';', one per line, with an occasional comment."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(statements):
+        if rng.random() < 0.1:
+            lines.append(f"-- statement {i}")
+        lines.append(sql_query(rng) + ';')
+    return '\n'.join(lines) + '\n'
+
+
+def random_nfa(states, seed=0, alphabet='ab', density=1.5) -> FiniteAutomaton:
+    """
+    A random NFA on states q0 ... q{states-1}: each state gets on average
+    density targets per symbol, and about a quarter of the states are final.
+    """
+    rng = random.Random(seed)
+    names = [f"q{i}" for i in range(states)]
+    delta = {}
+    for state in names:
+        moves = {}
+        for symbol in alphabet:
+            targets = {rng.choice(names) for _ in range(max(0, round(rng.expovariate(1 / density))))}
+            if targets:
+                moves[symbol] = targets
+        delta[state] = moves
+    final = [state for state in names if rng.random() < 0.25] or [names[-1]]
+    return FiniteAutomaton.from_definition(names, list(alphabet), names[0], delta, final)
+
+
+def random_cfg(productions, seed=0, terminals='abcd', epsilon=0.05, max_length=4) -> CFG:
+    """
+    A random grammar with productions // 5 nonterminals A0, A1, ... A nonterminal
+    only refers to nonterminals with a higher number, so there are no unit cycles.
+    A larger epsilon and max_length give long right sides full of nullable symbols.
+    """
+    rng = random.Random(seed)
+    nonterminals = [f"A{i}" for i in range(max(1, productions // 5))]
+    P = []
+    for _ in range(productions):
+        i = rng.randrange(len(nonterminals))
+        if rng.random() < epsilon:
+            P.append((nonterminals[i], ('ε',)))
+            continue
+        right = []
+        for _ in range(rng.randint(1, max_length)):
+            if rng.random() < 0.5 or i == len(nonterminals) - 1:
+                right.append(rng.choice(terminals))
+            else:
+                right.append(nonterminals[rng.randrange(i + 1, len(nonterminals))])
+        P.append((nonterminals[i], tuple(right)))
+    return CFG(nonterminals, set(terminals), P, nonterminals[0])
+
+
+def long_nullable_cfg(k) -> CFG:
+    """S → A1 A2 ... Ak b with every Ai → a | ε."""
+    nullable = [f"A{i}" for i in range(1, k + 1)]
+    P = [('S', tuple(nullable) + ('b',))]
+    for symbol in nullable:
+        P.append((symbol, ('a',)))
+        P.append((symbol, ('ε',)))
+    return CFG(set(nullable) | {'S'}, {'a', 'b'}, P, 'S')
+
+
+def lab1_grammar() -> Grammar:
+    """The regular grammar of lab 1."""
+    productions = {
+        'S': ['aS', 'bB'],
+        'B': ['cB', 'd', 'aD'],
+        'D': ['aB', 'b'],
+    }
+    return Grammar(['S', 'B', 'D'], ['a', 'b', 'c', 'd'], productions, 'S')
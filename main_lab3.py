@@ -1,4 +1,4 @@
-from src.lexer import sql_lexer
+from src.lexer import iter_tokens
 
 def main():
     while True:
@@ -8,9 +8,8 @@ def main():
                 print("Exiting lexer...")
                 break
 
-            tokens = sql_lexer(query)
             print("\nTokens:")
-            for token_type, value in tokens:
+            for token_type, value in iter_tokens(query):
                 print(f"{token_type.name}: {value}")
 
             print("\n")
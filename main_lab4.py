@@ -1,8 +1,15 @@
-from src.regex import generate_with_steps
+from src.regex import generate_from_regex, generate_with_steps, patterns
 
 def main():
+    # Generate examples for each pattern
+    for pattern in patterns:
+        print(f"\nGenerating strings for pattern: {pattern}")
+        for _ in range(3):  # Generate 3 examples per pattern
+            result, _ = generate_from_regex(pattern)
+            print(f"  Example: {result}")
+
     result, steps = generate_with_steps()
-    print("Generated String:", result)
+    print("\nGenerated String:", result)
     print("\nSequence of Steps:")
     for step in steps:
         print("-", step)
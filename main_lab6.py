@@ -1,5 +1,5 @@
 from src.parser import sql_parser
-from src.lexer import sql_lexer
+from src.lexer import iter_tokens
 from src.ast import ASTNode
 
 def main():
@@ -14,9 +14,8 @@ def main():
                 break
 
             # Lexical analysis
-            tokens = sql_lexer(query)
             print("\nLexical Analysis Results:")
-            for token_type, value in tokens:
+            for token_type, value in iter_tokens(query):
                 print(f"{token_type.name}: {value}")
 
             # Syntax analysis and AST building
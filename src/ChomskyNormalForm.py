@@ -1,3 +1,99 @@
+import time
+
+from src import instrumentation
+
+
+class _ProductionIndex:
+    """
+    Productions with their symbols interned to ints, indexed for worklist
+    fixpoints: rules[r] is (left, right) over symbol ids, by_left lists the
+    rules of each nonterminal and occurrences the rules whose right side holds
+    a symbol (once per position). Every fixpoint visits each rule a constant
+    number of times per symbol occurrence, instead of rescanning all
+    productions until nothing changes.
+    """
+
+    def __init__(self, productions):
+        self.ids = {}
+        self.symbols = []
+        self.rules = []
+        self.by_left = {}
+        self.occurrences = {}
+        for left, right in productions:
+            rule = len(self.rules)
+            left = self.intern(left)
+            right = tuple(self.intern(symbol) for symbol in right)
+            self.rules.append((left, right))
+            self.by_left.setdefault(left, []).append(rule)
+            for symbol in right:
+                self.occurrences.setdefault(symbol, []).append(rule)
+
+    def intern(self, symbol):
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return symbol_id
+
+    def _closure(self, remaining, counted=frozenset()):
+        """
+        Symbols marked by a bottom-up fixpoint: the left side of a rule gets
+        marked once the remaining[rule] right-side positions still open are all
+        marked. Occurrences of symbols in counted were left out of remaining.
+        """
+        marked = set()
+        pending = []
+        for rule, (left, _) in enumerate(self.rules):
+            if remaining[rule] == 0 and left not in marked:
+                marked.add(left)
+                pending.append(left)
+        while pending:
+            symbol = pending.pop()
+            if symbol in counted:
+                continue
+            for rule in self.occurrences.get(symbol, ()):
+                remaining[rule] -= 1
+                left = self.rules[rule][0]
+                if remaining[rule] == 0 and left not in marked:
+                    marked.add(left)
+                    pending.append(left)
+        return marked
+
+    def nullable(self):
+        """Ids of the symbols deriving ε (productions A → ε are written ('ε',))."""
+        epsilon = self.ids.get('ε')
+        remaining = [0 if right == (epsilon,) else len(right) for _, right in self.rules]
+        nullable = self._closure(remaining)
+        if instrumentation.enabled:
+            # every marked symbol is pushed and popped exactly once
+            instrumentation.count('cnf.nullable.iterations', len(nullable))
+        return nullable
+
+    def productive(self, terminals):
+        """Ids of the symbols deriving a string of terminals; terminals are productive themselves."""
+        terminal_ids = {self.ids[symbol] for symbol in terminals if symbol in self.ids}
+        remaining = [sum(1 for symbol in right if symbol not in terminal_ids) for _, right in self.rules]
+        productive = self._closure(remaining, terminal_ids)
+        if instrumentation.enabled:
+            instrumentation.count('cnf.productive.iterations', len(productive))
+        return productive
+
+    def reachable(self, start, nonterminals):
+        """Ids of the nonterminals (from the given set) reachable from start, start included."""
+        start_id = self.intern(start)
+        reached = {start_id}
+        pending = [start_id]
+        while pending:
+            for rule in self.by_left.get(pending.pop(), ()):
+                for symbol in self.rules[rule][1]:
+                    if symbol not in reached and self.symbols[symbol] in nonterminals:
+                        reached.add(symbol)
+                        pending.append(symbol)
+        if instrumentation.enabled:
+            instrumentation.count('cnf.reachable.iterations', len(reached))
+        return reached
+
+
 class Grammar:
     def __init__(self, VN, VT, P, S):
         self.VN = set(VN)  # Non-terminals
@@ -17,121 +113,136 @@ class Grammar:
         self.next_new_nonterminal += 1
         return new_nt
 
+    def _index(self):
+        return _ProductionIndex(self.P)
+
+    def _record_step(self, step, started):
+        instrumentation.count(f"cnf.{step}.productions", len(self.P))
+        instrumentation.add_time(f"cnf.{step}", time.perf_counter() - started)
+
     def eliminate_epsilon(self):
+        started = time.perf_counter() if instrumentation.enabled else None
         # Step 1: Find all nullable non-terminals
-        nullable = set()
-        changed = True
-        while changed:
-            changed = False
-            for left, right in self.P:
-                if right == ('ε',) and left not in nullable:
-                    nullable.add(left)
-                    changed = True
-                elif all(sym in nullable for sym in right) and left not in nullable:
-                    nullable.add(left)
-                    changed = True
+        index = self._index()
+        nullable = {index.symbols[symbol] for symbol in index.nullable()}
 
         # Step 2: Generate new productions without nullable symbols
         new_productions = []
+        seen = set()
         for left, right in self.P:
             if right == ('ε',):
                 continue  # Skip epsilon productions
 
             # Generate all possible combinations without nullable symbols
+            # (every subset of the nullable positions is kept or dropped, mask 0
+            # dropping all of them; the full right side is the last mask)
             positions = [i for i, sym in enumerate(right) if sym in nullable]
             n = len(positions)
-
-            # Binary representation to generate all subsets
-            for mask in range(1, 1 << n):
-                new_right = list(right)
-                bits = bin(mask)[2:].zfill(n)
-                for i in range(n):
-                    if bits[i] == '0':
-                        new_right[positions[i]] = None  # Mark for removal
-                new_right = [sym for sym in new_right if sym is not None]
+            variants = []
+            for mask in range(1 << n):
+                removed = {positions[i] for i in range(n) if not mask >> (n - 1 - i) & 1}
+                new_right = tuple(sym for i, sym in enumerate(right) if i not in removed)
                 if new_right:  # Avoid empty productions
-                    new_productions.append((left, tuple(new_right)))
-
-            # Also add the original production if not all symbols are nullable
-            if not all(sym in nullable for sym in right):
-                new_productions.append((left, right))
+                    variants.append(new_right)
 
-        # Remove duplicates
-        unique_productions = []
-        seen = set()
-        for prod in new_productions:
-            if prod not in seen:
-                seen.add(prod)
-                unique_productions.append(prod)
+            # Remove duplicates
+            for new_right in variants:
+                if (left, new_right) not in seen:
+                    seen.add((left, new_right))
+                    new_productions.append((left, new_right))
 
-        self.P = unique_productions
+        self.P = new_productions
+        if started is not None:
+            self._record_step('eliminate_epsilon', started)
         return self
 
     def eliminate_renaming(self):
+        started = time.perf_counter() if instrumentation.enabled else None
         # Step 1: Find all unit productions (A → B)
-        changed = True
-        while changed:
-            changed = False
-            new_productions = []
-            unit_productions = []
-
-            # Separate unit and non-unit productions
-            for left, right in self.P:
-                if len(right) == 1 and right[0] in self.VN:
-                    unit_productions.append((left, right[0]))
-                else:
-                    new_productions.append((left, right))
-
-            # For each unit production A → B, add all B's productions to A
-            for A, B in unit_productions:
-                for left, right in self.P:
-                    if left == B and (A, right) not in new_productions:
-                        new_productions.append((A, right))
-                        changed = True
+        unit_targets = {}  # A -> [B, ...]
+        non_unit = {}  # A -> [right, ...] of its other productions
+        new_productions = []
+        seen = set()
+        for left, right in self.P:
+            if len(right) == 1 and right[0] in self.VN:
+                unit_targets.setdefault(left, []).append(right[0])
+            elif (left, right) not in seen:
+                seen.add((left, right))
+                non_unit.setdefault(left, []).append(right)
+                new_productions.append((left, right))
 
-            self.P = new_productions
+        # Step 2: A gets the non-unit productions of every B reachable from it
+        # through unit productions; each closure is a graph search, so unit
+        # cycles (A → B, B → A) simply end the search
+        for A, targets in unit_targets.items():
+            reached = {A}
+            pending = list(reversed(targets))
+            pops = len(pending)  # pending is drained, so every push is one pop
+            while pending:
+                B = pending.pop()
+                if B in reached:
+                    continue
+                reached.add(B)
+                for right in non_unit.get(B, ()):
+                    if (A, right) not in seen:
+                        seen.add((A, right))
+                        new_productions.append((A, right))
+                pending.extend(reversed(unit_targets.get(B, ())))
+                pops += len(unit_targets.get(B, ()))
+            if started is not None:
+                instrumentation.count('cnf.unit_closure.iterations', pops)
 
+        self.P = new_productions
+        if started is not None:
+            self._record_step('eliminate_renaming', started)
         return self
 
     def eliminate_inaccessible(self):
+        started = time.perf_counter() if instrumentation.enabled else None
         # Find all reachable symbols from the start symbol
-        reachable = {self.S}
-        changed = True
-        while changed:
-            changed = False
-            for left, right in self.P:
-                if left in reachable:
-                    for symbol in right:
-                        if symbol in self.VN and symbol not in reachable:
-                            reachable.add(symbol)
-                            changed = True
+        index = self._index()
+        reachable = {index.symbols[symbol] for symbol in index.reachable(self.S, self.VN)}
 
         # Remove non-reachable non-terminals and their productions
         self.VN = {nt for nt in self.VN if nt in reachable}
         self.P = [(left, right) for left, right in self.P
                   if left in reachable and all(sym in self.VT or sym in reachable for sym in right)]
 
+        if started is not None:
+            self._record_step('eliminate_inaccessible', started)
         return self
 
     def eliminate_non_productive(self):
+        started = time.perf_counter() if instrumentation.enabled else None
         # Find all productive symbols (can derive terminal strings)
-        productive = set()
-        changed = True
-        while changed:
-            changed = False
-            for left, right in self.P:
-                if all(sym in self.VT or sym in productive for sym in right) and left not in productive:
-                    productive.add(left)
-                    changed = True
+        index = self._index()
+        productive = {index.symbols[symbol] for symbol in index.productive(self.VT)}
 
         # Remove non-productive non-terminals and their productions
         self.VN = {nt for nt in self.VN if nt in productive}
         self.P = [(left, right) for left, right in self.P
                   if left in productive and all(sym in self.VT or sym in productive for sym in right)]
 
+        if started is not None:
+            self._record_step('eliminate_non_productive', started)
         return self
 
-    def to_cnf(self):
+    def to_cnf(self, mode="classic"):
+        """
+        Convert the grammar to Chomsky normal form, in place.
+        mode="classic" eliminates ε-productions first; a production with n
+        nullable symbols then expands into up to 2^n productions.
+        mode="bin_first" binarizes before removing ε (START → TERM → BIN → DEL →
+        UNIT), so every production has at most two symbols when ε is removed
+        and the result stays linear in the grammar size (quadratic at most,
+        from unit closure). It keeps ε in the language as S0 → ε for a new
+        start symbol S0 that no production uses.
+        """
+        if mode == "bin_first":
+            return self._to_cnf_bin_first()
+        if mode != "classic":
+            raise ValueError(f"Unknown CNF mode: {mode!r} (expected 'classic' or 'bin_first')")
+
         # Step 1: Eliminate ε-productions
         self.eliminate_epsilon()
 
@@ -145,11 +256,12 @@ class Grammar:
         self.eliminate_non_productive()
 
         # Step 5: Convert to CNF
+        started = time.perf_counter() if instrumentation.enabled else None
         new_productions = []
         terminal_replacements = {}  # Map terminals to new non-terminals
 
-        # First handle terminal replacements
-        for terminal in self.VT:
+        # First handle terminal replacements (in sorted order, so the N names are stable)
+        for terminal in sorted(self.VT):
             new_nt = self._get_new_nonterminal()
             terminal_replacements[terminal] = new_nt
             self.VN.add(new_nt)
@@ -183,8 +295,102 @@ class Grammar:
                 new_productions.append((left, tuple(current_right)))
 
         self.P = new_productions
+        if started is not None:
+            self._record_step('binarize', started)
+        return self
+
+    def _to_cnf_bin_first(self):
+        started = time.perf_counter() if instrumentation.enabled else None
+        # START: a new start symbol, so that S0 → ε cannot appear on a right side
+        if any(self.S in right for _, right in self.P):
+            start = self._get_new_nonterminal()
+            self.VN.add(start)
+            self.P = [(start, (self.S,))] + list(self.P)
+            self.S = start
+        self.VN.add(self.S)
+
+        # TERM: terminals in right sides of length 2 or more get a non-terminal
+        terminal_replacements = {}
+        new_productions = []
+        for left, right in self.P:
+            if len(right) > 1:
+                right = list(right)
+                for i, sym in enumerate(right):
+                    if sym in self.VT:
+                        if sym not in terminal_replacements:
+                            terminal_replacements[sym] = self._get_new_nonterminal()
+                            self.VN.add(terminal_replacements[sym])
+                            new_productions.append((terminal_replacements[sym], (sym,)))
+                        right[i] = terminal_replacements[sym]
+                right = tuple(right)
+            new_productions.append((left, right))
+        if started is not None:
+            self.P = new_productions
+            self._record_step('term', started)
+            started = time.perf_counter()
+
+        # BIN: break right sides longer than 2 into pairs
+        binary_productions = []
+        for left, right in new_productions:
+            current_right = list(right)
+            while len(current_right) > 2:
+                new_nt = self._get_new_nonterminal()
+                self.VN.add(new_nt)
+                binary_productions.append((new_nt, (current_right[0], current_right[1])))
+                current_right = [new_nt] + current_right[2:]
+            binary_productions.append((left, tuple(current_right)))
+        self.P = binary_productions
+        if started is not None:
+            self._record_step('bin', started)
+            started = time.perf_counter()
+
+        # DEL: with at most two symbols per right side, dropping nullable
+        # symbols gives at most three variants of each production
+        index = self._index()
+        nullable = {index.symbols[symbol] for symbol in index.nullable()}
+        new_productions = []
+        seen = set()
+        for left, right in self.P:
+            if right == ('ε',):
+                continue
+            variants = [right]
+            if len(right) == 2:
+                if right[1] in nullable:
+                    variants.append(right[:1])
+                if right[0] in nullable:
+                    variants.append(right[1:])
+            for new_right in variants:
+                if (left, new_right) not in seen:
+                    seen.add((left, new_right))
+                    new_productions.append((left, new_right))
+        self.P = new_productions
+        if started is not None:
+            self._record_step('del', started)
+
+        # UNIT, then drop the symbols that became useless
+        self.eliminate_renaming()
+        self.eliminate_non_productive()
+        self.eliminate_inaccessible()
+        if self.S in nullable:
+            self.VN.add(self.S)
+            self.P.append((self.S, ('ε',)))
         return self
 
+    def cyk(self):
+        """A CYKParser for this grammar, which must already be in CNF (see to_cnf)."""
+        from src.cyk import CYKParser
+        return CYKParser(self)
+
+    def earley(self):
+        """An EarleyParser for this grammar as it is, without conversion to CNF."""
+        from src.earley import EarleyParser
+        return EarleyParser(self)
+
+    def sampler(self):
+        """A CNFSampler drawing uniform derivations of a given length; the grammar must be in CNF."""
+        from src.sampling import CNFSampler
+        return CNFSampler(self)
+
 
 # def process_grammar(grammar):
 #     """Process the grammar through all CNF steps and print results"""
@@ -1,5 +1,5 @@
+import re
 from enum import Enum
-from dataclasses import dataclass
 from typing import List, Union
 
 class ASTNodeType(Enum):
@@ -9,28 +9,116 @@ class ASTNodeType(Enum):
     WHERE_CLAUSE = "WHERE_CLAUSE"
     CONDITION = "CONDITION"
     BINARY_OPERATION = "BINARY_OPERATION"
+    LOGICAL_OPERATION = "LOGICAL_OPERATION"
     IDENTIFIER = "IDENTIFIER"
     LITERAL = "LITERAL"
 
-@dataclass
 class ASTNode:
-    node_type: ASTNodeType
-    value: Union[str, None] = None
-    children: List['ASTNode'] = None
+    # slots instead of a per-instance __dict__ keep every node small
+    __slots__ = ('node_type', 'value', 'children')
 
-    def __post_init__(self):
-        if self.children is None:
-            self.children = []
+    def __init__(self, node_type: ASTNodeType, value: Union[str, None] = None,
+                 children: List['ASTNode'] = None):
+        self.node_type = node_type
+        self.value = value
+        self.children = [] if children is None else children
+
+    def walk(self):
+        """
+        Yield (node, depth) pairs in pre-order.
+        Uses an explicit stack, so arbitrarily deep trees do not hit the recursion limit.
+        """
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            children = node.children
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], depth + 1))
+
+    def lines(self, level=0):
+        """Yield the lines of the indented tree representation, one per node."""
+        indents = ['  ' * level]
+        stack = [iter((self,))]
+        while stack:
+            for node in stack[-1]:
+                depth = len(stack) - 1
+                if depth == len(indents):
+                    indents.append(indents[-1] + '  ')
+                if node.value is None:
+                    yield f"{indents[depth]}{node.node_type.name}\n"
+                else:
+                    yield f"{indents[depth]}{node.node_type.name}: {node.value}\n"
+                if node.children:
+                    stack.append(iter(node.children))
+                    break
+            else:
+                stack.pop()
+
+    def write(self, out, level=0):
+        """Stream the indented tree to a file-like object."""
+        out.writelines(self.lines(level))
 
     def __repr__(self):
         return self._pretty_print()
 
     def _pretty_print(self, level=0):
-        indent = "  " * level
-        result = f"{indent}{self.node_type.name}"
-        if self.value is not None:
-            result += f": {self.value}"
-        result += "\n"
-        for child in self.children:
-            result += child._pretty_print(level + 1)
-        return result
\ No newline at end of file
+        return ''.join(self.lines(level))
+
+    def __eq__(self, other):
+        if not isinstance(other, ASTNode):
+            return NotImplemented
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if (a.node_type != b.node_type or a.value != b.value or
+                    len(a.children) != len(b.children)):
+                return False
+            stack.extend(zip(a.children, b.children))
+        return True
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # pickled as a flat pre-order list of (type, value, child count), so deep
+        # trees (e.g. sent back from parse_script workers) do not hit the recursion limit
+        return _from_preorder, ([(node.node_type, node.value, len(node.children)) for node, _ in self.walk()],)
+
+
+def _from_preorder(entries):
+    """Rebuild a tree from the pre-order (type, value, child count) list of ASTNode.__reduce__."""
+    root = None
+    pending = []  # [node, children still to attach], innermost last
+    for node_type, value, arity in entries:
+        node = ASTNode(node_type, value)
+        if pending:
+            parent = pending[-1]
+            parent[0].children.append(node)
+            parent[1] -= 1
+            if not parent[1]:
+                pending.pop()
+        else:
+            root = node
+        if arity:
+            pending.append([node, arity])
+    return root
+
+
+def literal_value(text):
+    """Python value of a LITERAL: quotes are stripped from strings, numbers become int or float."""
+    if text[:1] in ("'", '"'):
+        return text[1:-1]
+    return float(text) if '.' in text else int(text)
+
+
+def like_pattern(pattern):
+    """Compile an SQL LIKE pattern ('%' any run, '_' any character) into a regex."""
+    parts = []
+    for char in pattern:
+        if char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), re.DOTALL)
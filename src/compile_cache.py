@@ -0,0 +1,303 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+
+from . import ChomskyNormalForm, dfa_lexer, finite_automation, lexer
+from .ChomskyNormalForm import Grammar
+from .dfa_lexer import LexerTable, build_lexer_table
+from .finite_automation import FiniteAutomaton
+from .lexer import TOKEN_PATTERNS
+
+CompileCacheInfo = namedtuple('CompileCacheInfo', ['hits', 'misses', 'writes', 'errors'])
+
+KIND_CNF = 1
+KIND_DFA = 2
+KIND_LEXER_TABLE = 3
+
+# the modules whose code decides what is cached; editing any of them invalidates every entry
+_LIBRARY_MODULES = (ChomskyNormalForm, finite_automation, dfa_lexer, lexer, sys.modules[__name__])
+
+_HEADER = '<4sHBxI'
+
+
+@lru_cache(maxsize=None)
+def library_fingerprint() -> str:
+    """Hash of the source of the modules that build cached objects."""
+    digest = hashlib.sha256()
+    for module in _LIBRARY_MODULES:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _ints(values) -> bytes:
+    # int32, little-endian whatever the platform
+    data = array('i', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _read_ints(view):
+    if sys.byteorder == 'little':
+        return view.cast('i')
+    data = array('i', view.tobytes())
+    data.byteswap()
+    return data
+
+
+def _strings(values) -> bytes:
+    # every string is terminated by a NUL
+    return ''.join(value + '\0' for value in values).encode('utf-8')
+
+
+def _read_strings(view):
+    return bytes(view).decode('utf-8').split('\0')[:-1]
+
+
+def grammar_source(grammar: Grammar, mode='classic') -> str:
+    """Canonical text of a grammar and a to_cnf mode: the input the CNF cache is keyed on."""
+    return json.dumps(['cnf', mode, sorted(grammar.VN), sorted(grammar.VT),
+                       [[left, list(right)] for left, right in grammar.P], grammar.S,
+                       grammar.next_new_nonterminal], ensure_ascii=False)
+
+
+def automaton_source(automaton: FiniteAutomaton, minimize=False) -> str:
+    """Canonical text of an automaton and the nfa_to_dfa options it is converted with."""
+    delta = []
+    for state, moves in automaton.delta.items():
+        for symbol, targets in moves.items():
+            if not isinstance(targets, (set, frozenset)):
+                targets = (targets,)
+            delta.append([state, symbol, sorted(targets)])
+    delta.sort()
+    return json.dumps(['dfa', minimize, list(automaton.Q), list(automaton.Alphabet), automaton.q0,
+                       delta, sorted(automaton.F)], ensure_ascii=False)
+
+
+def token_patterns_source(token_patterns) -> str:
+    """Canonical text of a token pattern list."""
+    return json.dumps(['lexer', [[token_type.name, pattern, None if keywords is None else sorted(keywords)]
+                                 for token_type, pattern, keywords in token_patterns]])
+
+
+class _MappedEntry:
+    """
+    The sections of a cache file as memoryviews into its mmap. Closing it (or
+    leaving a with block, which yields the sections) unmaps the file; the
+    objects loaded from the sections must not keep views into it.
+    """
+
+    def __init__(self, mapping, view, sections):
+        self.mapping = mapping
+        self.view = view
+        self.sections = sections
+
+    def __enter__(self):
+        return self.sections
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for section in self.sections:
+            section.release()
+        self.view.release()
+        self.mapping.close()
+
+
+class CompileCache:
+    """
+    On-disk cache of compiled objects: CNF grammars (to_cnf), DFAs (nfa_to_dfa)
+    and lexer tables (build_lexer_table).
+    Entries are files named by the sha256 of the canonical source of their input
+    and the library_fingerprint, so a changed definition or a changed library
+    simply misses. Files are written atomically and read through mmap: the
+    integer arrays are memoryviews into the mapping (a lexer table is used in
+    place, see LexerTable.from_bytes) and only the Python objects that the
+    callers need are built from them.
+    """
+    MAGIC = b'DSLC'
+    VERSION = 1
+
+    def __init__(self, directory):
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def key(self, source: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(library_fingerprint().encode('ascii'))
+        digest.update(struct.pack('<H', self.VERSION))
+        digest.update(source.encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.bin')
+
+    def cnf(self, grammar: Grammar, mode='classic') -> Grammar:
+        """grammar.to_cnf(mode), computed on a copy: the grammar passed in is left unchanged."""
+        key = self.key(grammar_source(grammar, mode))
+        entry = self._read(key, KIND_CNF)
+        if entry is not None:
+            with entry as sections:
+                return self._load_cnf(sections)
+        result = Grammar(grammar.VN, grammar.VT, list(grammar.P), grammar.S)
+        result.next_new_nonterminal = grammar.next_new_nonterminal
+        result.to_cnf(mode)
+        self._write(key, KIND_CNF, self._dump_cnf(result))
+        return result
+
+    def dfa(self, automaton: FiniteAutomaton, minimize=False) -> FiniteAutomaton:
+        """automaton.nfa_to_dfa(minimize)."""
+        key = self.key(automaton_source(automaton, minimize))
+        entry = self._read(key, KIND_DFA)
+        if entry is not None:
+            with entry as sections:
+                return self._load_dfa(sections)
+        result = automaton.nfa_to_dfa(minimize=minimize)
+        self._write(key, KIND_DFA, self._dump_dfa(result))
+        return result
+
+    def lexer_table(self, token_patterns=TOKEN_PATTERNS) -> LexerTable:
+        """
+        build_lexer_table(token_patterns). A cached table reads its arrays in
+        place, so its file stays mapped until the table is garbage collected.
+        """
+        key = self.key(token_patterns_source(token_patterns))
+        entry = self._read(key, KIND_LEXER_TABLE)
+        if entry is not None:
+            return LexerTable.from_bytes(entry.sections[0])
+        result = build_lexer_table(token_patterns)
+        self._write(key, KIND_LEXER_TABLE, [result.to_bytes()])
+        return result
+
+    def cache_info(self) -> CompileCacheInfo:
+        return CompileCacheInfo(self.hits, self.misses, self.writes, self.errors)
+
+    def clear(self):
+        """Delete every entry and reset the counters."""
+        for name in os.listdir(self.directory):
+            if name.endswith('.bin'):
+                os.remove(os.path.join(self.directory, name))
+        self.hits = self.misses = self.writes = self.errors = 0
+
+    # file format: header (magic, version, kind, section count), then
+    # length-prefixed sections, each starting on an 8-byte boundary
+
+    def _write(self, key, kind, sections):
+        out = bytearray(struct.pack(_HEADER, self.MAGIC, self.VERSION, kind, len(sections)))
+        for section in sections:
+            out += struct.pack('<I', len(section))
+            out += b'\0' * (-len(out) % 8)
+            out += section
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(out)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            self.errors += 1
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self.writes += 1
+
+    def _read(self, key, kind):
+        """The entry for key as a _MappedEntry, or None on a miss."""
+        try:
+            with open(self.path(key), 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing (or empty) file
+            self.misses += 1
+            return None
+        view = memoryview(mapping)
+        sections = []
+        try:
+            magic, version, stored_kind, count = struct.unpack_from(_HEADER, view, 0)
+            if magic != self.MAGIC or version != self.VERSION or stored_kind != kind:
+                raise ValueError("Not a cache entry of the expected kind")
+            offset = struct.calcsize(_HEADER)
+            for _ in range(count):
+                (length,) = struct.unpack_from('<I', view, offset)
+                offset += 4 + (-offset - 4) % 8
+                if offset + length > len(view):
+                    raise ValueError("Truncated cache entry")
+                sections.append(view[offset:offset + length])
+                offset += length
+        except (struct.error, ValueError):
+            _MappedEntry(mapping, view, sections).close()
+            self.errors += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _MappedEntry(mapping, view, sections)
+
+    @staticmethod
+    def _dump_cnf(grammar):
+        symbols = list(dict.fromkeys([grammar.S, *sorted(grammar.VN), *sorted(grammar.VT),
+                                      *(symbol for left, right in grammar.P for symbol in (left, *right))]))
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        meta = [len(grammar.VN), len(grammar.VT), len(grammar.P), grammar.next_new_nonterminal]
+        return [_strings(symbols), _ints(meta),
+                _ints(index[symbol] for symbol in sorted(grammar.VN)),
+                _ints(index[symbol] for symbol in sorted(grammar.VT)),
+                _ints(index[left] for left, _ in grammar.P),
+                _ints(len(right) for _, right in grammar.P),
+                _ints(index[symbol] for _, right in grammar.P for symbol in right)]
+
+    @staticmethod
+    def _load_cnf(sections):
+        symbols = _read_strings(sections[0])
+        _, _, count, next_new_nonterminal = _read_ints(sections[1])
+        VN = [symbols[i] for i in _read_ints(sections[2])]
+        VT = [symbols[i] for i in _read_ints(sections[3])]
+        lefts, lengths, rights = (_read_ints(section) for section in sections[4:7])
+        P = []
+        position = 0
+        for i in range(count):
+            length = lengths[i]
+            P.append((symbols[lefts[i]], tuple(symbols[s] for s in rights[position:position + length])))
+            position += length
+        grammar = Grammar(VN, VT, P, symbols[0])
+        grammar.next_new_nonterminal = next_new_nonterminal
+        return grammar
+
+    @staticmethod
+    def _dump_dfa(automaton):
+        states = list(dict.fromkeys([*automaton.Q, automaton.q0, *automaton.delta, *automaton.F,
+                                     *(target for moves in automaton.delta.values() for target in moves.values())]))
+        index = {state: i for i, state in enumerate(states)}
+        symbols = list(automaton.Alphabet)
+        table = []  # next state per (state, symbol), -1 where there is no transition
+        for state in states:
+            moves = automaton.delta.get(state, {})
+            for symbol in symbols:
+                table.append(index[moves[symbol]] if symbol in moves else -1)
+        meta = [len(automaton.Q), index[automaton.q0], len(symbols)]
+        return [_strings(states), _strings(symbols), _ints(meta), _ints(table),
+                _ints(index[state] for state in automaton.F),
+                _ints(index[state] for state in automaton.delta)]
+
+    @staticmethod
+    def _load_dfa(sections):
+        states = _read_strings(sections[0])
+        symbols = _read_strings(sections[1])
+        num_q, start, width = _read_ints(sections[2])
+        table = _read_ints(sections[3])
+        delta = {}
+        for i in _read_ints(sections[5]):
+            row = table[i * width:(i + 1) * width]
+            delta[states[i]] = {symbol: states[target] for symbol, target in zip(symbols, row) if target >= 0}
+        F = [states[i] for i in _read_ints(sections[4])]
+        return FiniteAutomaton.from_definition(states[:num_q], symbols, states[start], delta, F)
@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class CompiledDFA:
+    """
+    Dense integer form of a deterministic FiniteAutomaton.
+    States and symbols are numbered and table[state, symbol] holds the next
+    state. State 0 is an explicit dead state that missing transitions lead to.
+    Two extra symbol columns exist: UNKNOWN (a character outside the alphabet,
+    goes to the dead state) and PAD (padding after the end of a word, keeps the state).
+    """
+
+    def __init__(self, automaton):
+        states = [None]  # the dead state
+        state_id = {}
+        for state in [automaton.q0, *automaton.Q, *automaton.delta]:
+            if state not in state_id:
+                state_id[state] = len(states)
+                states.append(state)
+        self.states = states
+        self.symbols = list(automaton.Alphabet)
+        self.symbol_id = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.unknown = len(self.symbols)
+        self.pad = len(self.symbols) + 1
+
+        transitions = []
+        for state, moves in automaton.delta.items():
+            for symbol, target in moves.items():
+                if isinstance(target, (set, frozenset)):
+                    if len(target) > 1:
+                        raise ValueError(f"Automaton is not deterministic in state {state} on {symbol}")
+                    if not target:
+                        continue
+                    (target,) = target
+                if symbol not in self.symbol_id:
+                    continue
+                if target not in state_id:
+                    state_id[target] = len(states)
+                    states.append(target)
+                transitions.append((state_id[state], self.symbol_id[symbol], state_id[target]))
+
+        dtype = np.int32 if len(states) < 2 ** 31 else np.int64
+        self.table = np.zeros((len(states), len(self.symbols) + 2), dtype=dtype)
+        self.table[:, self.pad] = np.arange(len(states))
+        for source, symbol, target in transitions:
+            self.table[source, symbol] = target
+        self.start = state_id[automaton.q0]
+        self.accepting = np.zeros(len(states), dtype=np.bool_)
+        for state in automaton.F:
+            if state in state_id:
+                self.accepting[state_id[state]] = True
+
+        # character code -> symbol column, for single-character alphabets
+        codes = [ord(symbol) for symbol in self.symbols if len(symbol) == 1]
+        self.char_columns = np.full(max(codes + [255]) + 1, self.unknown, dtype=self.table.dtype)
+        for symbol, column in self.symbol_id.items():
+            if len(symbol) == 1:
+                self.char_columns[ord(symbol)] = column
+
+    def accepts(self, word) -> bool:
+        """Membership of a single word (a str or a sequence of symbols)."""
+        state = self.start
+        table, symbol_id, unknown = self.table, self.symbol_id, self.unknown
+        for symbol in word:
+            state = table[state, symbol_id.get(symbol, unknown)]
+            if state == 0:
+                return False
+        return bool(self.accepting[state])
+
+    def encode(self, words, pad=0):
+        """
+        Map a batch of words to a 2D array (word, position) of symbol columns.
+        words is a list of str (shorter words are padded) or a 2D uint8 array of
+        padded bytes; cells equal to pad become the PAD column.
+        """
+        if isinstance(words, np.ndarray) and words.dtype == np.uint8:
+            codes = words
+        else:
+            strings = np.asarray(words, dtype=str)
+            width = strings.dtype.itemsize // 4
+            codes = strings.view(np.uint32).reshape(len(strings), width)
+        limit = len(self.char_columns) - 1
+        columns = self.char_columns[np.minimum(codes, limit)]
+        if codes.max(initial=0) > limit:
+            columns[codes > limit] = self.unknown
+        columns[codes == pad] = self.pad
+        return columns
+
+    def accepts_batch(self, words, pad=0) -> np.ndarray:
+        """
+        Membership of many words at once, returned as a boolean mask.
+        All words advance in lockstep: one vectorized gather per character position.
+        """
+        if len(words) == 0:
+            return np.zeros(0, dtype=np.bool_)
+        # position-major, so every step reads one contiguous row
+        columns = np.ascontiguousarray(self.encode(words, pad).T)
+        flat = self.table.ravel()
+        width = self.table.shape[1]
+        states = np.full(columns.shape[1], self.start, dtype=self.table.dtype)
+        for position in range(columns.shape[0]):
+            states = flat.take(states * width + columns[position])
+        return self.accepting[states]
@@ -0,0 +1,189 @@
+from .parse_forest import ParseForest
+
+
+class CYKParser:
+    """
+    CYK recognizer and parser for a grammar in Chomsky normal form, such as the
+    output of ChomskyNormalForm.Grammar.to_cnf(): productions A → B C and A → a,
+    plus S → ε for the empty word.
+
+    The chart is kept bit-parallel. Nonterminals are numbered and, for every
+    start position i, ends[i][A] is an int whose bit j is set when A derives
+    word[i:j]. Rows are filled from the last position to the first; a newly
+    found span A = word[i:k] is combined with a production X → A C by OR-ing
+    the whole ends[k][C] bitmask into ends[i][X], so the inner loop is one big
+    int operation per production instead of a loop over end positions.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        nonterminals = sorted(set(grammar.VN) | {left for left, _ in grammar.P})
+        self.nonterminals = nonterminals
+        self.index = {symbol: i for i, symbol in enumerate(nonterminals)}
+        self.start = self.index.get(grammar.S)
+        self.terminal_rules = {}  # terminal -> [A, ...]
+        self.binary_rules = [[] for _ in nonterminals]  # B -> [(C, A), ...] for A → B C
+        self.accepts_empty = False
+        for left, right in grammar.P:
+            A = self.index[left]
+            if len(right) == 2 and right[0] in self.index and right[1] in self.index:
+                rule = (self.index[right[1]], A)
+                if rule not in self.binary_rules[self.index[right[0]]]:
+                    self.binary_rules[self.index[right[0]]].append(rule)
+            elif len(right) == 1 and right[0] == 'ε' and left == grammar.S:
+                self.accepts_empty = True
+            elif len(right) == 1 and right[0] not in self.index:
+                rules = self.terminal_rules.setdefault(right[0], [])
+                if A not in rules:
+                    rules.append(A)
+            else:
+                raise ValueError(f"Production {left} → {' '.join(right)} is not in Chomsky normal form")
+        self.rules_of = [[] for _ in nonterminals]  # A -> [(B, C), ...] for A → B C
+        for B, rules in enumerate(self.binary_rules):
+            for C, A in rules:
+                self.rules_of[A].append((B, C))
+        self.producers = {terminal: frozenset(rules) for terminal, rules in self.terminal_rules.items()}
+
+    def chart(self, word):
+        """The bitmask chart of word (a str or a sequence of terminals): ends[i][A] as described above."""
+        n = len(word)
+        width = len(self.nonterminals)
+        binary_rules = self.binary_rules
+        ends = [[0] * width for _ in range(n + 1)]
+        for i in range(n - 1, -1, -1):
+            row = ends[i]
+            pending = []
+            for A in self.terminal_rules.get(word[i], ()):
+                row[A] = 1 << (i + 1)
+                pending.append((A, 1 << (i + 1)))
+            while pending:
+                B, found = pending.pop()
+                rules = binary_rules[B]
+                if not rules:
+                    continue
+                while found:
+                    low = found & -found
+                    right_row = ends[low.bit_length() - 1]
+                    found ^= low
+                    for C, A in rules:
+                        new = right_row[C] & ~row[A]
+                        if new:
+                            row[A] |= new
+                            pending.append((A, new))
+        return ends
+
+    def recognize(self, word) -> bool:
+        """True if the grammar derives word."""
+        if not word:
+            return self.accepts_empty
+        if self.start is None:
+            return False
+        return bool(self.chart(word)[0][self.start] >> len(word) & 1)
+
+    def cell(self, ends, i, j):
+        """The nonterminals deriving word[i:j], read from a chart."""
+        return {symbol for symbol, A in self.index.items() if ends[i][A] >> j & 1}
+
+    def forest(self, word):
+        """
+        All parses of word as a ParseForest rooted at (S, 0, len(word)),
+        or None if word is not in the language.
+        """
+        n = len(word)
+        root = (self.grammar.S, 0, n)
+        forest = ParseForest(root)
+        if not word:
+            if not self.accepts_empty:
+                return None
+            forest.add(root)  # S → ε
+            return forest
+        if self.start is None:
+            return None
+        ends = self.chart(word)
+        if not ends[0][self.start] >> n & 1:
+            return None
+        nonterminals, rules_of, producers = self.nonterminals, self.rules_of, self.producers
+        # the transposed chart: bit i of starts[j][A] is set when A derives word[i:j]
+        starts = [[0] * len(nonterminals) for _ in range(n + 1)]
+        for i, row in enumerate(ends):
+            for A, found in enumerate(row):
+                while found:
+                    low = found & -found
+                    starts[low.bit_length() - 1][A] |= 1 << i
+                    found ^= low
+
+        pending = [(self.start, 0, n)]
+        seen = set(pending)
+        while pending:
+            A, i, j = pending.pop()
+            node = (nonterminals[A], i, j)
+            if j == i + 1 and A in producers.get(word[i], ()):
+                forest.add(node, [(word[i], i, j)])
+            for B, C in rules_of[A]:
+                # split points k: B derives word[i:k] and C derives word[k:j]
+                splits = ends[i][B] & starts[j][C]
+                while splits:
+                    low = splits & -splits
+                    k = low.bit_length() - 1
+                    splits ^= low
+                    forest.add(node, [(nonterminals[B], i, k), (nonterminals[C], k, j)])
+                    for child in ((B, i, k), (C, k, j)):
+                        if child not in seen:
+                            seen.add(child)
+                            pending.append(child)
+        return forest
+
+    def tree(self, word):
+        """
+        One parse tree of word, the same as forest(word).tree(), but read off the
+        chart directly: only the nodes of that tree are visited.
+        None if word is not in the language.
+        """
+        if not word:
+            return (self.grammar.S,) if self.accepts_empty else None
+        n = len(word)
+        if self.start is None:
+            return None
+        ends = self.chart(word)
+        if not ends[0][self.start] >> n & 1:
+            return None
+        rules_of, producers = self.rules_of, self.producers
+        chosen = {}
+        order = []
+        stack = [(self.start, 0, n)]
+        while stack:
+            node = stack.pop()
+            A, i, j = node
+            order.append(node)
+            if j == i + 1 and A in producers.get(word[i], ()):
+                chosen[node] = None
+                continue
+            for B, C in rules_of[A]:
+                splits = ends[i][B] & ((1 << j) - 1)
+                while splits:
+                    low = splits & -splits
+                    k = low.bit_length() - 1
+                    splits ^= low
+                    if ends[k][C] >> j & 1:
+                        chosen[node] = ((B, i, k), (C, k, j))
+                        stack.extend(reversed(chosen[node]))
+                        break
+                if node in chosen:
+                    break
+        built = {}
+        for node in reversed(order):
+            A, i, j = node
+            children = chosen[node]
+            if children is None:
+                built[node] = (self.nonterminals[A], word[i])
+            else:
+                built[node] = (self.nonterminals[A], built[children[0]], built[children[1]])
+        return built[(self.start, 0, n)]
+
+    def parse(self, word, forest=False):
+        """
+        A parse tree of word as nested (label, child, ...) tuples, or with
+        forest=True the ParseForest of all its parses. None if word is not in
+        the language.
+        """
+        return self.forest(word) if forest else self.tree(word)
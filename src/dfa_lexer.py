@@ -0,0 +1,430 @@
+import struct
+import sys
+from array import array
+
+from .finite_automation import FiniteAutomaton, hopcroft_partition
+from .lexer import TokenType, TOKEN_PATTERNS
+
+
+# Every ASCII character is a symbol of its own; non-ASCII characters are folded
+# into four categories, which is all the token patterns can tell apart.
+NON_ASCII_DIGIT = 128
+NON_ASCII_SPACE = 129
+NON_ASCII_WORD = 130
+NON_ASCII_OTHER = 131
+UNIVERSE = range(132)
+
+_ASCII_SPACE = frozenset(i for i in range(128) if chr(i).isspace())
+_ASCII_DIGITS = frozenset(range(ord('0'), ord('9') + 1))
+
+
+def _classify_non_ascii(char):
+    if char.isdecimal():
+        return NON_ASCII_DIGIT
+    if char.isspace():
+        return NON_ASCII_SPACE
+    if char.isalnum():
+        return NON_ASCII_WORD
+    return NON_ASCII_OTHER
+
+
+def _is_word(char):
+    return char.isalnum() or char == '_'
+
+
+class _PatternParser:
+    """
+    Parser for the regex subset used in TOKEN_PATTERNS: literals, escapes,
+    character classes, '.', groups, '|', '*', '+' and '?'.
+    Produces a tree of ('sym', charset), ('cat', [..]), ('alt', [..]),
+    ('star', node), ('plus', node), ('opt', node) tuples.
+    """
+
+    def __init__(self, pattern, ignore_case=True):
+        self.pattern = pattern
+        self.ignore_case = ignore_case
+        self.i = 0
+
+    def parse(self):
+        node = self.parse_alt()
+        if self.i != len(self.pattern):
+            raise ValueError(f"Unexpected '{self.pattern[self.i]}' in pattern {self.pattern!r}")
+        return node
+
+    def peek(self):
+        return self.pattern[self.i] if self.i < len(self.pattern) else None
+
+    def parse_alt(self):
+        options = [self.parse_seq()]
+        while self.peek() == '|':
+            self.i += 1
+            options.append(self.parse_seq())
+        return options[0] if len(options) == 1 else ('alt', options)
+
+    def parse_seq(self):
+        items = []
+        while self.peek() not in (None, '|', ')'):
+            items.append(self.parse_repeat())
+        return ('cat', items)
+
+    def parse_repeat(self):
+        node = self.parse_atom()
+        while self.peek() in ('*', '+', '?'):
+            node = ({'*': 'star', '+': 'plus', '?': 'opt'}[self.peek()], node)
+            self.i += 1
+        return node
+
+    def parse_atom(self):
+        char = self.peek()
+        self.i += 1
+        if char == '(':
+            if self.pattern.startswith('?:', self.i):
+                self.i += 2
+            node = self.parse_alt()
+            if self.peek() != ')':
+                raise ValueError(f"Unclosed group in pattern {self.pattern!r}")
+            self.i += 1
+            return node
+        if char == '[':
+            return ('sym', self.parse_class())
+        if char == '.':
+            return ('sym', frozenset(UNIVERSE) - {ord('\n')})
+        if char == '\\':
+            return ('sym', self.parse_escape())
+        return ('sym', self.literal(char))
+
+    def parse_escape(self):
+        char = self.peek()
+        self.i += 1
+        if char == 'd':
+            return _ASCII_DIGITS | {NON_ASCII_DIGIT}
+        if char == 's':
+            return _ASCII_SPACE | {NON_ASCII_SPACE}
+        if char == 'b':
+            raise ValueError(r"\b is only supported at the start or end of a token pattern")
+        return self.literal(char)
+
+    def parse_class(self):
+        negate = self.peek() == '^'
+        if negate:
+            self.i += 1
+        members = set()
+        while self.peek() != ']':
+            if self.peek() is None:
+                raise ValueError(f"Unclosed character class in pattern {self.pattern!r}")
+            char = self.peek()
+            self.i += 1
+            if char == '\\':
+                members |= self.parse_escape()
+                continue
+            if self.peek() == '-' and self.pattern[self.i + 1] != ']':
+                last = self.pattern[self.i + 1]
+                self.i += 2
+                for code in range(ord(char), ord(last) + 1):
+                    members |= self.literal(chr(code))
+            else:
+                members |= self.literal(char)
+        self.i += 1
+        return frozenset(UNIVERSE) - members if negate else frozenset(members)
+
+    def literal(self, char):
+        if ord(char) >= 128:
+            raise ValueError(f"Non-ASCII literal {char!r} is not supported")
+        if self.ignore_case and char.isalpha():
+            return frozenset({ord(char.lower()), ord(char.upper())})
+        return frozenset({ord(char)})
+
+
+class _Glushkov:
+    """Position automaton (epsilon-free NFA) of a parsed pattern."""
+
+    def __init__(self, tree):
+        self.charsets = []
+        self.follow = []
+        self.nullable, self.first, self.last = self.visit(tree)
+
+    def visit(self, node):
+        kind = node[0]
+        if kind == 'sym':
+            self.charsets.append(node[1])
+            self.follow.append(set())
+            position = len(self.charsets) - 1
+            return False, {position}, {position}
+        if kind == 'cat':
+            nullable, first, last = True, set(), set()
+            for child in node[1]:
+                c_nullable, c_first, c_last = self.visit(child)
+                for position in last:
+                    self.follow[position] |= c_first
+                if nullable:
+                    first |= c_first
+                last = last | c_last if c_nullable else c_last
+                nullable = nullable and c_nullable
+            return nullable, first, last
+        if kind == 'alt':
+            nullable, first, last = False, set(), set()
+            for child in node[1]:
+                c_nullable, c_first, c_last = self.visit(child)
+                nullable = nullable or c_nullable
+                first |= c_first
+                last |= c_last
+            return nullable, first, last
+        c_nullable, c_first, c_last = self.visit(node[1])
+        if kind in ('star', 'plus'):
+            for position in c_last:
+                self.follow[position] |= c_first
+        return c_nullable or kind in ('star', 'opt'), c_first, c_last
+
+
+class LexerTable:
+    """
+    Minimal DFA for a list of token patterns, stored as flat integer arrays.
+    State 0 is the dead state. transitions[state * num_classes + cls] is the next
+    state, accept[state] the token accepted in that state (-1 for none) and
+    accept_free[state] the best token that does not need a trailing word boundary.
+    """
+    MAGIC = b'DSLX'
+    VERSION = 1
+
+    def __init__(self, token_names, boundary, ascii_classes, non_ascii_classes,
+                 num_classes, start, transitions, accept, accept_free):
+        self.token_names = list(token_names)
+        self.token_types = [TokenType[name] for name in self.token_names]
+        self.boundary = boundary
+        self.ascii_classes = ascii_classes
+        self.non_ascii_classes = non_ascii_classes
+        self.num_classes = num_classes
+        self.start = start
+        self.transitions = transitions
+        self.accept = accept
+        self.accept_free = accept_free
+
+    @property
+    def num_states(self) -> int:
+        return len(self.accept)
+
+    def _class_of(self, char):
+        code = ord(char)
+        if code < 128:
+            return self.ascii_classes[code]
+        return self.non_ascii_classes[_classify_non_ascii(char) - 128]
+
+    def tokenize(self, text):
+        """
+        Tokenize text with maximal munch: the longest match wins and ties go to
+        the pattern listed first (so keywords beat identifiers).
+        """
+        tokens = []
+        transitions, num_classes = self.transitions, self.num_classes
+        accept, accept_free, boundary = self.accept, self.accept_free, self.boundary
+        ascii_classes, class_of = self.ascii_classes, self._class_of
+        token_types = self.token_types
+        keyword_sets = _keyword_sets(self.token_names)
+        pos, end = 0, len(text)
+        while pos < end:
+            state = self.start
+            i = pos
+            last_end = last_token = -1
+            while i < end:
+                code = ord(text[i])
+                state = transitions[state * num_classes + (ascii_classes[code] if code < 128 else class_of(text[i]))]
+                if state == 0:
+                    break
+                i += 1
+                token = accept[state]
+                if token >= 0 and boundary[token] and i < end and \
+                        _is_word(text[i - 1]) == _is_word(text[i]):
+                    token = accept_free[state]
+                if token >= 0:
+                    last_end, last_token = i, token
+            if last_token < 0:
+                tokens.append((TokenType.UNKNOWN, text[pos]))
+                pos += 1
+                continue
+            token_type = token_types[last_token]
+            value = text[pos:last_end]
+            keyword_set = keyword_sets[last_token]
+            if keyword_set is not None and value.upper() not in keyword_set:
+                token_type = TokenType.IDENTIFIER
+            if token_type != TokenType.WHITESPACE:
+                tokens.append((token_type, value))
+            pos = last_end
+        return tokens
+
+    def to_bytes(self) -> bytes:
+        """Serialize the table: a fixed header followed by the integer arrays."""
+        names = '\0'.join(self.token_names).encode('ascii')
+        transitions = array(_typecode(self.num_states), self.transitions)
+        header = struct.pack('<4sHcBHIIH', self.MAGIC, self.VERSION, sys.byteorder[0].encode(),
+                             transitions.itemsize, self.num_classes, self.num_states,
+                             self.start, len(names))
+        sections = [names, bytes(self.boundary), bytes(self.ascii_classes),
+                    bytes(self.non_ascii_classes), transitions.tobytes(),
+                    array('b', self.accept).tobytes(), array('b', self.accept_free).tobytes()]
+        out = bytearray(header)
+        for section in sections:
+            out += struct.pack('<I', len(section))
+            out += section
+            out += b'\0' * (-len(out) % 8)  # keep every array aligned
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'LexerTable':
+        """
+        Load a table produced by to_bytes. The integer arrays are memoryviews into
+        data (e.g. an mmap) when the byte order matches, so nothing is copied.
+        """
+        view = memoryview(data)
+        magic, version, order, itemsize, num_classes, num_states, start, _ = \
+            struct.unpack_from('<4sHcBHIIH', view, 0)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Not a lexer table or unsupported table version")
+        offset = struct.calcsize('<4sHcBHIIH')
+        sections = []
+        for _ in range(7):
+            (length,) = struct.unpack_from('<I', view, offset)
+            offset += 4
+            sections.append(view[offset:offset + length])
+            offset += length + (-offset - length) % 8
+        names, boundary, ascii_classes, non_ascii_classes, transitions, accept, accept_free = sections
+        typecode = _typecode(num_states) if itemsize == array(_typecode(num_states)).itemsize else None
+        if typecode is None:
+            raise ValueError("Transition table item size does not match this platform")
+        if order.decode() == sys.byteorder[0]:
+            transitions = transitions.cast(typecode)
+        else:
+            transitions = array(typecode, transitions.tobytes())
+            transitions.byteswap()
+        return cls(bytes(names).decode('ascii').split('\0'), boundary, ascii_classes,
+                   non_ascii_classes, num_classes, start, transitions,
+                   accept.cast('b'), accept_free.cast('b'))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> 'LexerTable':
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def _typecode(num_states):
+    return 'H' if num_states < 1 << 16 else 'I'
+
+
+def _keyword_sets(token_names):
+    keyword_sets = {token_type.name: keyword_set for token_type, _, keyword_set in TOKEN_PATTERNS}
+    return [keyword_sets.get(name) for name in token_names]
+
+
+def _strip_boundaries(pattern):
+    # A leading \b always holds at the start of a token (see lexer._master_pattern);
+    # a trailing \b is checked against the next character while scanning.
+    if pattern.startswith(r'\b'):
+        pattern = pattern[2:]
+    boundary = pattern.endswith(r'\b') and not pattern.endswith(r'\\b')
+    if boundary:
+        pattern = pattern[:-2]
+    return pattern, boundary
+
+
+def build_lexer_table(token_patterns=TOKEN_PATTERNS) -> LexerTable:
+    """
+    Compile token patterns into one minimal DFA. Each pattern is turned into a
+    position NFA, the NFAs are joined under a common start state, and the
+    project's subset construction (FiniteAutomaton.nfa_to_dfa) determinizes them.
+    """
+    token_names = []
+    boundary = []
+    automata = []
+    for token_type, pattern, _ in token_patterns:
+        pattern, needs_boundary = _strip_boundaries(pattern)
+        token_names.append(token_type.name)
+        boundary.append(needs_boundary)
+        automata.append(_Glushkov(_PatternParser(pattern).parse()))
+
+    # character classes: symbols that every position treats the same way
+    charsets = [cs for automaton in automata for cs in automaton.charsets]
+    class_ids = {}
+    symbol_class = [class_ids.setdefault(tuple(u in cs for cs in charsets), len(class_ids))
+                    for u in UNIVERSE]
+    num_classes = len(class_ids)
+    classes_of = [frozenset(symbol_class[u] for u in cs) for cs in charsets]
+
+    # one NFA over the classes; state names must not contain '_' (used in DFA labels)
+    delta = {'s': {}}
+    token_of, final = {}, set()
+    offset = 0
+    for token, automaton in enumerate(automata):
+        for p in range(len(automaton.charsets)):
+            name = f"p{offset + p}"
+            token_of[name] = token
+            if p in automaton.last:
+                final.add(name)
+            if p in automaton.first:
+                for c in classes_of[offset + p]:
+                    delta['s'].setdefault(c, set()).add(name)
+            transitions = delta.setdefault(name, {})
+            for q in automaton.follow[p]:
+                for c in classes_of[offset + q]:
+                    transitions.setdefault(c, set()).add(f"p{offset + q}")
+        offset += len(automaton.charsets)
+    nfa = FiniteAutomaton.from_definition(list(delta), list(range(num_classes)), 's', delta, sorted(final))
+    dfa = nfa.nfa_to_dfa()
+
+    def accepted(label):
+        tokens = sorted(token_of[p] for p in label.split('_') if p in final) if label != '∅' else []
+        free = [t for t in tokens if not boundary[t]]
+        return (tokens[0] if tokens else -1, free[0] if free else -1)
+
+    states = list(dfa.delta)
+    labels = {s: accepted(s) for s in states}
+    # minimize with the accepted tokens as the initial partition
+    blocks = {}
+    for s in states:
+        blocks.setdefault(labels[s], []).append(s)
+    block_of = hopcroft_partition(states, range(num_classes), dfa.delta, list(blocks.values()))
+
+    # live blocks get ids from 1 in discovery order, everything that cannot
+    # reach an accepting state collapses into the dead state 0
+    live = set()
+    changed = True
+    while changed:
+        changed = False
+        for s in states:
+            if block_of[s] not in live and (labels[s][0] >= 0 or
+                                            any(block_of[t] in live for t in dfa.delta[s].values())):
+                live.add(block_of[s])
+                changed = True
+    state_id = {}
+    for s in states:
+        if block_of[s] in live:
+            state_id.setdefault(block_of[s], len(state_id) + 1)
+    num_states = len(state_id) + 1
+    transitions = array(_typecode(num_states), [0]) * (num_states * num_classes)
+    accept = array('b', [-1]) * num_states
+    accept_free = array('b', [-1]) * num_states
+    for s in states:
+        if block_of[s] not in live:
+            continue
+        sid = state_id[block_of[s]]
+        accept[sid], accept_free[sid] = labels[s]
+        for c in range(num_classes):
+            target = block_of[dfa.delta[s][c]]
+            transitions[sid * num_classes + c] = state_id.get(target, 0)
+
+    return LexerTable(token_names, array('B', boundary), array('B', symbol_class[:128]),
+                      array('B', symbol_class[128:]), num_classes,
+                      state_id.get(block_of[dfa.q0], 0), transitions, accept, accept_free)
+
+
+_default_table = None
+
+
+def dfa_lexer(query):
+    """Tokenize a query with the table generated from TOKEN_PATTERNS."""
+    global _default_table
+    if _default_table is None:
+        _default_table = build_lexer_table()
+    return _default_table.tokenize(query)
@@ -0,0 +1,180 @@
+from collections import namedtuple
+
+from .parse_forest import ParseForest
+
+EarleyResult = namedtuple('EarleyResult', ['accepted', 'forest', 'items', 'item_counts'])
+EarleyResult.__doc__ = """
+Outcome of EarleyParser.parse: accepted tells whether the word is in the
+language, forest is its ParseForest (None if rejected or not requested),
+items the total number of Earley items built and item_counts the number of
+items in each Earley set.
+"""
+
+
+class EarleyParser:
+    """
+    Earley parser for an arbitrary context-free grammar given as a
+    ChomskyNormalForm.Grammar, used as-is: no CNF conversion, ε productions
+    written ('ε',) are allowed.
+
+    Items are (rule, dot, origin) triples. Nullable nonterminals are handled
+    as by Aycock and Horspool: predicting a nullable nonterminal also moves the
+    dot past it, so completions of empty spans are never missed.
+
+    The parse forest is built after recognition, walking the chart backwards
+    from the completed start item. It is binarized: a rule A → X1 ... Xm is
+    split into prefix nodes ((A, rule, d), i, k) for X1 ... Xd, each with
+    alternatives (prefix of length d-1, Xd), so any ambiguity is packed into
+    a forest of polynomial size.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.rules = []
+        self.rules_of = {}  # nonterminal -> [rule, ...]
+        for left, right in grammar.P:
+            right = () if tuple(right) == ('ε',) else tuple(right)
+            if (left, right) in self.rules:
+                continue
+            self.rules_of.setdefault(left, []).append(len(self.rules))
+            self.rules.append((left, right))
+        self.nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for left, right in self.rules:
+                if left not in self.nullable and all(symbol in self.nullable for symbol in right):
+                    self.nullable.add(left)
+                    changed = True
+
+    def _chart(self, word):
+        """Earley sets for word: a list of item lists, one per input position."""
+        rules, rules_of, nullable = self.rules, self.rules_of, self.nullable
+        n = len(word)
+        sets = [[] for _ in range(n + 1)]
+        members = [set() for _ in range(n + 1)]
+        for rule in rules_of.get(self.grammar.S, ()):
+            sets[0].append((rule, 0, 0))
+            members[0].add((rule, 0, 0))
+
+        waiting_at = []
+        for j in range(n + 1):
+            items, seen = sets[j], members[j]
+            waiting = {}  # nonterminal -> items of this set with the dot before it
+            predicted = set()
+            position = 0
+            while position < len(items):
+                item = items[position]
+                position += 1
+                rule, dot, origin = item
+                left, right = rules[rule]
+                if dot < len(right):
+                    symbol = right[dot]
+                    if symbol in rules_of:
+                        waiting.setdefault(symbol, []).append(item)
+                        if symbol not in predicted:
+                            predicted.add(symbol)
+                            for predicted_rule in rules_of[symbol]:
+                                new = (predicted_rule, 0, j)
+                                if new not in seen:
+                                    seen.add(new)
+                                    items.append(new)
+                        if symbol in nullable:
+                            new = (rule, dot + 1, origin)
+                            if new not in seen:
+                                seen.add(new)
+                                items.append(new)
+                    elif j < n and word[j] == symbol:
+                        new = (rule, dot + 1, origin)
+                        if new not in members[j + 1]:
+                            members[j + 1].add(new)
+                            sets[j + 1].append(new)
+                else:
+                    parents = (waiting if origin == j else waiting_at[origin]).get(left, ())
+                    for parent_rule, parent_dot, parent_origin in parents:
+                        new = (parent_rule, parent_dot + 1, parent_origin)
+                        if new not in seen:
+                            seen.add(new)
+                            items.append(new)
+            waiting_at.append(waiting)
+        return sets, members
+
+    def _accepted(self, sets, n):
+        start = self.grammar.S
+        return any(origin == 0 and dot == len(self.rules[rule][1]) and self.rules[rule][0] == start
+                   for rule, dot, origin in sets[n])
+
+    def recognize(self, word) -> bool:
+        """True if the grammar derives word (a str or a sequence of terminals)."""
+        sets, _ = self._chart(word)
+        return self._accepted(sets, len(word))
+
+    def parse(self, word, forest=True) -> EarleyResult:
+        """Recognize word and, if it is accepted and forest is true, build its parse forest."""
+        sets, members = self._chart(word)
+        n = len(word)
+        accepted = self._accepted(sets, n)
+        counts = tuple(len(items) for items in sets)
+        result_forest = self._forest(word, sets, members) if accepted and forest else None
+        return EarleyResult(accepted, result_forest, sum(counts), counts)
+
+    def _forest(self, word, sets, members):
+        rules, rules_of = self.rules, self.rules_of
+        n = len(word)
+        # completed[k][A]: origins i such that A derives word[i:k], in discovery order
+        completed = []
+        for items in sets:
+            by_symbol = {}
+            for rule, dot, origin in items:
+                left, right = rules[rule]
+                if dot == len(right):
+                    by_symbol.setdefault(left, {})[origin] = None
+            completed.append(by_symbol)
+
+        forest = ParseForest((self.grammar.S, 0, n))
+        pending = [forest.root]
+        seen = {forest.root}
+
+        def visit(node):
+            if node not in seen and (isinstance(node[0], tuple) or node[0] in rules_of):
+                seen.add(node)
+                pending.append(node)
+            return node
+
+        def prefix(rule, dot, i, k):
+            # node for the first dot symbols of rule, spanning word[i:k]
+            if dot == 1:
+                return visit((rules[rule][1][0], i, k))
+            return visit(((rules[rule][0], rule, dot), i, k))
+
+        def splits(node, rule, dot, i, j):
+            # alternatives (prefix of dot-1 symbols, last symbol) for the first dot symbols of rule
+            symbol = rules[rule][1][dot - 1]
+            if symbol in rules_of:
+                middles = [k for k in completed[j].get(symbol, ()) if k >= i]
+            elif j > 0 and word[j - 1] == symbol:
+                middles = [j - 1]
+            else:
+                middles = []
+            for k in middles:
+                if (rule, dot - 1, i) in members[k]:
+                    forest.add(node, [prefix(rule, dot - 1, i, k), visit((symbol, k, j))])
+
+        while pending:
+            node = pending.pop()
+            label, i, j = node
+            if isinstance(label, tuple):
+                _, rule, dot = label
+                splits(node, rule, dot, i, j)
+                continue
+            for rule in rules_of[label]:
+                length = len(rules[rule][1])
+                if (rule, length, i) not in members[j]:
+                    continue
+                if length == 0:
+                    forest.add(node, ())
+                elif length == 1:
+                    forest.add(node, [visit((rules[rule][1][0], i, j))])
+                else:
+                    splits(node, rule, length, i, j)
+        return forest
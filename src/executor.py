@@ -0,0 +1,190 @@
+from functools import reduce
+
+import numpy as np
+
+from .ast import ASTNode, ASTNodeType, literal_value, like_pattern
+from .parser import sql_parser
+from .predicate import _ARITHMETIC, _number
+
+# operators that can appear in a BINARY_OPERATION, as NumPy ufuncs
+OPERATORS = {
+    '=': np.equal,
+    '!=': np.not_equal,
+    '<>': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': np.divide,
+}
+
+LOGICAL_OPERATORS = {
+    'AND': np.logical_and,
+    'OR': np.logical_or,
+}
+
+# operators that compare values of different types as unequal instead of failing
+_EQUALITY = {'=', '!=', '<>'}
+
+
+def like(values, pattern):
+    """
+    Vectorized SQL LIKE. Prefix, suffix and substring patterns use np.char;
+    other patterns fall back to a regex per element.
+    """
+    if not isinstance(pattern, str):
+        raise ValueError("The pattern of LIKE must be a string literal")
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return np.bool_(like_pattern(pattern).fullmatch(str(values)) is not None)
+    if values.dtype.kind not in 'US':
+        values = values.astype(str)
+    core = pattern.strip('%')
+    if '_' not in pattern and '%' not in core:
+        starts, ends = pattern.startswith('%'), pattern.endswith('%') and len(pattern) > 1
+        if starts and ends:
+            return np.char.find(values, core) >= 0
+        if ends:
+            return np.char.startswith(values, core)
+        if starts:
+            return np.char.endswith(values, core)
+        return values == core
+    match = like_pattern(pattern).fullmatch
+    return np.fromiter((match(value) is not None for value in values.tolist()),
+                       dtype=np.bool_, count=len(values))
+
+
+def _numbers(values):
+    """
+    Column values compared with (or computed with) a numeric literal: str
+    cells are converted like predicate._number, so str-celled tables (e.g.
+    loaded from CSV) compare like typed ones. Typed columns and literals are
+    unchanged.
+    """
+    if not isinstance(values, np.ndarray) or values.ndim == 0 or values.dtype.kind not in 'UO':
+        return values
+    cells = [_number(value) if value.__class__ is str else value for value in values.tolist()]
+    if any(cell.__class__ is str for cell in cells):
+        # cells that do not spell a number stay str, as in filter_rows
+        return np.array(cells, dtype=object)
+    return np.array(cells)
+
+
+class Executor:
+    """
+    Runs parsed SELECT statements against in-memory columnar tables.
+    A table is a dict of equally long NumPy arrays, one per column; WHERE
+    conditions are evaluated on whole columns at once into a boolean mask.
+    """
+
+    def __init__(self):
+        self.tables = {}
+
+    def register_table(self, name, columns):
+        """Register a table given as {column name: array-like}. NumPy arrays are used without copying."""
+        arrays = {column: np.asarray(values) for column, values in columns.items()}
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of table {name} have different lengths")
+        self.tables[name] = arrays
+
+    def execute(self, query):
+        """
+        Run a query (SQL text or a SELECT_STATEMENT AST) and return the result as
+        {column name: array}. Without a WHERE clause the columns are the registered
+        arrays themselves; otherwise each selected column is gathered once by the mask.
+        """
+        ast = sql_parser(query) if isinstance(query, str) else query
+        if ast is None or ast.node_type != ASTNodeType.SELECT_STATEMENT:
+            raise ValueError("Only SELECT statements can be executed")
+        columns_node, table_node = ast.children[0], ast.children[1]
+        if table_node.value not in self.tables:
+            raise ValueError(f"Unknown table: {table_node.value}")
+        table = self.tables[table_node.value]
+
+        names = [column.value for column in columns_node.children] or list(table)
+        for name in names:
+            if name not in table:
+                raise ValueError(f"Unknown column: {name}")
+
+        if len(ast.children) < 3:
+            return {name: table[name] for name in names}
+        mask = self.evaluate(ast.children[2], table)
+        if mask.dtype != np.bool_:
+            raise ValueError("WHERE clause is not a boolean condition")
+        if mask.ndim == 0:  # condition without columns, e.g. 1 = 1
+            return {name: table[name] if mask else table[name][:0] for name in names}
+        return {name: table[name][mask] for name in names}
+
+    def evaluate(self, node: ASTNode, table):
+        """
+        Evaluate an expression tree on whole columns.
+        Children are evaluated before their parent with an explicit stack,
+        so deeply nested conditions do not recurse.
+        """
+        # values holds (value, is_number) pairs; is_number marks numeric
+        # literals and arithmetic on them, which str columns are converted for
+        values = []
+        stack = [(node, False)]
+        while stack:
+            current, ready = stack.pop()
+            if current.children and not ready:
+                stack.append((current, True))
+                stack.extend((child, False) for child in reversed(current.children))
+                continue
+            count = len(current.children)
+            args = values[len(values) - count:]
+            del values[len(values) - count:]
+            values.append(self._apply(current, args, table))
+        return np.asarray(values[0][0])
+
+    def _apply(self, node, args, table):
+        """(value, is_number) of node, given those of its children."""
+        node_type = node.node_type
+        if node_type == ASTNodeType.LITERAL:
+            value = literal_value(node.value)
+            return value, isinstance(value, (int, float))
+        if node_type == ASTNodeType.BINARY_OPERATION and node.value in OPERATORS:
+            (left, left_number), (right, right_number) = args
+            if right_number and not left_number:
+                left = _numbers(left)
+            elif left_number and not right_number:
+                right = _numbers(right)
+            is_number = node.value in _ARITHMETIC and (left_number or right_number)
+            return self._operate(node.value, left, right), is_number
+        return self._value(node, [value for value, _ in args], table), False
+
+    @staticmethod
+    def _operate(operator, left, right):
+        try:
+            return OPERATORS[operator](left, right)
+        except TypeError as error:  # numpy's UFuncTypeError, or a str cell met a number
+            if operator in _EQUALITY:
+                # values of different types are unequal, as in Python
+                return OPERATORS[operator](np.asarray(left, dtype=object), np.asarray(right, dtype=object))
+            raise ValueError(f"Cannot apply {operator} to {_describe(left)} and {_describe(right)}") from error
+
+    def _value(self, node, args, table):
+        node_type = node.node_type
+        if node_type == ASTNodeType.IDENTIFIER:
+            if node.value not in table:
+                raise ValueError(f"Unknown column: {node.value}")
+            return table[node.value]
+        if node_type == ASTNodeType.LOGICAL_OPERATION:
+            return reduce(LOGICAL_OPERATORS[node.value], args)
+        if node_type == ASTNodeType.BINARY_OPERATION:
+            if node.value == 'LIKE':
+                return like(args[0], args[1])
+            raise ValueError(f"Unsupported operator: {node.value}")
+        if node_type in (ASTNodeType.WHERE_CLAUSE, ASTNodeType.CONDITION):
+            return args[0]
+        raise ValueError(f"Cannot evaluate {node_type.name}")
+
+
+def _describe(value):
+    value = np.asarray(value)
+    kind = 'values' if value.ndim else 'value'
+    return f"{value.dtype.name if value.dtype != object else 'mixed'} {kind}"
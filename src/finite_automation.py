@@ -1,5 +1,52 @@
+import time
+from collections import deque
+
+from src import instrumentation
 from src.grammar import Grammar
 
+# delta symbol of an ε-transition (a move that reads no input)
+EPSILON = 'ε'
+
+
+def hopcroft_partition(states, alphabet, delta, blocks) -> dict:
+    """
+    Hopcroft's partition refinement for a complete DFA.
+    Starting from the initial blocks (e.g. final / non-final states), splits
+    blocks until every block agrees on the block reached by each symbol.
+    Runs in O(n·k·log n). Returns a dict mapping every state to its block number.
+    """
+    predecessors = {symbol: {} for symbol in alphabet}
+    for state in states:
+        for symbol in alphabet:
+            predecessors[symbol].setdefault(delta[state][symbol], []).append(state)
+
+    partition = [set(block) for block in blocks if block]
+    block_of = {state: i for i, block in enumerate(partition) for state in block}
+    waiting = set(range(len(partition)))
+    while waiting:
+        splitter = list(partition[waiting.pop()])
+        for symbol in alphabet:
+            # states leading into the splitter, grouped by their block
+            hits = {}
+            for target in splitter:
+                for state in predecessors[symbol].get(target, ()):
+                    hits.setdefault(block_of[state], []).append(state)
+            for i, moved in hits.items():
+                if len(moved) == len(partition[i]):
+                    continue
+                # the states that lead into the splitter move to a new block
+                new = len(partition)
+                partition.append(set(moved))
+                partition[i].difference_update(moved)
+                for state in moved:
+                    block_of[state] = new
+                if i in waiting or len(partition[new]) <= len(partition[i]):
+                    waiting.add(new)
+                else:
+                    waiting.add(i)
+    return block_of
+
+
 class FiniteAutomaton:
     def __init__(self, grammar: Grammar, _delta: dict) -> None:
         self.Q = grammar.nonterminals + ['X']
@@ -26,6 +73,19 @@ class FiniteAutomaton:
             state = self.delta[state][char]
         return state in self.F
 
+    def compile(self):
+        """
+        Return a CompiledDFA: the automaton as a dense NumPy transition table,
+        with batch membership testing (needs NumPy).
+        """
+        from src.compiled_automaton import CompiledDFA
+        return CompiledDFA(self)
+
+    def sampler(self):
+        """A DFASampler drawing uniform words of a given length (needs NumPy)."""
+        from src.sampling import DFASampler
+        return DFASampler(self)
+
 ### lab2 ###
     @classmethod
     def from_definition(cls, Q: list, Alphabet: list, q0: str, delta: dict, F: list) -> 'FiniteAutomaton':
@@ -50,6 +110,8 @@ class FiniteAutomaton:
         for state in self.Q:
             if state in self.delta:
                 for symbol, targets in self.delta[state].items():
+                    if symbol == EPSILON:
+                        return False
                     # If targets is a set, check its size.
                     if isinstance(targets, set) and len(targets) > 1:
                         return False
@@ -62,60 +124,181 @@ class FiniteAutomaton:
         return '_'.join(sorted(state_set))
 
 
-    def nfa_to_dfa(self) -> 'FiniteAutomaton':
+    def _bit_tables(self):
+        """
+        Number the NFA states and encode sets of them as int bitmasks.
+        Returns (names, moves, final_mask, start): names[i] is the state of bit i,
+        moves[symbol][i] the bitmask of states reached from state i on symbol and
+        start the bitmask of the start states. ε-transitions are folded in:
+        start and every moves entry are already closed under ε.
+        """
+        names = list(dict.fromkeys([self.q0, *self.Q, *self.delta]))
+        index = {name: i for i, name in enumerate(names)}
+        moves = {symbol: [0] * len(names) for symbol in self.Alphabet}
+        epsilon = {}
+        for state, transitions in self.delta.items():
+            for symbol, targets in transitions.items():
+                if symbol not in moves and symbol != EPSILON:
+                    continue
+                if not isinstance(targets, (set, frozenset)):
+                    targets = (targets,)
+                mask = 0
+                for target in targets:
+                    if target not in index:
+                        index[target] = len(names)
+                        names.append(target)
+                        for row in moves.values():
+                            row.append(0)
+                    mask |= 1 << index[target]
+                if symbol == EPSILON:
+                    epsilon[index[state]] = mask
+                else:
+                    moves[symbol][index[state]] = mask
+        final_mask = 0
+        for state in self.F:
+            if state in index:
+                final_mask |= 1 << index[state]
+        start = 1 << index[self.q0]
+        if epsilon:
+            closure = self._epsilon_closures(len(names), epsilon)
+            step = self._step
+            for row in moves.values():
+                for i, mask in enumerate(row):
+                    if mask:
+                        row[i] = step(mask, closure)
+            start = closure[index[self.q0]]
+        return names, moves, final_mask, start
+
+    @staticmethod
+    def _epsilon_closures(count, epsilon):
+        """closure[i]: bitmask of the states reachable from state i by ε-transitions alone."""
+        closure = []
+        for i in range(count):
+            reached = 1 << i
+            pending = [i]
+            while pending:
+                mask = epsilon.get(pending.pop(), 0) & ~reached
+                reached |= mask
+                while mask:
+                    low = mask & -mask
+                    pending.append(low.bit_length() - 1)
+                    mask ^= low
+            closure.append(reached)
+        return closure
+
+    @staticmethod
+    def _step(mask, row):
+        """Union of row[i] over the bits i set in mask."""
+        target = 0
+        while mask:
+            low = mask & -mask
+            target |= row[low.bit_length() - 1]
+            mask ^= low
+        return target
+
+    def nfa_to_dfa(self, minimize=False) -> 'FiniteAutomaton':
         """
         Converts an NFA (where delta maps to sets of states) into an equivalent DFA.
-        Uses the subset (powerset) construction.
+        Uses the subset (powerset) construction; with minimize=True the result
+        is reduced to the minimal DFA.
+        Sets of NFA states are int bitmasks and the worklist is a deque, so only
+        newly discovered DFA states get a label.
         """
-        dfa_delta = {}  # will map state_label -> {symbol: state_label}
-        state_mapping = {}  # maps frozenset of NFA states to state label
-        new_states = []  # queue for processing
+        started = time.perf_counter() if instrumentation.enabled else None
+        names, moves, final_mask, start = self._bit_tables()
+        step = self._step
+
+        def label(mask):
+            return self._state_label(frozenset(names[i] for i in range(len(names)) if mask >> i & 1))
 
-        start_set = frozenset([self.q0])
-        start_label = self._state_label(start_set)
-        state_mapping[start_set] = start_label
-        dfa_states = [start_set]
-        new_states.append(start_set)
+        dfa_delta = {}  # will map state_label -> {symbol: state_label}
+        state_mapping = {}  # maps bitmask of NFA states to state label
+        state_mapping[start] = label(start)
+        new_states = deque([start])
 
         while new_states:
-            current = new_states.pop(0)
-            current_label = state_mapping[current]
-            dfa_delta[current_label] = {}
+            current = new_states.popleft()
+            transitions = dfa_delta[state_mapping[current]] = {}
             for symbol in self.Alphabet:
-                target_set = set()
-                for nfa_state in current:
-                    if nfa_state in self.delta and symbol in self.delta[nfa_state]:
-                        targets = self.delta[nfa_state][symbol]
-                        # Ensure we add targets whether targets is a set or a single state.
-                        if isinstance(targets, set):
-                            target_set |= targets
-                        else:
-                            target_set.add(targets)
-                target_set = frozenset(target_set)
-                if target_set:
-                    if target_set not in state_mapping:
-                        state_mapping[target_set] = self._state_label(target_set)
-                        dfa_states.append(target_set)
-                        new_states.append(target_set)
-                    dfa_delta[current_label][symbol] = state_mapping[target_set]
-                else:
-                    # Optionally add a sink state (here labeled as ∅)
-                    sink = frozenset()
-                    if sink not in state_mapping:
-                        state_mapping[sink] = '∅'
-                        dfa_states.append(sink)
-                        # Sink state loops to itself on all symbols.
+                target = step(current, moves[symbol])
+                if target not in state_mapping:
+                    state_mapping[target] = label(target)
+                    if target:
+                        new_states.append(target)
+                    else:
+                        # Sink state (labeled ∅) loops to itself on all symbols.
                         dfa_delta['∅'] = {s: '∅' for s in self.Alphabet}
-                    dfa_delta[current_label][symbol] = '∅'
+                transitions[symbol] = state_mapping[target]
 
-        # Build DFA Q, q0, and F:
         dfa_Q = list(state_mapping.values())
-        dfa_q0 = state_mapping[start_set]
-        dfa_F = []
-        for state_set, label in state_mapping.items():
-            if any(s in self.F for s in state_set):
-                dfa_F.append(label)
-        return FiniteAutomaton.from_definition(dfa_Q, self.Alphabet, dfa_q0, dfa_delta, dfa_F)
+        dfa_F = [label for mask, label in state_mapping.items() if mask & final_mask]
+        dfa = FiniteAutomaton.from_definition(dfa_Q, self.Alphabet, state_mapping[start], dfa_delta, dfa_F)
+        if started is not None:
+            instrumentation.count('automaton.dfa_states', len(dfa_Q))
+            instrumentation.add_time('automaton.nfa_to_dfa', time.perf_counter() - started)
+        return dfa.minimize() if minimize else dfa
+
+    def lazy_dfa(self, max_states=1024, max_flushes=8) -> 'LazyDFA':
+        """Matcher that determinizes this NFA on demand, see LazyDFA."""
+        return LazyDFA(self, max_states, max_flushes)
+
+
+    def minimize(self) -> 'FiniteAutomaton':
+        """
+        Returns the minimal DFA equivalent to this (deterministic) automaton.
+        Unreachable states are removed first, then equivalent states are merged
+        with Hopcroft's algorithm. Each merged state keeps the label of its
+        first member in breadth-first order, so q0 keeps its name.
+        """
+        def target(state, symbol):
+            moves = self.delta.get(state, {})
+            if symbol not in moves:
+                return None
+            result = moves[symbol]
+            if isinstance(result, (set, frozenset)):
+                if len(result) > 1:
+                    raise ValueError("minimize() needs a deterministic automaton")
+                return next(iter(result), None)
+            return result
+
+        # reachable states in breadth-first order; None is the implicit dead state
+        order = [self.q0]
+        seen = {self.q0}
+        for state in order:
+            for symbol in self.Alphabet:
+                next_state = target(state, symbol)
+                if next_state is not None and next_state not in seen:
+                    seen.add(next_state)
+                    order.append(next_state)
+
+        delta = {state: {symbol: target(state, symbol) for symbol in self.Alphabet}
+                 for state in order}
+        delta[None] = {symbol: None for symbol in self.Alphabet}
+        states = order + [None]
+        final = set(self.F)
+        block_of = hopcroft_partition(states, self.Alphabet, delta,
+                                      [[s for s in states if s in final],
+                                       [s for s in states if s not in final]])
+
+        representative = {}
+        for state in states:
+            representative.setdefault(block_of[state], state)
+        # the implicit dead state only survives as None (a missing transition);
+        # if the input has a dead state of its own, like the ∅ sink, that one is kept
+        new_delta = {}
+        for state in order:
+            if representative[block_of[state]] != state:
+                continue
+            moves = {}
+            for symbol in self.Alphabet:
+                next_state = representative[block_of[delta[state][symbol]]]
+                if next_state is not None:
+                    moves[symbol] = next_state
+            new_delta[state] = moves
+        new_Q = [state for state in order if representative[block_of[state]] == state]
+        new_F = [state for state in new_Q if state in final]
+        return FiniteAutomaton.from_definition(new_Q, self.Alphabet, representative[block_of[self.q0]],
+                                               new_delta, new_F)
 
 
     def to_regular_grammar(self) -> Grammar:
@@ -137,3 +320,68 @@ class FiniteAutomaton:
         return Grammar(self.Q, self.Alphabet, productions, self.q0)
 
 
+class LazyDFA:
+    """
+    Matches words against an NFA, building DFA states only when the input
+    reaches them. DFA states (bitmasks of NFA states) and their transitions are
+    kept in a cache of at most max_states entries that is flushed when full.
+    If one word causes more than max_flushes flushes the cache is thrashing,
+    and the rest of that word is matched by stepping the NFA state set directly.
+    """
+
+    def __init__(self, nfa: FiniteAutomaton, max_states=1024, max_flushes=8):
+        names, moves, self.final_mask, self.start = nfa._bit_tables()
+        self.symbols = list(nfa.Alphabet)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.moves = [moves[symbol] for symbol in self.symbols]
+        self.max_states = max_states
+        self.max_flushes = max_flushes
+        self.cache = {}  # bitmask -> list of next bitmasks per symbol (None = not built yet)
+        self.states_built = 0
+        self.flushes = 0
+        self.fallbacks = 0
+
+    def matches(self, word) -> bool:
+        """True if the NFA accepts word (a str or a sequence of symbols)."""
+        cache, moves, symbol_index = self.cache, self.moves, self.symbol_index
+        step = FiniteAutomaton._step
+        width = len(self.symbols)
+        flushes = 0
+        state = self.start
+        for position, symbol in enumerate(word):
+            i = symbol_index.get(symbol)
+            if i is None:
+                return False
+            row = cache.get(state)
+            if row is None:
+                if len(cache) >= self.max_states:
+                    cache.clear()
+                    self.flushes += 1
+                    flushes += 1
+                    if flushes > self.max_flushes:
+                        self.fallbacks += 1
+                        return self._simulate(state, word[position:])
+                row = cache[state] = [None] * width
+                self.states_built += 1
+            next_state = row[i]
+            if next_state is None:
+                next_state = row[i] = step(state, moves[i])
+            if not next_state:
+                return False
+            state = next_state
+        return bool(state & self.final_mask)
+
+    def _simulate(self, state, rest) -> bool:
+        step, moves, symbol_index = FiniteAutomaton._step, self.moves, self.symbol_index
+        for symbol in rest:
+            i = symbol_index.get(symbol)
+            if i is None:
+                return False
+            state = step(state, moves[i])
+            if not state:
+                return False
+        return bool(state & self.final_mask)
+
+    def cache_info(self) -> dict:
+        return {'states': len(self.cache), 'states_built': self.states_built,
+                'flushes': self.flushes, 'fallbacks': self.fallbacks}
@@ -1,4 +1,9 @@
 import random
+from concurrent.futures import ProcessPoolExecutor
+
+# words derived per task by write_corpus
+CORPUS_BLOCK_SIZE = 1 << 16
+
 
 class Grammar:
     def __init__(self, _VN: list, _VT: list, _P: dict, _S: str) -> None:
@@ -8,24 +13,108 @@ class Grammar:
         self.start = _S
 
     def generate_string(self, word=None) -> str:
-        current_word = self.start if word is None else word
-        while not self.terminal_word(current_word):
-            for char in current_word:
-                if char in self.productions:
-                    production = random.choice(self.productions[char])
-                    current_word = current_word.replace(char, production, 1)
-                    break  # only replace the first non-terminal occurrence per step
-        return current_word
+        # leftmost derivation, drawing from the global random module
+        return DerivationEngine(self).derive(word)
 
     def terminal_word(self, word: str) -> bool:
         return all(char in self.terminals for char in word)
 
     def generate_words(self, num_strings=5) -> list:
+        engine = DerivationEngine(self)
         words = set()
         while len(words) < num_strings:
-            words.add(self.generate_string())
+            words.add(engine.derive())
         return list(words)
 
+    def write_corpus(self, path, n, seed=0, workers=None, block_size=CORPUS_BLOCK_SIZE) -> int:
+        """
+        Write n random words (with repetitions) to path, one per line.
+        Words are derived in blocks of block_size on a ProcessPoolExecutor
+        (workers=None: one per CPU, 1: in this process). Block i draws from
+        random.Random(f"{seed}:{i}"), so the file only depends on seed, n and
+        block_size, not on the number of workers. Returns the number of words.
+        """
+        blocks = [(self, f"{seed}:{i}", min(block_size, n - start))
+                  for i, start in enumerate(range(0, n, block_size))]
+        with open(path, 'w', encoding='utf-8') as f:
+            if workers == 1:
+                f.writelines(map(_corpus_block, blocks))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    f.writelines(executor.map(_corpus_block, blocks))
+        return n
+
+    def split_symbols(self, production: str) -> tuple:
+        """
+        Split a right side into its symbols, taking the longest nonterminal or
+        terminal at each position, so multi-character names such as the states
+        'q10' of to_regular_grammar stay whole. Other characters are terminals
+        of their own and "ε" stands for the empty string.
+        """
+        return _split_symbols(production, *self._symbol_table())
+
+    def _symbol_table(self):
+        """The symbol names and their distinct lengths, longest first, for _split_symbols."""
+        names = set(self.nonterminals) | set(self.productions) | set(self.terminals)
+        return names, sorted({len(name) for name in names if name}, reverse=True)
+
+    def enumerate_words(self, max_length: int):
+        """
+        Yield every word of the language with at most max_length characters,
+        shortest first and in lexicographic order within a length, each once.
+        Terminates on finite and infinite languages alike.
+        Words are built bottom-up: for length n = 0, 1, ... the words of
+        length n of every nonterminal are derived from the (memoized) shorter
+        words of the symbols on its right sides, repeating until nothing new
+        appears (unit and ε-productions can feed words of length n back in).
+        The words of one length are yielded before the next length is built.
+        """
+        nonterminals = set(self.nonterminals) | set(self.productions)
+        symbol_table = self._symbol_table()
+        rules = [(left, _split_symbols(production, *symbol_table))
+                 for left, productions in self.productions.items() for production in productions]
+        words = {symbol: [] for symbol in nonterminals}  # words[A][n]: words of length n derived from A
+        suffixes = {}  # (rule, position, n) -> words of length n derived from the rule's symbols from position on
+
+        def symbol_words(symbol, n):
+            if symbol in nonterminals:
+                level = words[symbol]
+                return level[n] if n < len(level) else ()
+            return (symbol,) if len(symbol) == n else ()
+
+        def suffix_words(rule, position, n, current):
+            # levels below current are final and memoized, level current is still growing
+            key = (rule, position, n)
+            if n < current and key in suffixes:
+                return suffixes[key]
+            symbols = rules[rule][1]
+            if position == len(symbols):
+                result = {''} if n == 0 else set()
+            else:
+                result = set()
+                for m in range(n + 1):
+                    heads = symbol_words(symbols[position], m)
+                    if not heads:
+                        continue
+                    tails = suffix_words(rule, position + 1, n - m, current)
+                    result.update(head + tail for head in heads for tail in tails)
+            if n < current:
+                suffixes[key] = result
+            return result
+
+        for n in range(max_length + 1):
+            for level in words.values():
+                level.append(set())
+            changed = True
+            while changed:
+                changed = False
+                for rule, (left, _) in enumerate(rules):
+                    new_words = suffix_words(rule, 0, n, n) - words[left][n]
+                    if new_words:
+                        words[left][n] |= new_words
+                        changed = True
+            yield from sorted(symbol_words(self.start, n))
+
     ### lab2 ###
     def classify(self) -> str:
         """
@@ -49,4 +138,98 @@ class Grammar:
                         return "Not Regular"
                 else:
                     return "Not Regular"
-        return "Regular (Type-3)"
\ No newline at end of file
+        return "Regular (Type-3)"
+
+
+def _split_symbols(production, names, lengths) -> tuple:
+    if production == "ε":
+        return ()
+    symbols = []
+    pos = 0
+    while pos < len(production):
+        for length in lengths:
+            if production[pos:pos + length] in names:
+                break
+        else:
+            length = 1
+        symbols.append(production[pos:pos + length])
+        pos += length
+    return tuple(symbols)
+
+
+class DerivationEngine:
+    """
+    Random leftmost derivations with an explicit stack instead of rewriting
+    the sentential form. Nonterminals are interned to int ids and every
+    production is precompiled, reversed, into a tuple of nonterminal ids and
+    runs of terminal text, so a derivation costs O(1) per symbol and builds
+    the word once with str.join.
+    Right sides are split by Grammar.split_symbols (longest match, "ε" is
+    empty). Without a seed the global random module is used, which makes
+    derive() give the same words as the original rewriting generate_string.
+    """
+
+    def __init__(self, grammar: Grammar, seed=None):
+        self.grammar = grammar
+        self.rng = random if seed is None else random.Random(seed)
+        self.ids = {}
+        self.names = []
+        self.rules = []  # rules[id]: the compiled productions of a nonterminal, [] if it has none
+        self._symbols = grammar._symbol_table()
+        for nonterminal in grammar.productions:
+            self._intern(nonterminal)
+        for nonterminal, productions in grammar.productions.items():
+            self.rules[self.ids[nonterminal]] = [self._compile(production) for production in productions]
+        self.start_items = self._compile(grammar.start)
+
+    def _intern(self, symbol) -> int:
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.ids[symbol] = len(self.names)
+            self.names.append(symbol)
+            self.rules.append([])
+        return symbol_id
+
+    def _compile(self, production) -> tuple:
+        """A production as stack items in push order: nonterminal ids and runs of terminal text."""
+        items = []
+        text = []
+        terminals = self.grammar.terminals
+        for symbol in _split_symbols(production, *self._symbols):
+            if symbol in self.grammar.productions or (symbol in self.grammar.nonterminals
+                                                      and symbol not in terminals):
+                if text:
+                    items.append(''.join(text))
+                    text = []
+                items.append(self._intern(symbol))
+            else:
+                text.append(symbol)
+        if text:
+            items.append(''.join(text))
+        return tuple(reversed(items))
+
+    def derive(self, word=None) -> str:
+        """One random word derived from word (a sentential form, the start symbol by default)."""
+        stack = list(self.start_items if word is None else self._compile(word))
+        out = []
+        append, pop, push = out.append, stack.pop, stack.extend
+        rules, choice = self.rules, self.rng.choice
+        while stack:
+            item = pop()
+            if item.__class__ is str:
+                append(item)
+            else:
+                options = rules[item]
+                if not options:
+                    raise ValueError(f"No productions for nonterminal {self.names[item]!r}")
+                push(choice(options))
+        return ''.join(out)
+
+    def derive_many(self, n) -> list:
+        return [self.derive() for _ in range(n)]
+
+
+def _corpus_block(task) -> str:
+    grammar, seed, size = task
+    words = DerivationEngine(grammar, seed).derive_many(size)
+    return '\n'.join(words) + '\n' if words else ''
@@ -0,0 +1,175 @@
+"""
+Opt-in counters and timers for the hot paths (lexer, parser, nfa_to_dfa and
+the CNF steps).
+
+Instrumentation is off by default. Every hook in the library checks the
+module-level flag `enabled` first and does nothing else while it is False,
+so a disabled hook costs a single attribute lookup.
+
+    with instrumentation.profile('load') as metrics:
+        sql_parser(query)
+    metrics.snapshot()['counters']['lexer.tokens.KEYWORD']
+
+Metric names used by the library:
+    lexer.tokens.<TokenType name>, lexer.chars        counters
+    lexer                                             timer (includes the lexing done by the parser)
+    parser.nodes.<ASTNodeType name>, parser.statements counters
+    parser                                            timer (includes lexing of streamed tokens)
+    automaton.dfa_states                              counter
+    automaton.nfa_to_dfa                              timer
+    cnf.<analysis>.iterations                         counter (worklist pops of a fixpoint)
+    cnf.<step>.productions                            counter (productions after the step)
+    cnf.<step>                                        timer
+
+Metrics live in the current process only: statements parsed by parse_script
+in worker processes are not counted.
+"""
+import json
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+TimerStats = namedtuple('TimerStats', ['calls', 'total'])
+
+enabled = False
+
+
+class Metrics:
+    """Named counters and timers (number of calls and total seconds)."""
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        calls, total = self.timers.get(name, (0, 0.0))
+        self.timers[name] = TimerStats(calls + 1, total + seconds)
+
+    def merge(self, other: 'Metrics'):
+        for name, n in other.counters.items():
+            self.count(name, n)
+        for name, (calls, total) in other.timers.items():
+            old_calls, old_total = self.timers.get(name, (0, 0.0))
+            self.timers[name] = TimerStats(old_calls + calls, old_total + total)
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+
+    def snapshot(self) -> dict:
+        """The metrics as plain JSON-serializable data."""
+        return {
+            'counters': dict(sorted(self.counters.items())),
+            'timers': {name: {'calls': stats.calls, 'total': stats.total, 'mean': stats.total / stats.calls}
+                       for name, stats in sorted(self.timers.items())},
+        }
+
+
+class JSONLinesSink:
+    """Sink appending each record to a file as one line of JSON."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+_metrics = Metrics()
+_sinks = []
+
+
+def metrics() -> Metrics:
+    """The metrics hooks currently record into."""
+    return _metrics
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def count(name, n=1):
+    _metrics.count(name, n)
+
+
+def add_time(name, seconds):
+    _metrics.add_time(name, seconds)
+
+
+def count_types(prefix, values):
+    """Count values (enum members) under prefix.<member name>."""
+    counters = _metrics.counters
+    for value in values:
+        name = f"{prefix}.{value.name}"
+        counters[name] = counters.get(name, 0) + 1
+
+
+@contextmanager
+def timer(name):
+    """Time the block under name, if instrumentation is enabled when it starts."""
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _metrics.add_time(name, time.perf_counter() - started)
+
+
+def add_sink(sink):
+    """Register a callable receiving every emitted record (a dict)."""
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    _sinks.remove(sink)
+
+
+def _record(metrics, label):
+    record = {'timestamp': time.time(), 'label': label}
+    record.update(metrics.snapshot())
+    return record
+
+
+def emit(label=None, reset=True):
+    """Send the current metrics to the registered sinks, then clear them unless reset is False."""
+    record = _record(_metrics, label)
+    for sink in _sinks:
+        sink(record)
+    if reset:
+        _metrics.reset()
+    return record
+
+
+@contextmanager
+def profile(label=None, sink=None):
+    """
+    Enable instrumentation for the block, recording into fresh Metrics that
+    are yielded. On exit the previous state is restored, the metrics are added
+    to the enclosing profile (if any) and sent to sink and the registered sinks.
+    """
+    global enabled, _metrics
+    outer_enabled, outer = enabled, _metrics
+    scoped = Metrics()
+    enabled, _metrics = True, scoped
+    try:
+        yield scoped
+    finally:
+        enabled, _metrics = outer_enabled, outer
+        if outer_enabled:
+            outer.merge(scoped)
+        record = _record(scoped, label)
+        for target in ([sink] if sink is not None else []) + _sinks:
+            target(record)
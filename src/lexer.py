@@ -1,6 +1,11 @@
+import codecs
+import mmap
 import re
+import time
 from enum import Enum
 
+from . import instrumentation
+
 
 class TokenType(Enum):
     KEYWORD = "KEYWORD"
@@ -28,7 +33,147 @@ TOKEN_PATTERNS = [
     (TokenType.COMMENT, r'--.*', None)
 ]
 
+def _master_pattern(token_patterns):
+    # A leading \b is always satisfied at the start of a token in the
+    # original slice-based lexer (the slice starts at the token), so it is
+    # dropped here to keep the same behaviour when matching at an offset.
+    parts = []
+    for token_type, pattern, _ in token_patterns:
+        if pattern.startswith(r'\b'):
+            pattern = pattern[2:]
+        parts.append(f"(?P<{token_type.name}>{pattern})")
+    return re.compile('|'.join(parts), re.IGNORECASE)
+
+
+# all token patterns compiled once into a single alternation with named groups
+MASTER_PATTERN = _master_pattern(TOKEN_PATTERNS)
+
+# default number of characters read at a time by iter_tokens
+CHUNK_SIZE = 1 << 16
+# characters that must follow a token before it is final: a NUMBER can still grow
+# by '.<digit>' and the trailing \b of KEYWORD/NUMBER looks one character ahead
+_LOOKAHEAD = 2
+_QUOTES = "'\""
+_GROUP_TYPES = {token_type.name: token_type for token_type, _, _ in TOKEN_PATTERNS}
+
+
+def _lex_chunk(text, final):
+    """
+    Tokenize as much of text as can be decided and return the tokens together
+    with the number of characters consumed.
+    Unless final is set, more input may follow: a token ending too close to the
+    end of the text (it could still grow, e.g. '12' -> '12.5' or 'SEL' -> 'SELECT')
+    and an unmatched quote (its closing quote may still arrive) are left unconsumed.
+    """
+    started = time.perf_counter() if instrumentation.enabled else None
+    tokens = []
+    match_at = MASTER_PATTERN.match
+    group_types = _GROUP_TYPES
+    pos = 0
+    end = len(text)
+    limit = end if final else end - _LOOKAHEAD
+    while pos < end:
+        match = match_at(text, pos)
+        if match:
+            if match.end() > limit:
+                break
+            token_type = group_types[match.lastgroup]
+            value = match.group()
+            if token_type == TokenType.KEYWORD and value.upper() not in SQL_KEYWORDS:
+                token_type = TokenType.IDENTIFIER
+            if token_type != TokenType.WHITESPACE:  # ignore whitespace tokens
+                tokens.append((token_type, value))
+            pos = match.end()
+        else:
+            if not final and (pos >= limit or text[pos] in _QUOTES):
+                break
+            tokens.append((TokenType.UNKNOWN, text[pos]))
+            pos += 1  # skip unknown character
+    if started is not None:
+        instrumentation.count_types('lexer.tokens', [token_type for token_type, _ in tokens])
+        instrumentation.count('lexer.chars', pos)
+        instrumentation.add_time('lexer', time.perf_counter() - started)
+    return tokens, pos
+
+
 def sql_lexer(query):
+    """
+    Tokenize an SQL query in a single left-to-right pass.
+    The master pattern is matched at the current position instead of slicing
+    the query, so lexing is linear in the size of the input.
+    """
+    return _lex_chunk(query, True)[0]
+
+
+def _text_reader(source, encoding):
+    """Return a read(size) function producing text from a str, bytes-like/mmap or file object."""
+    if isinstance(source, str):
+        position = 0
+
+        def read(size):
+            nonlocal position
+            chunk = source[position:position + size]
+            position += len(chunk)
+            return chunk
+        return read
+
+    if hasattr(source, 'read') and not isinstance(source, mmap.mmap):
+        read_raw = source.read
+    else:  # bytes, bytearray, memoryview or mmap
+        position = 0
+
+        def read_raw(size):
+            nonlocal position
+            chunk = bytes(source[position:position + size])
+            position += len(chunk)
+            return chunk
+
+    decoder = None
+
+    def read(size):
+        nonlocal decoder
+        while True:
+            chunk = read_raw(size)
+            if isinstance(chunk, str):
+                return chunk
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            text = decoder.decode(chunk, final=not chunk)
+            # a chunk can end inside a multi-byte character and decode to nothing
+            if text or not chunk:
+                return text
+    return read
+
+
+def iter_tokens(source, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+    """
+    Lazily tokenize source, which can be a str, a file object (text or binary),
+    a bytes-like object or an mmap. The input is read chunk_size characters at a
+    time and yields the same tokens as sql_lexer, including strings split between
+    chunks. A quote that is never closed keeps the rest of the input buffered,
+    because until the end of input it is unknown whether it starts a string.
+    """
+    read = _text_reader(source, encoding)
+    pending = ''
+    size = chunk_size
+    while True:
+        chunk = read(size)
+        final = not chunk
+        buffer = pending + chunk if pending else chunk
+        tokens, consumed = _lex_chunk(buffer, final)
+        yield from tokens
+        if final:
+            return
+        pending = buffer[consumed:]
+        # read more at once while a long token keeps the buffer from advancing
+        size = chunk_size if consumed else size * 2
+
+
+def sql_lexer_reference(query):
+    """
+    Original pattern-by-pattern lexer, kept as the reference implementation
+    that the single-pass engine has to agree with.
+    """
     tokens = []
     while query:
         match = None
@@ -0,0 +1,123 @@
+from collections import OrderedDict, namedtuple
+
+from .lexer import TokenType, sql_lexer
+from .parser import Parser
+from .ast import ASTNode
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+LITERAL_TYPES = (TokenType.NUMBER, TokenType.STRING)
+
+
+class _Slot:
+    """Stands in for the value of the index-th literal of a query in a cached AST."""
+    __slots__ = ('index',)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __repr__(self):
+        return f"?{self.index}"
+
+
+def fingerprint(tokens):
+    """
+    Split a token stream into its shape and its literals.
+    Returns (key, literals): key is a hashable tuple of the tokens with every
+    NUMBER/STRING value replaced by a placeholder, literals the replaced values.
+    """
+    key = []
+    literals = []
+    for token_type, value in tokens:
+        if token_type in LITERAL_TYPES:
+            key.append(token_type)
+            literals.append(value)
+        else:
+            key.append((token_type, value))
+    return tuple(key), literals
+
+
+def _template_tokens(tokens):
+    slots = 0
+    for token_type, value in tokens:
+        if token_type in LITERAL_TYPES:
+            yield token_type, _Slot(slots)
+            slots += 1
+        else:
+            yield token_type, value
+
+
+def instantiate(template, literals):
+    """Copy a cached AST, filling its literal slots from literals."""
+    if template is None:
+        return None
+    root = ASTNode(template.node_type, template.value)
+    stack = [(template, root)]
+    while stack:
+        source, copy = stack.pop()
+        if isinstance(copy.value, _Slot):
+            copy.value = literals[copy.value.index]
+        for child in source.children:
+            child_copy = ASTNode(child.node_type, child.value)
+            copy.children.append(child_copy)
+            stack.append((child, child_copy))
+    return root
+
+
+class ParseCache:
+    """
+    Bounded LRU cache of parsed queries keyed by the fingerprint of their
+    token stream, so queries differing only in literals share one entry.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._templates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, query):
+        """Same result as sql_parser(query), served from the cache when possible."""
+        tokens = sql_lexer(query)
+        key, literals = fingerprint(tokens)
+        template = self._templates.get(key)
+        if template is not None or key in self._templates:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return instantiate(template, literals)
+
+        self.misses += 1
+        try:
+            template = Parser(_template_tokens(tokens)).parse()
+        except SyntaxError:
+            # report the error against the real literals; errors are not cached
+            return Parser(tokens).parse()
+        if self.maxsize > 0:
+            self._templates[key] = template
+            self._evict()
+        return instantiate(template, literals)
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        self._evict()
+
+    def _evict(self):
+        while len(self._templates) > self.maxsize:
+            self._templates.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._templates.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._templates))
+
+
+default_parse_cache = ParseCache()
+
+
+def cached_sql_parser(query):
+    """sql_parser with the module-level default_parse_cache in front of it."""
+    return default_parse_cache.parse(query)
@@ -0,0 +1,131 @@
+class ParseForest:
+    """
+    Shared packed parse forest.
+    A node is a (label, start, end) tuple: label derives the input symbols
+    start..end-1. nodes maps every inner node to its packed alternatives, each a
+    tuple of child nodes, kept as the keys of a dict so that adding one is O(1)
+    and their order is stable; a node without an entry is a terminal leaf. Nodes whose
+    label is itself a tuple are intermediate (binarization) nodes: they are
+    counted like any other node but spliced into their parent in trees.
+    Subtrees shared by several parses are stored once, so an ambiguous input
+    gives a forest of polynomial size even when it has exponentially many trees.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.nodes
+
+    def add(self, node, children=()):
+        """Add a packed alternative to node (a node with no alternative yet is created)."""
+        self.nodes.setdefault(node, {})[tuple(children)] = None
+
+    def alternatives(self, node):
+        return list(self.nodes.get(node, ()))
+
+    def is_ambiguous(self) -> bool:
+        return any(len(alternatives) > 1 for alternatives in self.nodes.values())
+
+    def _counts(self, node):
+        """Number of trees of every node below node, computed bottom-up without recursion."""
+        counts = {}
+        on_path = set()
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in counts:
+                continue
+            if current not in self.nodes:
+                counts[current] = 1
+                continue
+            if expanded:
+                on_path.discard(current)
+                total = 0
+                for children in self.nodes[current]:
+                    product = 1
+                    for child in children:
+                        product *= counts[child]
+                    total += product
+                counts[current] = total
+                continue
+            if current in on_path:
+                raise ValueError("The forest is cyclic: it has infinitely many trees")
+            on_path.add(current)
+            stack.append((current, True))
+            for children in self.nodes[current]:
+                for child in children:
+                    if child not in counts:
+                        if child in on_path:
+                            raise ValueError("The forest is cyclic: it has infinitely many trees")
+                        stack.append((child, False))
+        return counts
+
+    def count_trees(self, node=None) -> int:
+        node = self.root if node is None else node
+        return self._counts(node)[node]
+
+    def tree(self, node=None, index=0, _counts=None):
+        """
+        The index-th tree below node, as nested (label, child, ...) tuples with
+        terminal labels as leaves. Trees are numbered by choosing alternatives
+        in order, first child varying fastest.
+        """
+        node = self.root if node is None else node
+        counts = self._counts(node) if _counts is None else _counts
+        if not 0 <= index < counts[node]:
+            raise IndexError("tree index out of range")
+        holder = []
+        stack = [(node, index, holder)]
+        while stack:
+            current, index, out = stack.pop()
+            if current not in self.nodes:
+                out.append(current[0])
+                continue
+            for children in self.nodes[current]:
+                product = 1
+                for child in children:
+                    product *= counts[child]
+                if index < product:
+                    break
+                index -= product
+            if isinstance(current[0], tuple):
+                target = out  # intermediate node: its children belong to the parent
+            else:
+                target = [current[0]]
+                out.append(target)
+            choices = []
+            for child in children:
+                index, choice = divmod(index, counts[child])
+                choices.append((child, choice))
+            for child, choice in reversed(choices):
+                stack.append((child, choice, target))
+        return _freeze(holder[0])
+
+    def trees(self, node=None):
+        """Every tree below node, lazily and in tree() order."""
+        node = self.root if node is None else node
+        counts = self._counts(node)
+        for index in range(counts[node]):
+            yield self.tree(node, index, counts)
+
+
+def _freeze(tree):
+    """Turn the nested lists built by ParseForest.tree into nested tuples."""
+    if not isinstance(tree, list):
+        return tree
+    done = {}
+    stack = [tree]
+    while stack:
+        current = stack[-1]
+        pending = [child for child in current if isinstance(child, list) and id(child) not in done]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        done[id(current)] = tuple(done[id(child)] if isinstance(child, list) else child for child in current)
+    return done[id(tree)]
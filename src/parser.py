@@ -1,25 +1,45 @@
-from .lexer import TokenType, sql_lexer
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import instrumentation
+from .lexer import TokenType, iter_tokens
 from .ast import ASTNode, ASTNodeType
 
+# binding strength of the boolean operators in WHERE; comparisons bind tighter
+LOGICAL_PRECEDENCE = {"OR": 1, "AND": 2}
+
+# quoted strings and -- comments are matched whole so a ';' inside them is skipped
+_STATEMENT_BOUNDARY = re.compile(r"'[^']*'|\"[^\"]*\"|--[^\n]*|;")
 
 
 class Parser:
     def __init__(self, tokens):
+        # tokens can be a list or any iterable of (TokenType, value) pairs,
+        # e.g. the generator returned by iter_tokens
         self.tokens = tokens
+        self._token_iter = iter(tokens)
         self.current_token = None
         self.token_index = -1
         self.advance()
 
     def advance(self):
         self.token_index += 1
-        if self.token_index < len(self.tokens):
-            self.current_token = self.tokens[self.token_index]
-        else:
-            self.current_token = None
+        self.current_token = next(self._token_iter, None)
         return self.current_token
 
     def parse(self):
-        if not self.tokens:
+        started = time.perf_counter() if instrumentation.enabled else None
+        ast = self._parse_statement()
+        if started is not None:
+            instrumentation.add_time('parser', time.perf_counter() - started)
+            if ast is not None:
+                instrumentation.count('parser.statements')
+                instrumentation.count_types('parser.nodes', [node.node_type for node, _ in ast.walk()])
+        return ast
+
+    def _parse_statement(self):
+        if self.current_token is None:
             return None
 
         # Check for SELECT statement
@@ -96,23 +116,85 @@ class Parser:
         return where_node
 
     def parse_condition(self):
+        condition_node = ASTNode(ASTNodeType.CONDITION)
+        condition_node.children.append(self.parse_boolean_expression())
+        return condition_node
+
+    def parse_boolean_expression(self):
+        """
+        Parse comparisons joined by AND/OR, with parentheses.
+        Operator precedence parsing with explicit operand/operator stacks instead
+        of recursion, so long chains and deep nesting parse in linear time.
+        Chains of the same operator become one n-ary LOGICAL_OPERATION node.
+        """
+        operands = []
+        operators = []  # "AND", "OR" or "(" for an open parenthesis
+        expect_operand = True
+        while True:
+            token = self.current_token
+            if expect_operand:
+                if token and token[0] == TokenType.DELIMITER and token[1] == "(":
+                    operators.append("(")
+                    self.advance()
+                    continue
+                operands.append(self.parse_comparison())
+                expect_operand = False
+            elif (token and token[0] == TokenType.KEYWORD and
+                  token[1].upper() in LOGICAL_PRECEDENCE):
+                operator = token[1].upper()
+                while (operators and operators[-1] != "(" and
+                       LOGICAL_PRECEDENCE[operators[-1]] >= LOGICAL_PRECEDENCE[operator]):
+                    self._reduce_logical(operands, operators.pop())
+                operators.append(operator)
+                self.advance()
+                expect_operand = True
+            elif (token and token[0] == TokenType.DELIMITER and token[1] == ")" and
+                  "(" in operators):
+                while operators[-1] != "(":
+                    self._reduce_logical(operands, operators.pop())
+                operators.pop()
+                self.advance()
+            else:
+                break
+
+        while operators:
+            operator = operators.pop()
+            if operator == "(":
+                raise SyntaxError("Expected ')' in condition")
+            self._reduce_logical(operands, operator)
+        return operands[0]
+
+    @staticmethod
+    def _reduce_logical(operands, operator):
+        right = operands.pop()
+        left = operands.pop()
+        if left.node_type == ASTNodeType.LOGICAL_OPERATION and left.value == operator:
+            node = left
+        else:
+            node = ASTNode(ASTNodeType.LOGICAL_OPERATION, operator, [left])
+        if right.node_type == ASTNodeType.LOGICAL_OPERATION and right.value == operator:
+            node.children.extend(right.children)
+        else:
+            node.children.append(right)
+        operands.append(node)
+
+    def parse_comparison(self):
         left = self.parse_expression()
 
-        if not (self.current_token and
+        if (self.current_token and
+                self.current_token[0] == TokenType.KEYWORD and
+                self.current_token[1].upper() == "LIKE"):
+            operator = "LIKE"
+        elif (self.current_token and
                 self.current_token[0] == TokenType.OPERATOR):
+            operator = self.current_token[1]
+        else:
             raise SyntaxError("Expected operator in condition")
-
-        operator = self.current_token[1]
         self.advance()
 
         right = self.parse_expression()
 
-        condition_node = ASTNode(ASTNodeType.CONDITION)
-        condition_node.children.append(
-            ASTNode(ASTNodeType.BINARY_OPERATION, operator, [left, right])
-        )
-
-        return condition_node
+        return ASTNode(ASTNodeType.BINARY_OPERATION, operator, [left, right])
 
     def parse_expression(self):
         if not self.current_token:
@@ -131,6 +213,63 @@ class Parser:
 
 
 def sql_parser(query):
-    tokens = sql_lexer(query)
-    parser = Parser(tokens)
-    return parser.parse()
\ No newline at end of file
+    """Parse a query given as a str, a file object or an mmap."""
+    parser = Parser(iter_tokens(query))
+    return parser.parse()
+
+
+def split_statements(script):
+    """
+    Split a script into statements at every ';' that is not inside a quoted
+    string or a -- comment. Comments are dropped from the statements and
+    statements holding only whitespace are skipped.
+    """
+    pieces = []
+    start = 0
+    for match in _STATEMENT_BOUNDARY.finditer(script):
+        delimiter = match.group()
+        if delimiter[0] in "'\"":
+            continue
+        pieces.append(script[start:match.start()])
+        start = match.end()
+        if delimiter == ';':
+            statement = ''.join(pieces).strip()
+            if statement:
+                yield statement
+            pieces = []
+        else:
+            pieces.append(' ')  # a comment separates tokens like whitespace
+    pieces.append(script[start:])
+    statement = ''.join(pieces).strip()
+    if statement:
+        yield statement
+
+
+def parse_statement(statement):
+    """Parse a single statement, rejecting tokens left over after it."""
+    parser = Parser(iter_tokens(statement))
+    ast = parser.parse()
+    if parser.current_token is not None:
+        raise SyntaxError(f"Unexpected token after statement: {parser.current_token[1]}")
+    return ast
+
+
+def _parse_or_error(statement):
+    try:
+        return parse_statement(statement)
+    except Exception as e:  # one bad statement must not abort the batch
+        return e
+
+
+def parse_script(script, workers=1, chunksize=256):
+    """
+    Parse every statement of a script independently.
+    Returns a list with, in input order, the AST of each statement or the
+    exception raised while parsing it. With workers > 1 (or None for one per
+    CPU) statements are parsed in a ProcessPoolExecutor, chunksize at a time.
+    """
+    statements = list(split_statements(script))
+    if workers == 1:
+        return [_parse_or_error(statement) for statement in statements]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_or_error, statements, chunksize=chunksize))
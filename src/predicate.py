@@ -0,0 +1,177 @@
+import re
+from functools import lru_cache
+
+from .ast import ASTNode, ASTNodeType, literal_value, like_pattern
+from .lexer import TOKEN_PATTERNS, TokenType
+
+# SQL operator -> Python operator in generated code
+PYTHON_OPERATORS = {
+    '=': '==',
+    '!=': '!=',
+    '<>': '!=',
+    '<': '<',
+    '<=': '<=',
+    '>': '>',
+    '>=': '>=',
+    '+': '+',
+    '-': '-',
+    '*': '*',
+    '/': '/',
+}
+
+_LITERAL_PARAM = re.compile(r"_l\d+")
+# a cell _number converts: the lexer's NUMBER pattern with an optional minus sign
+_NUMBER_CELL = re.compile('-?' + dict((t, p) for t, p, _ in TOKEN_PATTERNS)[TokenType.NUMBER]).fullmatch
+_ARITHMETIC = {'+', '-', '*', '/'}
+# deepest parenthesis nesting put in one generated expression (CPython's parser
+# gives up at about 200); deeper conditions are split into helper functions
+MAX_EXPRESSION_DEPTH = 50
+
+
+def _number(value):
+    """
+    A str cell (e.g. from csv.reader) as the int or float it spells, for
+    comparison with a numeric literal. Only cells spelled like a NUMBER token,
+    optionally negated, are converted; 'nan', 'inf', ' 5 ' or '1_000' stay str.
+    """
+    if _NUMBER_CELL(value) is None:
+        return value
+    return float(value) if '.' in value else int(value)
+
+
+def _condition_root(ast):
+    """The expression below a SELECT_STATEMENT / WHERE_CLAUSE / CONDITION, or None if there is no WHERE."""
+    node = ast
+    if node.node_type == ASTNodeType.SELECT_STATEMENT:
+        where = [child for child in node.children if child.node_type == ASTNodeType.WHERE_CLAUSE]
+        if not where:
+            return None
+        node = where[0]
+    while node.node_type in (ASTNodeType.WHERE_CLAUSE, ASTNodeType.CONDITION):
+        node = node.children[0]
+    return node
+
+
+def shape(node: ASTNode):
+    """
+    Fingerprint of an expression tree: node types, operators and column names
+    in pre-order, with literal values left out.
+    """
+    return tuple((n.node_type, None if n.node_type == ASTNodeType.LITERAL else n.value, len(n.children))
+                 for n, _ in node.walk())
+
+
+def _literals(node: ASTNode):
+    return [literal_value(n.value) for n, _ in node.walk() if n.node_type == ASTNodeType.LITERAL]
+
+
+def _as_number(column):
+    # typed cells pass through, str cells are converted
+    return f"(_number({column}) if {column}.__class__ is str else {column})"
+
+
+def _expression_source(node_shape, columns, numeric):
+    """
+    Python source for a shape, with literals as parameters _l0, _l1, ... in
+    pre-order. numeric flags the literals that are numbers: a column compared
+    with (or computed with) a number gets its str cells converted by _number.
+    Returns (expression, setup) where setup lists statements to run once when
+    the literals are bound: LIKE patterns compiled to regexes and the helper
+    functions _e0, _e1, ... that operands of AND/OR are moved into when the
+    expression would nest deeper than MAX_EXPRESSION_DEPTH. Operands stay
+    short-circuited; a condition nested n levels deep calls n / 50 helpers deep.
+    """
+    # pre-order entries are read back to front, so each node finds its
+    # children's source on top of the stack in left-to-right order; every
+    # entry is (source, kind, depth) with kind 'column', 'number' or None
+    # and depth its parenthesis nesting
+    literal_count = len(numeric)
+    stack = []
+    setup = []
+    helpers = patterns = 0
+    for node_type, value, arity in reversed(node_shape):
+        if node_type == ASTNodeType.LITERAL:
+            literal_count -= 1
+            stack.append((f"_l{literal_count}", 'number' if numeric[literal_count] else None, 0))
+        elif node_type == ASTNodeType.IDENTIFIER:
+            if columns is None:
+                stack.append((f"row[{value!r}]", 'column', 0))
+            elif value in columns:
+                stack.append((f"row[{columns.index(value)}]", 'column', 0))
+            else:
+                raise ValueError(f"Unknown column: {value}")
+        elif node_type == ASTNodeType.LOGICAL_OPERATION:
+            operands = [stack.pop() for _ in range(arity)]
+            depth = max(operand[2] for operand in operands) + 1
+            if depth > MAX_EXPRESSION_DEPTH:
+                for i, (source, kind, operand_depth) in enumerate(operands):
+                    if operand_depth > 1:
+                        setup.append(f"def _e{helpers}(row):")
+                        setup.append(f"    return {source}")
+                        operands[i] = (f"_e{helpers}(row)", kind, 1)
+                        helpers += 1
+                depth = max(operand[2] for operand in operands) + 1
+            source = "(" + f" {value.lower()} ".join(operand[0] for operand in operands) + ")"
+            stack.append((source, None, depth))
+        elif node_type == ASTNodeType.BINARY_OPERATION and value == 'LIKE':
+            (left, _, left_depth), (right, _, right_depth) = stack.pop(), stack.pop()
+            depth = max(left_depth, right_depth) + 2
+            if _LITERAL_PARAM.fullmatch(right):
+                setup.append(f"_m{patterns} = _like_pattern({right}).fullmatch")
+                stack.append((f"(_m{patterns}(str({left})) is not None)", None, depth))
+                patterns += 1
+            else:
+                stack.append((f"(_like_pattern({right}).fullmatch(str({left})) is not None)", None, depth))
+        elif node_type == ASTNodeType.BINARY_OPERATION:
+            if value not in PYTHON_OPERATORS:
+                raise ValueError(f"Unsupported operator: {value}")
+            (left, left_kind, left_depth), (right, right_kind, right_depth) = stack.pop(), stack.pop()
+            if left_kind == 'column' and right_kind == 'number':
+                left = _as_number(left)
+            elif right_kind == 'column' and left_kind == 'number':
+                right = _as_number(right)
+            kind = 'number' if value in _ARITHMETIC and 'number' in (left_kind, right_kind) else None
+            stack.append((f"({left} {PYTHON_OPERATORS[value]} {right})", kind, max(left_depth, right_depth) + 2))
+        else:
+            raise ValueError(f"Cannot compile {node_type.name}")
+    return stack[0][0], setup
+
+
+@lru_cache(maxsize=1024)
+def _predicate_factory(node_shape, columns, numeric):
+    """
+    Compile a shape once into a factory that binds literal values and returns
+    the predicate. Memoized, so every query with the same shape (and the same
+    literals being numbers) reuses the code.
+    """
+    params = ''.join(f"_l{i}, " for i in range(len(numeric)))
+    expression, setup = _expression_source(node_shape, columns, numeric)
+    source = f"def factory({params}):\n"
+    source += ''.join(f"    {line}\n" for line in setup)
+    source += f"    return lambda row: {expression}\n"
+    namespace = {'_like_pattern': like_pattern, '_number': _number}
+    exec(compile(source, '<predicate>', 'exec'), namespace)
+    return namespace['factory']
+
+
+def compile_predicate(ast: ASTNode, columns=None):
+    """
+    Turn a WHERE condition into a function row -> bool.
+    ast can be a SELECT_STATEMENT, WHERE_CLAUSE, CONDITION or expression node.
+    With columns (a sequence of column names) rows are sequences indexed by
+    position, e.g. csv.reader rows; without, rows are mappings keyed by name,
+    e.g. csv.DictReader rows. A str cell compared with a numeric literal is
+    read as a number first, so untyped CSV rows compare like typed ones.
+    """
+    root = _condition_root(ast)
+    if root is None:
+        return lambda row: True
+    columns = None if columns is None else tuple(columns)
+    literals = _literals(root)
+    numeric = tuple(isinstance(literal, (int, float)) for literal in literals)
+    return _predicate_factory(shape(root), columns, numeric)(*literals)
+
+
+def filter_rows(ast: ASTNode, rows, columns=None):
+    """Lazily yield the rows that satisfy the WHERE condition of ast."""
+    yield from filter(compile_predicate(ast, columns), rows)
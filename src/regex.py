@@ -1,11 +1,394 @@
 import random
-import re
+from functools import lru_cache
+from itertools import islice
 from typing import List, Tuple
 
+from src.finite_automation import FiniteAutomaton, EPSILON
 
-def generate_from_regex(regex: str) -> str:
+# upper bound on the repetitions generated for '*' and '+'
+REPEAT_LIMIT = 5
+
+
+class _PatternParser:
+    """
+    Parser for the lab-4 pattern syntax: literal characters, groups with '|',
+    and the quantifiers '?', '*', '+', '{n}' and '{m,n}'.
+    Produces a tree of ('char', c), ('cat', [..]), ('alt', [..]) and
+    ('repeat', node, low, high) tuples; high is None for an unbounded repeat.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.i = 0
+
+    def parse(self):
+        node = self.parse_alt()
+        if self.i != len(self.pattern):
+            raise ValueError(f"Unmatched ')' in regex {self.pattern!r}")
+        return node
+
+    def peek(self):
+        return self.pattern[self.i] if self.i < len(self.pattern) else None
+
+    def parse_alt(self):
+        options = [self.parse_seq()]
+        while self.peek() == '|':
+            self.i += 1
+            options.append(self.parse_seq())
+        return options[0] if len(options) == 1 else ('alt', options)
+
+    def parse_seq(self):
+        items = []
+        while self.peek() not in (None, '|', ')'):
+            if self.peek() in '?*+{':
+                raise ValueError(f"Nothing to repeat at position {self.i} in regex {self.pattern!r}")
+            items.append(self.parse_repeat())
+        return items[0] if len(items) == 1 else ('cat', items)
+
+    def parse_repeat(self):
+        node = self.parse_atom()
+        while self.peek() is not None and self.peek() in '?*+{':
+            char = self.peek()
+            self.i += 1
+            if char == '?':
+                node = ('repeat', node, 0, 1)
+            elif char == '*':
+                node = ('repeat', node, 0, None)
+            elif char == '+':
+                node = ('repeat', node, 1, None)
+            else:
+                low, high = self.parse_braces()
+                node = ('repeat', node, low, high)
+        return node
+
+    def parse_braces(self):
+        j = self.pattern.find('}', self.i)
+        if j == -1:
+            raise ValueError("Unclosed brace in regex")
+        quantifier = self.pattern[self.i:j]
+        self.i = j + 1
+        low, comma, high = quantifier.partition(',')
+        try:
+            low = int(low)
+            high = (int(high) if high.strip() else None) if comma else low
+        except ValueError:
+            raise ValueError(f"Invalid quantifier {{{quantifier}}} in regex {self.pattern!r}") from None
+        if high is not None and high < low:
+            raise ValueError(f"Invalid quantifier {{{low},{high}}} in regex {self.pattern!r}")
+        return low, high
+
+    def parse_atom(self):
+        char = self.peek()
+        self.i += 1
+        if char == '(':
+            node = self.parse_alt()
+            if self.peek() != ')':
+                raise ValueError("Unclosed parenthesis in regex")
+            self.i += 1
+            return node
+        if char == '\\':
+            if self.peek() is None:
+                raise ValueError(f"Dangling backslash in regex {self.pattern!r}")
+            char = self.peek()
+            self.i += 1
+        return ('char', char)
+
+
+def parse_pattern(pattern: str):
+    """Parse a pattern into its ('char' / 'cat' / 'alt' / 'repeat') tuple tree."""
+    return _PatternParser(pattern).parse()
+
+
+class _Thompson:
+    """Thompson construction: one ε-NFA fragment (start, end) per tree node."""
+
+    def __init__(self):
+        self.states = []
+        self.delta = {}
+
+    def new_state(self):
+        state = f"q{len(self.states)}"
+        self.states.append(state)
+        return state
+
+    def edge(self, source, symbol, target):
+        self.delta.setdefault(source, {}).setdefault(symbol, set()).add(target)
+
+    def build(self, node):
+        kind = node[0]
+        if kind == 'char':
+            start, end = self.new_state(), self.new_state()
+            self.edge(start, node[1], end)
+            return start, end
+        if kind == 'cat':
+            return self.chain([lambda item=item: self.build(item) for item in node[1]])
+        if kind == 'alt':
+            start, end = self.new_state(), self.new_state()
+            for option in node[1]:
+                option_start, option_end = self.build(option)
+                self.edge(start, EPSILON, option_start)
+                self.edge(option_end, EPSILON, end)
+            return start, end
+        _, item, low, high = node
+        pieces = [lambda: self.build(item)] * low
+        if high is None:
+            pieces.append(lambda: self.optional(item, loop=True))
+        else:
+            pieces.extend([lambda: self.optional(item)] * (high - low))
+        return self.chain(pieces)
+
+    def optional(self, item, loop=False):
+        start, end = self.new_state(), self.new_state()
+        item_start, item_end = self.build(item)
+        self.edge(start, EPSILON, item_start)
+        self.edge(start, EPSILON, end)
+        self.edge(item_end, EPSILON, end)
+        if loop:
+            self.edge(item_end, EPSILON, item_start)
+        return start, end
+
+    def chain(self, pieces):
+        """Concatenate the fragments built by pieces with ε-transitions."""
+        if not pieces:
+            state = self.new_state()
+            return state, state
+        start, end = pieces[0]()
+        for piece in pieces[1:]:
+            next_start, next_end = piece()
+            self.edge(end, EPSILON, next_start)
+            end = next_end
+        return start, end
+
+
+def thompson_nfa(pattern) -> FiniteAutomaton:
+    """
+    Thompson ε-NFA of a pattern (a string or a parse_pattern tree).
+    States are named q0, q1, ...; the automaton has one final state.
+    """
+    ast = parse_pattern(pattern) if isinstance(pattern, str) else pattern
+    builder = _Thompson()
+    start, end = builder.build(ast)
+    alphabet = sorted({symbol for moves in builder.delta.values() for symbol in moves} - {EPSILON})
+    return FiniteAutomaton.from_definition(builder.states, alphabet, start, builder.delta, [end])
+
+
+def _as_plan(plan):
+    return (plan,) if isinstance(plan, str) else plan
+
+
+def _compile_plan(node):
+    """
+    Turn a pattern tree into a generator plan: a str when the node always
+    produces the same text, otherwise a tuple of steps. A step is a str
+    (constant text), ('choice', options, k) (k picks from constant options,
+    joined), ('alt', plans) (one of several non-constant plans) or
+    ('repeat', plan, low, high). Constant parts are merged while compiling,
+    so N{2} becomes 'NN' and R+ a single choice among 'R' ... 'RRRRR'.
+    """
+    kind = node[0]
+    if kind == 'char':
+        return node[1]
+    if kind == 'cat':
+        steps = []
+        for item in node[1]:
+            for step in _as_plan(_compile_plan(item)):
+                if isinstance(step, str) and steps and isinstance(steps[-1], str):
+                    steps[-1] += step
+                else:
+                    steps.append(step)
+        if not steps:
+            return ''
+        return steps[0] if len(steps) == 1 and isinstance(steps[0], str) else tuple(steps)
+    if kind == 'alt':
+        options = [_compile_plan(option) for option in node[1]]
+        if all(isinstance(option, str) for option in options):
+            return (('choice', tuple(options), 1),)
+        return (('alt', tuple(_as_plan(option) for option in options)),)
+    _, item, low, high = node
+    if high is None:
+        high = max(low, REPEAT_LIMIT)
+    sub = _compile_plan(item)
+    if isinstance(sub, str):
+        if low == high:
+            return sub * low
+        return (('choice', tuple(sub * count for count in range(low, high + 1)), 1),)
+    if low == high and len(sub) == 1 and sub[0][0] == 'choice':
+        _, options, k = sub[0]
+        return (('choice', options, k * low),)
+    return (('repeat', sub, low, high),)
+
+
+def _run_plan(plan, rng, out, steps=None):
+    """Generate one string into out; with steps, describe every decision taken."""
+    for step in plan:
+        if isinstance(step, str):
+            out.append(step)
+            if steps is not None:
+                steps.append(f"Literal '{step}'")
+            continue
+        kind = step[0]
+        if kind == 'choice':
+            _, options, k = step
+            text = rng.choice(options) if k == 1 else ''.join(rng.choices(options, k=k))
+            out.append(text)
+            if steps is not None:
+                steps.append(f"Choose {k} of {list(options)}: '{text}'")
+        elif kind == 'alt':
+            index = rng.randrange(len(step[1]))
+            if steps is not None:
+                steps.append(f"Choose alternative {index + 1} of {len(step[1])}")
+            _run_plan(step[1][index], rng, out, steps)
+        else:
+            _, sub, low, high = step
+            count = rng.randint(low, high)
+            if steps is not None:
+                steps.append(f"Repeat {count} times ({low} to {high})")
+            for _ in range(count):
+                _run_plan(sub, rng, out, steps)
+
+
+def _run_plan_batch(plan, rng, n) -> List[str]:
+    """
+    Generate n strings at once, one step at a time: every step draws its
+    choices for all n strings with a single rng.choices call, and the
+    per-step columns are joined at the end.
+    """
+    columns = []
+    for step in plan:
+        if isinstance(step, str):
+            columns.append([step] * n)
+            continue
+        kind = step[0]
+        if kind == 'choice':
+            _, options, k = step
+            picks = rng.choices(options, k=n * k)
+            columns.append(picks if k == 1 else list(map(''.join, zip(*[iter(picks)] * k))))
+        elif kind == 'alt':
+            plans = step[1]
+            chosen = rng.choices(range(len(plans)), k=n)
+            column = [''] * n
+            for index, sub in enumerate(plans):
+                rows = [row for row, option in enumerate(chosen) if option == index]
+                for row, text in zip(rows, _run_plan_batch(sub, rng, len(rows))):
+                    column[row] = text
+            columns.append(column)
+        else:
+            _, sub, low, high = step
+            counts = rng.choices(range(low, high + 1), k=n)
+            pieces = iter(_run_plan_batch(sub, rng, sum(counts)))
+            columns.append([''.join(islice(pieces, count)) for count in counts])
+    if len(columns) == 1:
+        return columns[0]
+    return list(map(''.join, zip(*columns)))
+
+
+class CompiledPattern:
+    """
+    A pattern parsed once, with its Thompson NFA, a bit-parallel matcher and
+    a generator plan (see _compile_plan).
+
+    The matcher keeps the set of active NFA states in one int, one bit per
+    state that can consume a character or is final (ε-only states are folded
+    away by taking ε-closures up front). Per character the next set is the
+    union of one 256-entry table lookup per byte of the current set, so a
+    match costs O(len(string) · states / 8) with no backtracking.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.ast = parse_pattern(pattern)
+        self.nfa = thompson_nfa(self.ast)
+        self.plan = _as_plan(_compile_plan(self.ast))
+
+        names, moves, final_mask, start = self.nfa._bit_tables()
+        useful = final_mask
+        for symbol, row in moves.items():
+            for i, mask in enumerate(row):
+                if mask:
+                    useful |= 1 << i
+        # renumber the useful states densely: NFA bit -> matcher bit
+        bits = [i for i in range(len(names)) if useful >> i & 1]
+
+        def project(mask):
+            result = 0
+            for new, old in enumerate(bits):
+                if mask >> old & 1:
+                    result |= 1 << new
+            return result
+
+        self._start = project(start)
+        self._final = project(final_mask)
+        self._tables = {}
+        for symbol, row in moves.items():
+            chunks = []
+            for shift in range(0, len(bits), 8):
+                singles = [project(row[old]) for old in bits[shift:shift + 8]]
+                if not any(singles):
+                    continue
+                table = [0] * (1 << len(singles))
+                for byte in range(1, len(table)):
+                    low = byte & -byte
+                    table[byte] = table[byte ^ low] | singles[low.bit_length() - 1]
+                chunks.append((shift, len(table) - 1, table))
+            self._tables[symbol] = chunks
+
+    def match(self, string: str) -> bool:
+        """True if the whole string matches the pattern."""
+        tables = self._tables
+        state = self._start
+        for char in string:
+            chunks = tables.get(char)
+            if chunks is None:
+                return False
+            next_state = 0
+            for shift, width, table in chunks:
+                next_state |= table[state >> shift & width]
+            if not next_state:
+                return False
+            state = next_state
+        return bool(state & self._final)
+
+    def match_many(self, strings) -> List[bool]:
+        """match() for every string of an iterable."""
+        match = self.match
+        return [match(string) for string in strings]
+
+    def generate(self, rng=random, steps=None) -> str:
+        """
+        A random string matching the pattern, with '*' and '+' limited to
+        REPEAT_LIMIT repetitions. If steps is a list, a description of every
+        decision is appended to it.
+        """
+        out = []
+        _run_plan(self.plan, rng, out, steps)
+        return ''.join(out)
+
+    def generate_many(self, n, rng=random) -> List[str]:
+        """n random strings, generated step by step for the whole batch."""
+        if n <= 0:
+            return []
+        return _run_plan_batch(self.plan, rng, n)
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> CompiledPattern:
+    """Compile a pattern once; repeated calls with the same pattern share the result."""
+    return CompiledPattern(pattern)
+
+
+def generate_many(pattern: str, n: int, seed=None) -> List[str]:
+    """
+    n random strings matching pattern. The same seed gives the same strings;
+    without one the output differs on every call.
+    """
+    return compile_pattern(pattern).generate_many(n, random.Random(seed))
+
+
+def generate_from_regex(regex: str, trace: bool = False) -> Tuple[str, List[str]]:
     """
     Generate a valid string from a regular expression pattern.
+    Returns (string, steps); steps describes every random decision when
+    trace is True and is empty otherwise.
     Handles:
     - M? : M is optional
     - N{2} : exactly 2 N's
@@ -19,73 +402,14 @@ def generate_from_regex(regex: str) -> str:
     - L* : 0 to 5 L's (limited)
     - N? : N is optional
     """
-    result = []
-    processing_steps = []
+    steps = [] if trace else None
+    result = compile_pattern(regex).generate(random, steps)
+    return result, steps if trace else []
 
-    # Process the regex pattern
-    i = 0
-    n = len(regex)
 
-    while i < n:
-        char = regex[i]
-        processing_steps.append(f"Processing position {i}: '{char}'")
-
-        if char == '?':  # Optional preceding character
-            if random.choice([True, False]):
-                result.append(result.pop())  # Keep the last character
-            else:
-                result.pop()  # Remove the last character
-            i += 1
-
-        elif char == '{':  # Quantifier
-            # Find the closing brace
-            j = regex.find('}', i)
-            if j == -1:
-                raise ValueError("Unclosed brace in regex")
-            quantifier = regex[i + 1:j]
-
-            if '|' in result[-1]:  # Handle alternation group
-                group = result.pop()
-                choices = group[1:-1].split('|')
-                count = int(quantifier)
-                selected = random.choices(choices, k=count)
-                result.extend(selected)
-            else:  # Simple repetition
-                char_to_repeat = result.pop()
-                count = int(quantifier)
-                result.extend([char_to_repeat] * count)
-            i = j + 1
-
-        elif char == '(':  # Group start
-            # Find the closing parenthesis
-            j = regex.find(')', i)
-            if j == -1:
-                raise ValueError("Unclosed parenthesis in regex")
-            group = regex[i:j + 1]
-            result.append(group)
-            i = j + 1
-
-        elif char == '|':  # Part of alternation (handled in group processing)
-            i += 1
-
-        elif char == '*':  # 0 to 5 repetitions
-            char_to_repeat = result.pop()
-            count = random.randint(0, 5)
-            result.extend([char_to_repeat] * count)
-            i += 1
-
-        elif char == '+':  # 1 to 5 repetitions
-            char_to_repeat = result.pop()
-            count = random.randint(1, 5)
-            result.extend([char_to_repeat] * count)
-            i += 1
-
-        else:  # Literal character
-            result.append(char)
-            i += 1
-
-    processing_steps.append("Final result construction")
-    return ''.join(result), processing_steps
+def generate_with_steps(regex: str = None) -> Tuple[str, List[str]]:
+    """generate_from_regex with tracing on, for the first variant pattern by default."""
+    return generate_from_regex(regex or patterns[0], trace=True)
 
 
 # Variant patterns
@@ -94,17 +418,3 @@ patterns = [
     "(X|Y|Z){3}8+(9|O){2}",
     "(H|I)(J|K)L*N?"
 ]
-
-# Generate examples for each pattern
-for pattern in patterns:
-    print(f"\nGenerating strings for pattern: {pattern}")
-    for _ in range(3):  # Generate 3 examples per pattern
-        result, steps = generate_from_regex(pattern)
-        print(f"  Example: {result}")
-
-    # Show processing steps for one generation
-    print("\nProcessing steps example:")
-    result, steps = generate_from_regex(pattern)
-    for step in steps:
-        print(f"  {step}")
-    print(f"  Final result: {result}")
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Uniform random words of an exact length.
+
+Both samplers count, for every state or nonterminal and every length, how
+many words (derivations) it produces, and then build a word left to right,
+choosing each step with probability proportional to the number of
+completions. Every word of length n is then equally likely and a sample
+costs O(n) steps. Counts are extended lazily up to the longest length asked for.
+"""
+import random
+from bisect import bisect_right
+
+import numpy as np
+
+# int64 counts stay exact below this; larger counts switch to Python ints (object arrays)
+_EXACT_LIMIT = 1 << 62
+
+
+class DFASampler:
+    """
+    Uniform sampling from the language of a deterministic FiniteAutomaton,
+    e.g. one built by FiniteAutomaton.grammar_to_DFA or nfa_to_dfa.
+    counts[n][s] (the number of accepted words of length n read from state s)
+    is a matrix-vector product per length with the transition count matrix:
+    counts[n] = M @ counts[n - 1], M[s, t] being the number of symbols leading
+    from s to t, so counts[n] = M^n @ accepting.
+    """
+
+    def __init__(self, automaton):
+        self.compiled = automaton.compile()
+        self.symbols = self.compiled.symbols
+        self.next_states = self.compiled.table[:, :len(self.symbols)]
+        size = len(self.compiled.states)
+        matrix = np.zeros((size, size), dtype=np.int64)
+        rows = np.arange(size)
+        for column in range(len(self.symbols)):
+            np.add.at(matrix, (rows, self.next_states[:, column]), 1)
+        matrix[0] = 0  # the dead state
+        self.matrix = matrix
+        self._branching = int(matrix.sum(axis=1).max(initial=0))
+        self._counts = [self.compiled.accepting.astype(np.int64)]
+
+    @property
+    def exact_int64(self) -> bool:
+        """Whether the counts computed so far fit in int64 (otherwise they are Python ints)."""
+        return self._counts[-1].dtype != object
+
+    def _extend(self, n):
+        counts = self._counts
+        while len(counts) <= n:
+            last = counts[-1]
+            if last.dtype != object and int(last.max(initial=0)) * self._branching >= _EXACT_LIMIT:
+                self.matrix = self.matrix.astype(object)
+                counts[:] = [level.astype(object) for level in counts]
+                last = counts[-1]
+            counts.append(self.matrix @ last)
+
+    def count(self, n) -> int:
+        """Number of words of length n in the language."""
+        self._extend(n)
+        return int(self._counts[n][self.compiled.start])
+
+    @staticmethod
+    def rng(seed=None):
+        """The random generator the sampling methods take."""
+        return np.random.default_rng(seed)
+
+    def sample(self, n, rng=None) -> str:
+        return self.sample_many(n, 1, rng)[0]
+
+    def sample_many(self, n, size, rng=None) -> list:
+        """
+        size independent uniform words of length n. All words are drawn in
+        lockstep, one vectorized choice per position.
+        """
+        rng = self.rng() if rng is None else rng
+        if self.count(n) == 0:
+            raise ValueError(f"The language has no words of length {n}")
+        if not self.exact_int64:
+            exact = random.Random(int(rng.integers(1 << 63)))
+            return [self._sample_exact(n, exact) for _ in range(size)]
+
+        states = np.full(size, self.compiled.start, dtype=self.next_states.dtype)
+        choices = np.empty((size, n), dtype=np.intp)
+        every = np.arange(size)
+        for position in range(n):
+            targets = self.next_states[states]
+            cumulative = self._counts[n - 1 - position][targets].cumsum(axis=1)
+            draws = rng.integers(0, cumulative[:, -1])
+            choice = (cumulative <= draws[:, None]).sum(axis=1)
+            choices[:, position] = choice
+            states = targets[every, choice]
+        return self._words(choices)
+
+    def _sample_exact(self, n, rnd) -> str:
+        state = self.compiled.start
+        word = []
+        for position in range(n):
+            targets = self.next_states[state]
+            cumulative = np.cumsum(self._counts[n - 1 - position][targets]).tolist()
+            choice = bisect_right(cumulative, rnd.randrange(cumulative[-1]))
+            word.append(self.symbols[choice])
+            state = targets[choice]
+        return ''.join(word)
+
+    def _words(self, choices):
+        size, n = choices.shape
+        if n == 0:
+            return [''] * size
+        if all(len(symbol) == 1 for symbol in self.symbols):
+            # the code points of each row read as one fixed-width str
+            codes = np.array([ord(symbol) for symbol in self.symbols], dtype=np.uint32)[choices]
+            return codes.view(f'<U{n}').ravel().tolist()
+        return [''.join(self.symbols[c] for c in row) for row in choices.tolist()]
+
+
+class CNFSampler:
+    """
+    Uniform sampling of derivations of exact length from a grammar in Chomsky
+    normal form (see ChomskyNormalForm.Grammar.to_cnf). For an unambiguous
+    grammar this is uniform over words; an ambiguous word is drawn in
+    proportion to its number of parse trees.
+    counts[A][n] = #{A → a, if n = 1} + Σ over A → B C and 0 < k < n of
+    counts[B][k] * counts[C][n - k], as exact Python ints. The choice of rule
+    and split for each (A, n) is a cumulative table searched by bisection.
+    """
+
+    def __init__(self, grammar):
+        self.start = grammar.S
+        self.terminal_rules = {}
+        self.binary_rules = {}
+        self.accepts_empty = False
+        for left, right in grammar.P:
+            if len(right) == 1 and right[0] in grammar.VT:
+                self.terminal_rules.setdefault(left, []).append(right[0])
+            elif len(right) == 2 and right[0] in grammar.VN and right[1] in grammar.VN:
+                self.binary_rules.setdefault(left, []).append(right)
+            elif right == ('ε',) and left == grammar.S:
+                self.accepts_empty = True
+            else:
+                raise ValueError(f"Not in Chomsky normal form: {left} → {' '.join(right)}")
+        # counts[A][n]; index 0 is unused (ε only counts for the start symbol)
+        self.counts = {symbol: [0, len(self.terminal_rules.get(symbol, ()))]
+                       for symbol in set(grammar.VN) | {grammar.S}}
+        self._length = 1
+        self._tables = {}
+
+    def _extend(self, n):
+        counts = self.counts
+        for length in range(self._length + 1, n + 1):
+            level = {}
+            for symbol, rules in self.binary_rules.items():
+                total = 0
+                for first, second in rules:
+                    first_counts, second_counts = counts[first], counts[second]
+                    total += sum(first_counts[k] * second_counts[length - k] for k in range(1, length))
+                level[symbol] = total
+            for symbol, symbol_counts in counts.items():
+                symbol_counts.append(level.get(symbol, 0))
+            self._length = length
+
+    def count(self, n) -> int:
+        """Number of derivations of words of length n from the start symbol."""
+        if n == 0:
+            return int(self.accepts_empty)
+        self._extend(n)
+        return self.counts[self.start][n]
+
+    @staticmethod
+    def rng(seed=None):
+        """The random generator the sampling methods take."""
+        return random.Random(seed)
+
+    def _table(self, symbol, n):
+        """(cumulative weights, choices) for expanding symbol into n characters."""
+        key = (symbol, n)
+        table = self._tables.get(key)
+        if table is None:
+            cumulative, choices = [], []
+            total = 0
+            if n == 1:
+                for terminal in self.terminal_rules.get(symbol, ()):
+                    total += 1
+                    cumulative.append(total)
+                    choices.append(terminal)
+            else:
+                for first, second in self.binary_rules.get(symbol, ()):
+                    for k in range(1, n):
+                        weight = self.counts[first][k] * self.counts[second][n - k]
+                        if weight:
+                            total += weight
+                            cumulative.append(total)
+                            choices.append((first, k, second, n - k))
+            table = self._tables[key] = (cumulative, choices)
+        return table
+
+    def sample(self, n, rng=None) -> str:
+        rng = self.rng() if rng is None else rng
+        if self.count(n) == 0:
+            raise ValueError(f"The grammar derives no words of length {n}")
+        word = []
+        pending = [(self.start, n)] if n else []
+        while pending:
+            cumulative, choices = self._table(*pending.pop())
+            choice = choices[bisect_right(cumulative, rng.randrange(cumulative[-1]))]
+            if isinstance(choice, str):
+                word.append(choice)
+            else:
+                first, k, second, rest = choice
+                pending.append((second, rest))
+                pending.append((first, k))
+        return ''.join(word)
+
+    def sample_many(self, n, size, rng=None) -> list:
+        rng = self.rng() if rng is None else rng
+        return [self.sample(n, rng) for _ in range(size)]
+
+
+def write_samples(path, sampler, n, count, seed=None, chunk_size=65536) -> int:
+    """
+    Stream count uniform words of length n from sampler to path, one per line,
+    chunk_size at a time so memory stays bounded. Returns the number written.
+    """
+    rng = sampler.rng(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < count:
+            size = min(chunk_size, count - written)
+            f.write('\n'.join(sampler.sample_many(n, size, rng)) + '\n')
+            written += size
+    return written
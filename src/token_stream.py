@@ -0,0 +1,129 @@
+import re
+from array import array
+
+from .lexer import TokenType, SQL_KEYWORDS, MASTER_PATTERN, TOKEN_PATTERNS
+
+# one byte per token type, in TokenType declaration order
+TOKEN_TYPES = list(TokenType)
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# the master pattern for bytes sources (\d and \b are ASCII-only there). A
+# bytes \s lacks the separators \x1c-\x1f that str \s matches, so the
+# whitespace class is spelled out to agree with sql_lexer on ASCII input.
+_BYTES_WHITESPACE = r'[\t\n\x0b\x0c\r\x1c-\x1f ]'
+_BYTES_PATTERN = re.compile(MASTER_PATTERN.pattern.replace(r'\s', _BYTES_WHITESPACE).encode('ascii'),
+                            re.IGNORECASE)
+_BYTES_KEYWORDS = {keyword.encode('ascii') for keyword in SQL_KEYWORDS}
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+_GROUP_CODES = {token_type.name: TYPE_CODES[token_type] for token_type, _, _ in TOKEN_PATTERNS}
+
+
+class TokenStream:
+    """
+    Tokens of a source stored as parallel arrays instead of (TokenType, value)
+    tuples: types[i] is the TYPE_CODES entry of token i and starts[i]/ends[i] its
+    offsets into source. Values are only sliced out when a token is accessed.
+    """
+
+    def __init__(self, source, types, starts, ends, encoding='utf-8'):
+        self.source = source
+        self.types = types
+        self.starts = starts
+        self.ends = ends
+        self.encoding = encoding
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return TOKEN_TYPES[self.types[index]], self.value(index)
+
+    def __iter__(self):
+        # yields the same (TokenType, value) pairs as sql_lexer, one at a time,
+        # so a Parser can consume the stream directly
+        for index in range(len(self.types)):
+            yield TOKEN_TYPES[self.types[index]], self.value(index)
+
+    def token_type(self, index) -> TokenType:
+        return TOKEN_TYPES[self.types[index]]
+
+    def view(self, index):
+        """Zero-copy memoryview of the token for bytes sources, a str slice otherwise."""
+        if isinstance(self.source, str):
+            return self.source[self.starts[index]:self.ends[index]]
+        return memoryview(self.source)[self.starts[index]:self.ends[index]]
+
+    def value(self, index) -> str:
+        value = self.source[self.starts[index]:self.ends[index]]
+        if isinstance(value, str):
+            return value
+        return bytes(value).decode(self.encoding, 'replace')
+
+    def nbytes(self) -> int:
+        """Memory used by the token arrays."""
+        return sum(a.itemsize * len(a) for a in (self.types, self.starts, self.ends))
+
+
+def lex_spans(source, encoding='utf-8') -> TokenStream:
+    """
+    Tokenize source into a TokenStream. source can be a str or a bytes-like
+    object (bytes, bytearray, mmap) in an ASCII-compatible encoding. Pure
+    ASCII bytes are matched in place without decoding. Bytes holding any
+    non-ASCII character are decoded and matched with the str pattern (\\s, \\d
+    and \\b are Unicode-aware there), so the tokens are always those of
+    sql_lexer on the decoded text; the spans are still byte offsets.
+    """
+    if isinstance(source, str):
+        types, starts, ends = _lex_offsets(source, MASTER_PATTERN, SQL_KEYWORDS, len(source))
+    elif not _NON_ASCII.search(source):
+        types, starts, ends = _lex_offsets(source, _BYTES_PATTERN, _BYTES_KEYWORDS, len(source))
+    else:
+        # surrogateescape keeps undecodable bytes one code point each, so
+        # re-encoding the text gives back the exact byte offsets
+        text = bytes(source).decode(encoding, 'surrogateescape')
+        types, starts, ends = _lex_offsets(text, MASTER_PATTERN, SQL_KEYWORDS, len(source))
+        _to_byte_offsets(text, starts, ends, encoding)
+    return TokenStream(source, types, starts, ends, encoding)
+
+
+def _lex_offsets(source, pattern, keywords, size):
+    """Type codes and start/end offsets of the tokens; size bounds the offsets (it picks the array type)."""
+    match_at = pattern.match
+    keyword_code = TYPE_CODES[TokenType.KEYWORD]
+    identifier_code = TYPE_CODES[TokenType.IDENTIFIER]
+    whitespace_code = TYPE_CODES[TokenType.WHITESPACE]
+    unknown_code = TYPE_CODES[TokenType.UNKNOWN]
+
+    end = len(source)
+    offset_type = 'I' if size < 1 << 32 else 'Q'
+    types, starts, ends = array('B'), array(offset_type), array(offset_type)
+    pos = 0
+    while pos < end:
+        match = match_at(source, pos)
+        if match:
+            code = _GROUP_CODES[match.lastgroup]
+            next_pos = match.end()
+            if code == keyword_code and source[pos:next_pos].upper() not in keywords:
+                code = identifier_code
+            if code != whitespace_code:
+                types.append(code)
+                starts.append(pos)
+                ends.append(next_pos)
+            pos = next_pos
+        else:
+            types.append(unknown_code)
+            starts.append(pos)
+            ends.append(pos + 1)
+            pos += 1
+    return types, starts, ends
+
+
+def _to_byte_offsets(text, starts, ends, encoding):
+    """Rewrite character offsets into text as byte offsets, in place (the spans are in order)."""
+    char_pos = byte_pos = 0
+    for index in range(len(starts)):
+        for offsets in (starts, ends):
+            offset = offsets[index]
+            byte_pos += len(text[char_pos:offset].encode(encoding, 'surrogateescape'))
+            char_pos = offset
+            offsets[index] = byte_pos
@@ -0,0 +1,116 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmarks.workloads import lab1_grammar, random_nfa
+from src.finite_automation import EPSILON, FiniteAutomaton
+from src.regex import thompson_nfa
+
+MAX_LENGTH = 7
+
+NFAS = [random_nfa(n, seed=seed) for n in (3, 6, 10) for seed in range(4)] + \
+       [thompson_nfa(pattern) for pattern in ('a(b|c)*a?', '(ab|a)*b+', '(a|b){2,3}c?')]
+
+
+def words(alphabet, max_length=MAX_LENGTH):
+    return [''.join(w) for n in range(max_length + 1) for w in itertools.product(alphabet, repeat=n)]
+
+
+def targets(automaton, state, symbol):
+    result = automaton.delta.get(state, {}).get(symbol, ())
+    return {result} if isinstance(result, str) else set(result)
+
+
+def nfa_accepts(automaton, word):
+    """Reference membership: the set of reachable NFA states, with ε-closures."""
+    def closure(states):
+        pending, closed = list(states), set(states)
+        while pending:
+            for target in targets(automaton, pending.pop(), EPSILON) - closed:
+                closed.add(target)
+                pending.append(target)
+        return closed
+
+    current = closure({automaton.q0})
+    for symbol in word:
+        current = closure({t for state in current for t in targets(automaton, state, symbol)})
+    return bool(current & set(automaton.F))
+
+
+@pytest.mark.parametrize('nfa', NFAS)
+def test_subset_construction(nfa):
+    dfa = nfa.nfa_to_dfa()
+    assert dfa.is_deterministic()
+    for word in words(nfa.Alphabet):
+        assert dfa.word_belongs_to_language(word) == nfa_accepts(nfa, word), word
+
+
+@pytest.mark.parametrize('max_states', [1, 2, 1024])
+def test_lazy_dfa_matches_nfa(max_states):
+    for nfa in NFAS:
+        lazy = nfa.lazy_dfa(max_states=max_states, max_flushes=2)
+        for word in words(nfa.Alphabet, 6) + ['x', 'ax']:
+            assert lazy.matches(word) == nfa_accepts(nfa, word), word
+    if max_states == 1:
+        assert lazy.cache_info()['fallbacks'] > 0
+
+
+def distinct_states(dfa):
+    """Number of pairwise inequivalent states of a DFA, by Moore refinement (None is the implicit dead state)."""
+    states = list(dfa.delta) + [None]
+    move = {s: {a: (dfa.delta[s].get(a) if s is not None else None) for a in dfa.Alphabet} for s in states}
+    block = {s: s in dfa.F for s in states}
+    while True:
+        signature = {s: (block[s],) + tuple(block[move[s][a]] for a in dfa.Alphabet) for s in states}
+        ids = {key: i for i, key in enumerate(set(signature.values()))}
+        if len(ids) == len(set(block.values())):
+            return len({block[s] for s in dfa.delta})
+        block = {s: ids[signature[s]] for s in states}
+
+
+@pytest.mark.parametrize('nfa', NFAS)
+def test_minimization(nfa):
+    dfa = nfa.nfa_to_dfa()
+    minimal = nfa.nfa_to_dfa(minimize=True)
+    assert minimal.is_deterministic()
+    for word in words(nfa.Alphabet):
+        assert minimal.word_belongs_to_language(word) == dfa.word_belongs_to_language(word), word
+    assert distinct_states(minimal) == len(minimal.delta) == distinct_states(dfa)
+    assert len(minimal.minimize().delta) == len(minimal.delta)
+
+
+def test_minimize_merges_equivalent_states():
+    # q1 and q2 both accept exactly one more 'a'
+    dfa = FiniteAutomaton.from_definition(['q0', 'q1', 'q2', 'q3', 'q4'], ['a', 'b'], 'q0',
+                                          {'q0': {'a': 'q1', 'b': 'q2'}, 'q1': {'a': 'q3'},
+                                           'q2': {'a': 'q4'}, 'q3': {}, 'q4': {}}, ['q3', 'q4'])
+    minimal = dfa.minimize()
+    assert minimal.q0 == 'q0'
+    assert sorted(minimal.delta) == ['q0', 'q1', 'q3']
+    with pytest.raises(ValueError):
+        FiniteAutomaton.from_definition(['q0'], ['a'], 'q0', {'q0': {'a': {'q0', 'q1'}}}, []).minimize()
+
+
+def test_compiled_dfa_batch_matches_single_words():
+    for nfa in NFAS:
+        dfa = nfa.nfa_to_dfa()
+        compiled = dfa.compile()
+        batch = words(nfa.Alphabet) + ['x', 'ax', 'é']
+        expected = [dfa.word_belongs_to_language(word) for word in batch]
+        assert [compiled.accepts(word) for word in batch] == expected
+        assert compiled.accepts_batch(batch).tolist() == expected
+        padded = np.zeros((len(batch), MAX_LENGTH + 1), dtype=np.uint8)
+        for i, word in enumerate(batch):
+            data = word.encode('utf-8')
+            padded[i, :len(data)] = list(data)
+        assert compiled.accepts_batch(padded).tolist() == expected
+    assert compiled.accepts_batch([]).tolist() == []
+
+
+def test_lab1_automaton():
+    grammar = lab1_grammar()
+    automaton = FiniteAutomaton.grammar_to_DFA(grammar)
+    compiled = automaton.compile()
+    batch = words(grammar.terminals, 5)
+    assert compiled.accepts_batch(batch).tolist() == [automaton.word_belongs_to_language(w) for w in batch]
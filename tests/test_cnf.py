@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from src.ChomskyNormalForm import Grammar
+
+MAX_LENGTH = 6
+
+
+def lab5_grammar():
+    P = [('S', ('a', 'B')), ('S', ('A',)), ('A', ('b', 'A', 'a')), ('A', ('a', 'S')), ('A', ('a',)),
+         ('B', ('A', 'b', 'B')), ('B', ('B', 'S')), ('B', ('a',)), ('B', ('ε',)), ('C', ('B', 'A')),
+         ('D', ('a',))]
+    return Grammar({'S', 'A', 'B', 'C', 'D'}, {'a', 'b'}, P, 'S')
+
+
+def random_grammar(seed):
+    # recursive, with ε- and unit productions and cycles between nonterminals
+    rng = random.Random(seed)
+    nonterminals = ['S', 'A', 'B', 'C']
+    P = []
+    for _ in range(10):
+        right = tuple(rng.choice(nonterminals + ['a', 'b']) for _ in range(rng.randint(1, 4)))
+        P.append((rng.choice(nonterminals), right))
+    P.append((rng.choice(nonterminals), ('ε',)))
+    P.append(('S', ('a',)))
+    return Grammar(set(nonterminals), {'a', 'b'}, P, 'S')
+
+
+def cfg_language(grammar, max_length=MAX_LENGTH):
+    """Words of any grammar up to max_length, by a fixpoint over the words of every nonterminal."""
+    words = {symbol: set() for symbol in grammar.VN | {left for left, _ in grammar.P}}
+
+    def expand(right):
+        result = {''}
+        for symbol in right:
+            options = words[symbol] if symbol in words else {symbol}
+            result = {x + y for x in result for y in options if len(x) + len(y) <= max_length}
+        return result
+
+    changed = True
+    while changed:
+        changed = False
+        for left, right in grammar.P:
+            new = expand(() if right == ('ε',) else right) - words[left]
+            if new:
+                words[left] |= new
+                changed = True
+    return words.get(grammar.S, set())
+
+
+def cnf_language(grammar, max_length=MAX_LENGTH):
+    """Words of a CNF grammar up to max_length, by brute force over lengths and splits."""
+    words = {symbol: {} for symbol in grammar.VN | {grammar.S}}
+    for n in range(1, max_length + 1):
+        for left, right in grammar.P:
+            assert (len(right) == 1 and right[0] in grammar.VT or len(right) == 2 and set(right) <= grammar.VN
+                    or right == ('ε',) and left == grammar.S), (left, right)
+        for left, right in grammar.P:
+            level = words[left].setdefault(n, set())
+            if len(right) == 1 and n == 1 and right[0] != 'ε':
+                level.add(right[0])
+            elif len(right) == 2:
+                for k in range(1, n):
+                    level.update(x + y for x in words[right[0]].get(k, ()) for y in words[right[1]].get(n - k, ()))
+    language = set().union(*words[grammar.S].values())
+    if (grammar.S, ('ε',)) in grammar.P:
+        language.add('')
+    return language
+
+
+@pytest.mark.parametrize('make', [lab5_grammar] + [lambda seed=seed: random_grammar(seed) for seed in range(20)])
+def test_classic_and_bin_first_derive_the_same_words(make):
+    classic = cnf_language(make().to_cnf('classic'))
+    bin_first = cnf_language(make().to_cnf('bin_first'))
+    # classic drops ε from the language, bin_first keeps it as S0 → ε
+    assert classic == bin_first - {''}
+
+
+def test_dropping_every_nullable_symbol_keeps_the_rest():
+    # A → bA | ε: removing the nullable A from bA leaves A → b
+    grammar = Grammar({'S', 'A'}, {'b'}, [('S', ('A', 'b')), ('A', ('b', 'A')), ('A', ('ε',))], 'S')
+    assert cnf_language(grammar.to_cnf()) == {'b' * n for n in range(1, MAX_LENGTH + 1)}
+
+
+GRAMMARS = [lab5_grammar] + [lambda seed=seed: random_grammar(seed) for seed in range(40)]
+
+
+@pytest.mark.parametrize('make', GRAMMARS)
+def test_bin_first_keeps_the_language(make):
+    grammar = make().to_cnf('bin_first')
+    assert cnf_language(grammar) == cfg_language(make())
+    if (grammar.S, ('ε',)) in grammar.P:
+        assert all(grammar.S not in right for _, right in grammar.P)
+
+
+def test_bin_first_stays_polynomial_on_long_nullable_rules():
+    # S → A1 ... Ak b: classic mode gives 2^k productions, bin_first at most quadratically many
+    from benchmarks.workloads import long_nullable_cfg
+    for k in (4, 8, 16, 32):
+        assert len(long_nullable_cfg(k).to_cnf('bin_first').P) <= k * k + k
+    assert cnf_language(long_nullable_cfg(4).to_cnf('bin_first')) == cfg_language(long_nullable_cfg(4))
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        lab5_grammar().to_cnf('fast')
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from benchmarks.workloads import random_cfg, random_nfa
+from src.compile_cache import CompileCache
+from src.dfa_lexer import build_lexer_table
+from test_cnf import lab5_grammar
+from test_lexer import CORPUS
+
+
+def mapped(path):
+    with open('/proc/self/maps') as f:
+        return os.path.realpath(path) in f.read()
+
+
+def test_cnf_round_trip(tmp_path):
+    for grammar, mode in [(lab5_grammar(), 'classic'), (lab5_grammar(), 'bin_first'), (random_cfg(200), 'classic')]:
+        before = list(grammar.P)
+        computed = CompileCache(tmp_path).cnf(grammar, mode)
+        loaded = CompileCache(tmp_path).cnf(grammar, mode)
+        assert grammar.P == before
+        assert (loaded.P, loaded.VN, loaded.VT, loaded.S, loaded.next_new_nonterminal) == \
+            (computed.P, computed.VN, computed.VT, computed.S, computed.next_new_nonterminal)
+
+
+def test_dfa_round_trip(tmp_path):
+    for minimize in (False, True):
+        nfa = random_nfa(10, seed=3)
+        computed = CompileCache(tmp_path).dfa(nfa, minimize)
+        loaded = CompileCache(tmp_path).dfa(nfa, minimize)
+        assert (loaded.Q, loaded.Alphabet, loaded.q0, loaded.delta, loaded.F) == \
+            (computed.Q, computed.Alphabet, computed.q0, computed.delta, computed.F)
+
+
+def test_lexer_table_round_trip(tmp_path):
+    CompileCache(tmp_path).lexer_table()
+    cache = CompileCache(tmp_path)
+    table = cache.lexer_table()
+    assert cache.cache_info() == (1, 0, 0, 0)
+    assert table.to_bytes() == build_lexer_table().to_bytes()
+    reference = build_lexer_table()
+    for query in CORPUS[:200]:
+        assert table.tokenize(query) == reference.tokenize(query)
+
+
+def test_counters_and_bad_entries(tmp_path):
+    cache = CompileCache(tmp_path)
+    grammar = lab5_grammar()
+    cache.cnf(grammar)
+    cache.cnf(grammar)
+    assert cache.cache_info() == (1, 1, 1, 0)
+    (entry,) = [name for name in os.listdir(tmp_path) if name.endswith('.bin')]
+    with open(tmp_path / entry, 'r+b') as f:
+        f.write(b'JUNK')
+    assert sorted(cache.cnf(grammar).P) == sorted(lab5_grammar().to_cnf().P)
+    assert cache.cache_info() == (1, 2, 2, 1)
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 0, 0) and not os.listdir(tmp_path)
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/maps'), reason="needs /proc/self/maps")
+def test_entries_are_unmapped_after_loading(tmp_path):
+    cache = CompileCache(tmp_path)
+    cache.cnf(lab5_grammar())
+    cache.dfa(random_nfa(6))
+    for name in os.listdir(tmp_path):
+        assert not mapped(tmp_path / name)
+    cache.cnf(lab5_grammar())
+    cache.dfa(random_nfa(6))
+    assert cache.cache_info().hits == 2
+    for name in os.listdir(tmp_path):
+        assert not mapped(tmp_path / name)
@@ -0,0 +1,92 @@
+import itertools
+
+import pytest
+
+from src.ChomskyNormalForm import Grammar
+from test_cnf import cfg_language, lab5_grammar, random_grammar
+
+MAX_LENGTH = 6
+
+
+def all_words(alphabet, max_length=MAX_LENGTH):
+    return [''.join(w) for n in range(max_length + 1) for w in itertools.product(sorted(alphabet), repeat=n)]
+
+
+def count_derivations(grammar, word):
+    """Number of parse trees of word in a CNF grammar, by dynamic programming over spans."""
+    n = len(word)
+    if n == 0:
+        return int((grammar.S, ('ε',)) in grammar.P)
+    count = {}
+    for length in range(1, n + 1):
+        for i in range(n - length + 1):
+            j = i + length
+            for left, right in grammar.P:
+                if length == 1 and right == (word[i],):
+                    total = 1
+                elif len(right) == 2 and right[0] in grammar.VN:
+                    total = sum(count.get((right[0], i, k), 0) * count.get((right[1], k, j), 0)
+                                for k in range(i + 1, j))
+                else:
+                    continue
+                count[left, i, j] = count.get((left, i, j), 0) + total
+    return count.get((grammar.S, 0, n), 0)
+
+
+def tree_yield(tree):
+    return ''.join(tree_yield(child) if isinstance(child, tuple) else child for child in tree[1:])
+
+
+def check_tree(grammar, tree):
+    """tree only uses productions of grammar."""
+    children = tuple(child[0] if isinstance(child, tuple) else child for child in tree[1:]) or ('ε',)
+    assert (tree[0], children) in grammar.P, tree
+    for child in tree[1:]:
+        if isinstance(child, tuple):
+            check_tree(grammar, child)
+
+
+GRAMMARS = [lab5_grammar] + [lambda seed=seed: random_grammar(seed) for seed in range(10)]
+
+
+@pytest.mark.parametrize('make', GRAMMARS)
+def test_recognizes_the_language(make):
+    language = cfg_language(make())
+    for mode in ('classic', 'bin_first'):
+        parser = make().to_cnf(mode).cyk()
+        for word in all_words({'a', 'b'}):
+            expected = word in language and (word or mode == 'bin_first')
+            assert parser.recognize(word) == bool(expected), (mode, word)
+
+
+@pytest.mark.parametrize('make', GRAMMARS)
+def test_trees_and_forests(make):
+    grammar = make().to_cnf('bin_first')
+    parser = grammar.cyk()
+    for word in all_words({'a', 'b'}, 5):
+        tree, forest = parser.parse(word), parser.parse(word, forest=True)
+        count = count_derivations(grammar, word)
+        if not count:
+            assert tree is None and forest is None
+            continue
+        assert forest.count_trees() == count
+        assert forest.tree() == tree
+        check_tree(grammar, tree)
+        assert tree_yield(tree) == word
+        trees = list(forest.trees())
+        assert len(set(trees)) == count and all(tree_yield(t) == word for t in trees)
+
+
+def test_ambiguous_grammar_counts_catalan_numbers():
+    # S → S S | a: a^n has Catalan(n - 1) parse trees
+    parser = Grammar({'S'}, {'a'}, [('S', ('S', 'S')), ('S', ('a',))], 'S').cyk()
+    catalan = [1, 1, 2, 5, 14, 42, 132, 429]
+    for n in range(1, 9):
+        forest = parser.forest('a' * n)
+        assert forest.count_trees() == catalan[n - 1]
+        assert forest.is_ambiguous() == (n > 2)
+
+
+def test_rejects_grammars_not_in_cnf():
+    with pytest.raises(ValueError):
+        Grammar({'S'}, {'a'}, [('S', ('a', 'S'))], 'S').cyk()
@@ -0,0 +1,83 @@
+import itertools
+import re
+
+import pytest
+
+from src.dfa_lexer import LexerTable, _Glushkov, _PatternParser, build_lexer_table, dfa_lexer
+from src.lexer import TokenType, sql_lexer
+from test_lexer import CORPUS
+
+PATTERNS = [r'[a-zA-Z_][a-zA-Z0-9_]*', r'\d+(?:\.\d+)?', r'<=|>=|<>|!=|=|<|>', r'\'([^\']*)\'',
+            r'--.*', r'(ab|b)*a?', r'a+b?c*', r'[^ab]', r'(?:a|)(b|c)+']
+ALPHABET = 'abcAB19_.<>=!\' \n-x'
+
+
+def glushkov_matches(pattern, text):
+    automaton = _Glushkov(_PatternParser(pattern).parse())
+    if not text:
+        return automaton.nullable
+    current = {p for p in automaton.first if ord(text[0]) in automaton.charsets[p]}
+    for char in text[1:]:
+        current = {q for p in current for q in automaton.follow[p] if ord(char) in automaton.charsets[q]}
+    return bool(current & automaton.last)
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_position_automaton_matches_re(pattern):
+    regex = re.compile(pattern, re.IGNORECASE)
+    for length in range(4):
+        for chars in itertools.product(ALPHABET, repeat=length):
+            text = ''.join(chars)
+            assert glushkov_matches(pattern, text) == (regex.fullmatch(text) is not None), (pattern, text)
+
+
+@pytest.mark.parametrize('pattern', ['(a', '[ab', 'a)', r'a\bb', 'é'])
+def test_pattern_parser_rejects_unsupported_patterns(pattern):
+    with pytest.raises(ValueError):
+        _PatternParser(pattern).parse()
+
+
+def test_table_is_minimal():
+    # Moore refinement finds no two live states with the same behaviour
+    table = build_lexer_table()
+    classes = range(table.num_classes)
+    block = {s: (table.accept[s], table.accept_free[s]) for s in range(table.num_states)}
+    while True:
+        signature = {s: (block[s],) + tuple(block[table.transitions[s * table.num_classes + c]] for c in classes)
+                     for s in block}
+        ids = {key: i for i, key in enumerate(set(signature.values()))}
+        if len(ids) == len(set(block.values())):
+            break
+        block = {s: ids[signature[s]] for s in signature}
+    assert len(set(block.values())) == table.num_states
+
+
+def test_matches_sql_lexer_without_dashes():
+    for query in CORPUS:
+        query = query.replace('-', ' ')
+        assert dfa_lexer(query) == sql_lexer(query), query
+
+
+def test_double_dash_is_a_comment():
+    # maximal munch reads '--' up to the end of the line as one COMMENT, while
+    # sql_lexer tries OPERATOR first and produces two '-' tokens
+    assert dfa_lexer("a -- b\nc") == [(TokenType.IDENTIFIER, 'a'), (TokenType.COMMENT, '-- b'),
+                                      (TokenType.IDENTIFIER, 'c')]
+    assert sql_lexer("a -- b\nc") == [(TokenType.IDENTIFIER, 'a'), (TokenType.OPERATOR, '-'),
+                                      (TokenType.OPERATOR, '-'), (TokenType.IDENTIFIER, 'b'),
+                                      (TokenType.IDENTIFIER, 'c')]
+    assert dfa_lexer("a - b") == sql_lexer("a - b")
+
+
+def test_table_round_trip(tmp_path):
+    table = build_lexer_table()
+    data = table.to_bytes()
+    loaded = LexerTable.from_bytes(data)
+    assert loaded.to_bytes() == data
+    path = tmp_path / 'sql.lexer'
+    table.save(path)
+    assert LexerTable.load(path).to_bytes() == data
+    for query in CORPUS[:200]:
+        assert loaded.tokenize(query) == table.tokenize(query), query
+    with pytest.raises(ValueError):
+        LexerTable.from_bytes(b'XXXX' + data[4:])
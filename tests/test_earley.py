@@ -0,0 +1,105 @@
+import itertools
+from functools import lru_cache
+
+import pytest
+
+from src.ChomskyNormalForm import Grammar
+from test_cnf import cfg_language, lab5_grammar, random_grammar
+
+MAX_LENGTH = 6
+
+
+def all_words(alphabet, max_length=MAX_LENGTH):
+    return [''.join(w) for n in range(max_length + 1) for w in itertools.product(sorted(alphabet), repeat=n)]
+
+
+def count_trees(grammar, word):
+    """Parse trees of word in an ε-free grammar without unit cycles, by brute force over splits."""
+    @lru_cache(maxsize=None)
+    def symbol(s, i, j):
+        if s not in grammar.VN:
+            return int(j == i + 1 and word[i] == s)
+        return sum(sequence(right, i, j) for left, right in grammar.P if left == s)
+
+    @lru_cache(maxsize=None)
+    def sequence(right, i, j):
+        if len(right) == 1:
+            return symbol(right[0], i, j)
+        return sum(symbol(right[0], i, k) * sequence(right[1:], k, j) for k in range(i + 1, j))
+
+    return symbol(grammar.S, 0, len(word)) if word else 0
+
+
+def tree_yield(tree):
+    return ''.join(tree_yield(child) if isinstance(child, tuple) else child for child in tree[1:])
+
+
+def check_tree(grammar, tree):
+    children = tuple(child[0] if isinstance(child, tuple) else child for child in tree[1:]) or ('ε',)
+    assert (tree[0], children) in grammar.P, tree
+    for child in tree[1:]:
+        if isinstance(child, tuple):
+            check_tree(grammar, child)
+
+
+@pytest.mark.parametrize('make', [lab5_grammar] + [lambda seed=seed: random_grammar(seed) for seed in range(20)])
+def test_recognizes_the_language(make):
+    grammar = make()
+    language = cfg_language(grammar)
+    parser = grammar.earley()
+    for word in all_words({'a', 'b'}):
+        assert parser.recognize(word) == (word in language), word
+
+
+AMBIGUOUS = [
+    Grammar({'E', 'T'}, {'a', '+', '*'}, [('E', ('E', '+', 'E')), ('E', ('E', '*', 'E')), ('E', ('T',)),
+                                          ('T', ('a',))], 'E'),
+    Grammar({'S'}, {'a', 'b'}, [('S', ('a', 'S', 'b')), ('S', ('a', 'b')), ('S', ('S', 'S'))], 'S'),
+    Grammar({'S', 'A'}, {'a'}, [('S', ('A', 'A', 'A')), ('A', ('a',)), ('A', ('a', 'a'))], 'S'),
+]
+
+
+@pytest.mark.parametrize('grammar', AMBIGUOUS)
+def test_forest_holds_every_parse_tree(grammar):
+    parser = grammar.earley()
+    for word in all_words(grammar.VT, 7):
+        result = parser.parse(word)
+        expected = count_trees(grammar, word)
+        assert result.accepted == bool(expected), word
+        assert result.items == sum(result.item_counts) and len(result.item_counts) == len(word) + 1
+        if not expected:
+            assert result.forest is None
+            continue
+        assert result.forest.count_trees() == expected, word
+        trees = list(result.forest.trees())
+        assert len(set(trees)) == expected
+        for tree in trees:
+            check_tree(grammar, tree)
+            assert tree_yield(tree) == word
+
+
+def test_nullable_symbols():
+    # S → A A c B, A → a | ε, B → b | ε
+    grammar = Grammar({'S', 'A', 'B'}, {'a', 'b', 'c'},
+                      [('S', ('A', 'A', 'c', 'B')), ('A', ('a',)), ('A', ('ε',)),
+                       ('B', ('b',)), ('B', ('ε',))], 'S')
+    parser = grammar.earley()
+    assert parser.recognize('aacb') and parser.recognize('c') and not parser.recognize('ab')
+    assert parser.parse('ac').forest.count_trees() == 2  # either A derives the a
+    forest = parser.parse('ac').forest
+    tree = forest.tree()
+    check_tree(grammar, tree)
+    assert tree_yield(tree) == 'ac'
+    assert parser.parse('ac', forest=False).forest is None
+
+
+@pytest.mark.parametrize('productions', [
+    [('S', ('S',)), ('S', ('a',))],                       # unit cycle
+    [('S', ('S', 'S')), ('S', ('a',)), ('S', ('ε',))],  # ε makes S → S S a unit step
+])
+def test_cyclic_forests_have_infinitely_many_trees(productions):
+    forest = Grammar({'S'}, {'a'}, productions, 'S').earley().parse('a').forest
+    with pytest.raises(ValueError):
+        forest.count_trees()
+    with pytest.raises(ValueError):
+        forest.tree()
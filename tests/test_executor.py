@@ -0,0 +1,51 @@
+import pytest
+
+from src.executor import Executor
+from src.parser import sql_parser
+from src.predicate import filter_rows
+
+COLUMNS = ['id', 'price', 'name']
+TYPED = [(1, 950, 'apple'), (2, 100, 'banana'), (3, 901.5, 'cherry'), (4, -5, '5'), (5, 900, 'date')]
+QUERIES = [
+    "SELECT id FROM t WHERE price >= 900",
+    "SELECT id FROM t WHERE 900 < price",
+    "SELECT id FROM t WHERE id = 3",
+    "SELECT id FROM t WHERE id != 3 AND price < 950",
+    "SELECT id FROM t WHERE price > 900 OR name LIKE 'b%'",
+    "SELECT id FROM t WHERE name = '5'",
+    "SELECT id FROM t WHERE name LIKE '%an%' OR (id <= 2 AND name LIKE '_pple')",
+    "SELECT id FROM t WHERE id = 4 AND price < 0",
+]
+
+
+def executor(rows):
+    executor = Executor()
+    executor.register_table('t', {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)})
+    return executor
+
+
+def expected(query, rows):
+    return [row[0] for row in filter_rows(sql_parser(query), rows, COLUMNS)]
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_execute_matches_filter_rows_on_typed_and_str_cells(query):
+    str_rows = [tuple(str(cell) for cell in row) for row in TYPED]
+    assert executor(TYPED).execute(query)['id'].tolist() == expected(query, TYPED)
+    assert executor(str_rows).execute(query)['id'].tolist() == expected(query, str_rows)
+
+
+def test_mixed_types_are_unequal_and_unordered():
+    table = executor(TYPED + [(6, 'n/a', 'x')])
+    assert table.execute("SELECT id FROM t WHERE price = 900")['id'].tolist() == [5]
+    assert table.execute("SELECT id FROM t WHERE id = 'a'")['id'].tolist() == []
+    assert table.execute("SELECT id FROM t WHERE id != 'a'")['id'].tolist() == [1, 2, 3, 4, 5, 6]
+    with pytest.raises(ValueError):
+        table.execute("SELECT id FROM t WHERE price > 900")
+    with pytest.raises(ValueError):
+        table.execute("SELECT id FROM t WHERE id < 'a'")
+
+
+def test_like_pattern_must_be_a_literal():
+    with pytest.raises(ValueError):
+        executor(TYPED).execute("SELECT id FROM t WHERE name LIKE name")
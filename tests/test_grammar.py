@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from src.grammar import DerivationEngine, Grammar
+
+LAB1 = {'S': ['aS', 'bB'], 'B': ['cB', 'd', 'aD'], 'D': ['aB', 'b']}
+
+
+def rewriting_generate_string(grammar, word):
+    """The original str.replace derivation that DerivationEngine has to reproduce."""
+    while not grammar.terminal_word(word):
+        for char in word:
+            if char in grammar.productions:
+                word = word.replace(char, random.choice(grammar.productions[char]), 1)
+                break
+    return word
+
+
+def test_generate_string_matches_rewriting_derivation():
+    grammar = Grammar(['S', 'B', 'D'], ['a', 'b', 'c', 'd'], LAB1, 'S')
+    for start in (None, 'aSbB'):
+        random.seed(7)
+        derived = [grammar.generate_string(start) for _ in range(500)]
+        random.seed(7)
+        assert derived == [rewriting_generate_string(grammar, start or 'S') for _ in range(500)]
+
+
+def test_seeded_engine_is_reproducible():
+    grammar = Grammar(['S', 'B', 'D'], ['a', 'b', 'c', 'd'], LAB1, 'S')
+    assert DerivationEngine(grammar, seed=3).derive_many(50) == DerivationEngine(grammar, seed=3).derive_many(50)
+
+
+def test_multi_character_symbols():
+    grammar = Grammar(['q0', 'q1', 'q10'], ['a', 'b'], {'q0': ['aq10', 'bq1'], 'q1': ['b'], 'q10': ['a', 'ε']}, 'q0')
+    assert set(DerivationEngine(grammar, seed=0).derive_many(100)) == {'aa', 'a', 'bb'}
+
+
+def test_nonterminal_without_productions_raises_value_error():
+    grammar = Grammar(['S', 'X'], ['a'], {'S': ['a']}, 'S')
+    engine = DerivationEngine(grammar, seed=0)
+    assert engine.derive() == 'a'
+    with pytest.raises(ValueError):
+        engine.derive('X')
+    with pytest.raises(ValueError):
+        Grammar(['S', 'X'], ['a'], {'S': ['aX']}, 'S').generate_string()
+
+
+def test_write_corpus_does_not_depend_on_workers(tmp_path):
+    grammar = Grammar(['S', 'B', 'D'], ['a', 'b', 'c', 'd'], LAB1, 'S')
+    grammar.write_corpus(tmp_path / 'one.txt', 1000, seed=1, workers=1, block_size=128)
+    grammar.write_corpus(tmp_path / 'two.txt', 1000, seed=1, workers=2, block_size=128)
+    lines = (tmp_path / 'one.txt').read_text().splitlines()
+    assert len(lines) == 1000
+    assert (tmp_path / 'two.txt').read_text().splitlines() == lines
+
+
+def derived_words(grammar, max_length):
+    """Words up to max_length by breadth-first leftmost derivation (forms with at most max_length + 2 symbols)."""
+    nonterminals = set(grammar.productions)
+    words = set()
+    seen = {(grammar.start,)}
+    pending = [(grammar.start,)]
+    while pending:
+        form = pending.pop()
+        position = next((i for i, symbol in enumerate(form) if symbol in nonterminals), None)
+        if position is None:
+            words.add(''.join(form))
+            continue
+        for production in grammar.productions[form[position]]:
+            new = form[:position] + grammar.split_symbols(production) + form[position + 1:]
+            terminals = sum(len(symbol) for symbol in new if symbol not in nonterminals)
+            if terminals <= max_length and len(new) <= max_length + 2 and new not in seen:
+                seen.add(new)
+                pending.append(new)
+    return {word for word in words if len(word) <= max_length}
+
+
+ENUMERATED = [
+    Grammar(['S', 'B', 'D'], ['a', 'b', 'c', 'd'], LAB1, 'S'),
+    # ε- and unit productions, including the unit cycle A → B → A
+    Grammar(['S', 'A', 'B'], ['a', 'b', 'c'], {'S': ['aSb', 'A'], 'A': ['B', 'cA'], 'B': ['A', 'ε']}, 'S'),
+    Grammar(['q0', 'q1', 'q10'], ['a', 'b'], {'q0': ['aq10', 'bq1'], 'q1': ['b'], 'q10': ['a', 'ε']}, 'q0'),
+]
+
+
+@pytest.mark.parametrize('grammar', ENUMERATED)
+def test_enumerate_words_matches_brute_force_derivation(grammar):
+    max_length = 8
+    words = list(grammar.enumerate_words(max_length))
+    assert words == sorted(set(words), key=lambda word: (len(word), word))
+    assert set(words) == derived_words(grammar, max_length)
+
+
+def test_enumerate_words_is_lazy_on_infinite_languages():
+    grammar = Grammar(['S', 'B', 'D'], ['a', 'b', 'c', 'd'], LAB1, 'S')
+    words = grammar.enumerate_words(10 ** 6)
+    first = [next(words) for _ in range(30)]
+    assert first == list(grammar.enumerate_words(len(first[-1])))[:30]
@@ -0,0 +1,24 @@
+from src import instrumentation
+from src.ChomskyNormalForm import Grammar
+
+
+def test_unit_closure_counts_worklist_pops():
+    # A reaches B twice (directly and through C), so its search pops B, C and B again
+    grammar = Grammar({'A', 'B', 'C'}, {'a', 'b'}, [('A', ('B',)), ('A', ('C',)), ('C', ('B',)),
+                                                    ('B', ('b',)), ('C', ('a',))], 'A')
+    with instrumentation.profile() as metrics:
+        grammar.eliminate_renaming()
+    # A: B, C, B; C: B
+    assert metrics.counters['cnf.unit_closure.iterations'] == 4
+    assert not instrumentation.enabled
+
+
+def test_fixpoint_counters_and_disabled_hooks():
+    grammar = Grammar({'S', 'A'}, {'a'}, [('S', ('A', 'A')), ('A', ('a',)), ('A', ('ε',))], 'S')
+    with instrumentation.profile() as metrics:
+        grammar.to_cnf()
+    assert metrics.counters['cnf.nullable.iterations'] == 2
+    assert 'cnf.eliminate_epsilon' in metrics.timers
+    before = dict(instrumentation.metrics().counters)
+    Grammar({'S'}, {'a'}, [('S', ('a',))], 'S').to_cnf()
+    assert instrumentation.metrics().counters == before
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from src.lexer import TokenType, iter_tokens, sql_lexer, sql_lexer_reference
+
+FRAGMENTS = [
+    'SELECT', 'select', 'FrOm', 'WHERE', 'AND', 'or', 'LIKE', 'INSERT', 'SELECTED', 'fromage', 'and_x',
+    'price', '_id', 'col9', 'é', 'naïve', '日本',
+    '12', '3.5', '12abc', '3.5x', '1.', '.5', '007', '١٢٣', '²',
+    "'red'", "'it''s'", '"quoted"', "'", '"', "'unterminated", '"open', "''",
+    '--', '-- comment', '--x\n', '-', '->',
+    '=', '!=', '<>', '<=', '>=', '<', '>', '+', '*', '/', '!',
+    '(', ')', ',', ';', '#', '@', '$', '\\',
+    ' ', '  ', '\t', '\n', '\r\n', '\u00a0', '\u2003',
+]
+
+
+def random_query(rng):
+    parts = []
+    for _ in range(rng.randint(1, 30)):
+        parts.append(rng.choice(FRAGMENTS))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(' \n\t'))
+    return ''.join(parts)
+
+
+CORPUS = [random_query(random.Random(seed)) for seed in range(2000)]
+
+
+def test_corpus_covers_tricky_inputs():
+    tokens = [token for query in CORPUS for token in sql_lexer(query)]
+    types = {token_type for token_type, _ in tokens}
+    # '--' lexes as two OPERATOR tokens: the operator alternative is tried before COMMENT
+    assert {TokenType.KEYWORD, TokenType.IDENTIFIER, TokenType.NUMBER, TokenType.STRING,
+            TokenType.OPERATOR, TokenType.UNKNOWN} <= types
+
+
+def test_single_pass_lexer_matches_reference():
+    for query in CORPUS:
+        assert sql_lexer(query) == sql_lexer_reference(query), query
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8])
+def test_iter_tokens_matches_for_small_chunks(chunk_size):
+    for query in CORPUS:
+        assert list(iter_tokens(query, chunk_size=chunk_size)) == sql_lexer(query), query
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 8])
+def test_iter_tokens_on_utf8_bytes(chunk_size):
+    for query in CORPUS[:500]:
+        assert list(iter_tokens(query.encode('utf-8'), chunk_size=chunk_size)) == sql_lexer(query), query
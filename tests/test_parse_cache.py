@@ -0,0 +1,64 @@
+import pytest
+
+from benchmarks.workloads import sql_queries
+from src.lexer import sql_lexer
+from src.parse_cache import ParseCache, cached_sql_parser, fingerprint
+from src.parser import sql_parser
+from test_lexer import CORPUS
+
+
+def outcome(parse, query):
+    # the parser also fails with other errors on truncated input (e.g. "SELECT")
+    try:
+        return parse(query)
+    except Exception as error:
+        return type(error), str(error)
+
+
+def test_matches_sql_parser():
+    queries = sql_queries(300) + CORPUS
+    for query in queries + queries:  # the second round is served from the cache
+        assert outcome(cached_sql_parser, query) == outcome(sql_parser, query), query
+
+
+def test_queries_differing_in_literals_share_an_entry():
+    cache = ParseCache()
+    first = cache.parse("SELECT a FROM t WHERE a = 1 AND b = 'x'")
+    second = cache.parse("SELECT a FROM t WHERE a = 25 AND b = 'yz'")
+    assert second == sql_parser("SELECT a FROM t WHERE a = 25 AND b = 'yz'")
+    assert first == sql_parser("SELECT a FROM t WHERE a = 1 AND b = 'x'")
+    assert cache.cache_info() == (1, 1, 0, 1024, 1)
+    assert fingerprint(sql_lexer("SELECT a FROM t WHERE a = 1"))[1] == ['1']
+    # a different column or operator is a different shape
+    cache.parse("SELECT a FROM t WHERE b = 1 AND b = 'x'")
+    cache.parse("SELECT a FROM t WHERE a < 1 AND b = 'x'")
+    assert cache.cache_info().currsize == 3
+
+
+def test_lru_eviction_and_resize():
+    cache = ParseCache(maxsize=2)
+    a, b, c = "SELECT a FROM t", "SELECT b FROM t", "SELECT c FROM t"
+    cache.parse(a)
+    cache.parse(b)
+    cache.parse(a)  # a is now the most recently used
+    cache.parse(c)  # evicts b
+    assert cache.cache_info() == (1, 3, 1, 2, 2)
+    cache.parse(a)
+    cache.parse(b)
+    assert cache.cache_info() == (2, 4, 2, 2, 2)
+    cache.resize(1)
+    assert cache.cache_info() == (2, 4, 3, 1, 1)
+    cache.parse(b)
+    assert cache.cache_info().hits == 3
+    cache.resize(0)
+    cache.parse(b)
+    assert cache.cache_info() == (3, 5, 4, 0, 0)
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 0, 0, 0)
+
+
+def test_syntax_errors_are_not_cached():
+    cache = ParseCache()
+    with pytest.raises(SyntaxError):
+        cache.parse("SELECT FROM WHERE 1")
+    assert cache.cache_info().currsize == 0
@@ -0,0 +1,40 @@
+import pickle
+
+from src.ast import ASTNodeType
+from src.parser import parse_script, sql_parser
+
+DEPTH = 300
+
+
+def nested_condition(depth):
+    condition = "a = 1"
+    for level in range(depth):
+        operator = "AND" if level % 2 else "OR"
+        condition = f"(b = {level} {operator} {condition})"
+    return condition
+
+
+DEEP_QUERY = f"SELECT a FROM t WHERE {nested_condition(DEPTH)}"
+SCRIPT = f"SELECT a FROM t;\n{DEEP_QUERY};\nSELECT a nowhere;\nSELECT b FROM u;\n"
+
+
+def test_deep_ast_pickles_without_recursion():
+    ast = sql_parser(DEEP_QUERY)
+    assert max(depth for _, depth in ast.walk()) > DEPTH
+    assert pickle.loads(pickle.dumps(ast)) == ast
+
+
+def check_batch(results):
+    assert len(results) == 4
+    assert results[0] == sql_parser("SELECT a FROM t")
+    assert results[1] == sql_parser(DEEP_QUERY)
+    assert isinstance(results[2], SyntaxError)
+    assert results[3].node_type == ASTNodeType.SELECT_STATEMENT
+
+
+def test_parse_script_in_process():
+    check_batch(parse_script(SCRIPT))
+
+
+def test_parse_script_worker_pool_keeps_every_result():
+    check_batch(parse_script(SCRIPT, workers=2, chunksize=1))
@@ -0,0 +1,57 @@
+import csv
+import io
+
+from src.parser import sql_parser
+from src.predicate import filter_rows
+
+CSV = "id,price,name\n5,950,a\n6,100,b\n7,901.5,5\n"
+COLUMNS = ['id', 'price', 'name']
+
+
+def matching_ids(query, rows, columns=None):
+    return [row['id'] if columns is None else row[0] for row in filter_rows(sql_parser(query), rows, columns)]
+
+
+def test_csv_reader_cells_compare_with_numeric_literals():
+    rows = list(csv.reader(io.StringIO(CSV)))[1:]
+    assert matching_ids("SELECT id FROM t WHERE price >= 900", rows, COLUMNS) == ['5', '7']
+    assert matching_ids("SELECT id FROM t WHERE id = 5", rows, COLUMNS) == ['5']
+    assert matching_ids("SELECT id FROM t WHERE 6 = id", rows, COLUMNS) == ['6']
+    assert matching_ids("SELECT id FROM t WHERE name = '5'", rows, COLUMNS) == ['7']
+
+
+def test_dict_reader_rows():
+    rows = csv.DictReader(io.StringIO(CSV))
+    assert matching_ids("SELECT id FROM t WHERE price < 900 OR name LIKE 'a%'", rows) == ['5', '6']
+
+
+def test_typed_rows_are_unchanged():
+    rows = [(1, 950, 'x'), (2, 3, 'y')]
+    assert matching_ids("SELECT id FROM t WHERE price >= 900", rows, COLUMNS) == [1]
+
+
+def test_deeply_nested_condition_compiles():
+    condition = "a = 1"
+    for level in range(300):
+        condition = f"(b = {level % 5} {'AND' if level % 3 else 'OR'} {condition})"
+    ast = sql_parser(f"SELECT a FROM t WHERE {condition}")
+    rows = [{'a': a, 'b': b} for a in range(3) for b in range(6)]
+
+    def expected(row):
+        result = row['a'] == 1
+        for level in range(300):
+            term = row['b'] == level % 5
+            result = (term and result) if level % 3 else (term or result)
+        return result
+
+    assert [row for row in rows if expected(row)] == list(filter_rows(ast, rows))
+
+
+def test_only_number_spelled_cells_are_converted():
+    rows = [[cell] for cell in ['5', '-5', '5.5', '١٢', 'nan', 'inf', ' 5 ', '1_000', '5e3', '0x5', '']]
+    assert [row[0] for row in filter_rows(sql_parser("SELECT x FROM t WHERE x = 5"), rows, ['x'])] == ['5']
+    assert [row[0] for row in filter_rows(sql_parser("SELECT x FROM t WHERE x != 5"), rows, ['x'])] == \
+        ['-5', '5.5', '١٢', 'nan', 'inf', ' 5 ', '1_000', '5e3', '0x5', '']
+    numbers = [row[0] for row in rows[:4]]
+    assert [row[0] for row in filter_rows(sql_parser("SELECT x FROM t WHERE x < 100"), [[n] for n in numbers],
+                                          ['x'])] == ['5', '-5', '5.5', '١٢']
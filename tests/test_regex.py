@@ -0,0 +1,47 @@
+import itertools
+import random
+import re
+
+import pytest
+
+from src.regex import REPEAT_LIMIT, compile_pattern, generate_many, patterns, thompson_nfa
+
+PATTERNS = patterns + ['a(b|c)*a?', '(ab|a)*b+', '(a|b){2,3}c?', 'a{2,}b{0,1}', '((a|)b)*', r'a\(b\)', 'a|b|']
+
+
+def alphabet(pattern):
+    return sorted({char for char in pattern if char not in '()|?*+{},0123456789\\'} | {'x'}) + ['(']
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_match_agrees_with_re_fullmatch(pattern):
+    compiled = compile_pattern(pattern)
+    dfa = thompson_nfa(pattern).nfa_to_dfa(minimize=True)
+    symbols = alphabet(pattern)
+    length = 6 if len(symbols) <= 4 else 4
+    strings = [''.join(w) for n in range(length + 1) for w in itertools.product(symbols, repeat=n)]
+    expected = [re.fullmatch(pattern, string) is not None for string in strings]
+    assert compiled.match_many(strings) == expected
+    assert [dfa.word_belongs_to_language(string) for string in strings] == expected
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_generated_strings_match(pattern):
+    compiled = compile_pattern(pattern)
+    rng = random.Random(0)
+    generated = compiled.generate_many(200, rng) + [compiled.generate(rng) for _ in range(50)]
+    assert all(compiled.match(string) and re.fullmatch(pattern, string) for string in generated)
+    # '*' and '+' stop at REPEAT_LIMIT repetitions
+    if pattern == 'a{2,}b{0,1}':
+        assert max(map(len, generated)) <= 2 + REPEAT_LIMIT + 1
+
+
+def test_generate_many_is_seeded():
+    assert generate_many(patterns[0], 20, seed=1) == generate_many(patterns[0], 20, seed=1)
+    assert generate_many(patterns[0], 0) == []
+
+
+@pytest.mark.parametrize('pattern', ['(a', 'a)', '*a', 'a{2', 'a{3,1}', 'a{x}', 'a\\'])
+def test_invalid_patterns(pattern):
+    with pytest.raises(ValueError):
+        compile_pattern(pattern)
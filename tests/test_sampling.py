@@ -0,0 +1,85 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+from benchmarks.workloads import lab1_grammar, random_nfa
+from src.ChomskyNormalForm import Grammar
+from src.finite_automation import FiniteAutomaton
+from src.sampling import CNFSampler, DFASampler, write_samples
+from test_cnf import lab5_grammar
+from test_cyk import count_derivations
+
+
+def words(alphabet, n):
+    return [''.join(w) for w in itertools.product(sorted(alphabet), repeat=n)]
+
+
+DFAS = [FiniteAutomaton.grammar_to_DFA(lab1_grammar())] + [random_nfa(8, seed=seed).nfa_to_dfa() for seed in range(4)]
+
+
+@pytest.mark.parametrize('dfa', DFAS)
+def test_dfa_counts_and_samples(dfa):
+    sampler = dfa.sampler()
+    rng = sampler.rng(0)
+    for n in range(8):
+        language = [word for word in words(dfa.Alphabet, n) if dfa.word_belongs_to_language(word)]
+        assert sampler.count(n) == len(language)
+        if language:
+            assert all(dfa.word_belongs_to_language(word) for word in sampler.sample_many(n, 200, rng))
+        else:
+            with pytest.raises(ValueError):
+                sampler.sample(n, rng)
+
+
+def test_dfa_samples_are_uniform():
+    dfa = FiniteAutomaton.grammar_to_DFA(lab1_grammar())
+    sampler = dfa.sampler()
+    language = [word for word in words(dfa.Alphabet, 5) if dfa.word_belongs_to_language(word)]
+    counts = Counter(sampler.sample_many(5, 1000 * len(language), sampler.rng(1)))
+    assert set(counts) == set(language)
+    assert all(800 < count < 1200 for count in counts.values())
+
+
+def test_dfa_counts_switch_to_python_ints():
+    # every word over {a, b}: 2^n words, which overflows int64 at n = 63
+    dfa = FiniteAutomaton.from_definition(['q'], ['a', 'b'], 'q', {'q': {'a': 'q', 'b': 'q'}}, ['q'])
+    sampler = DFASampler(dfa)
+    assert sampler.count(60) == 2 ** 60 and sampler.exact_int64
+    assert sampler.count(200) == 2 ** 200 and not sampler.exact_int64
+    assert sampler.count(61) == 2 ** 61
+    samples = sampler.sample_many(200, 20, sampler.rng(0))
+    assert all(len(word) == 200 and set(word) <= {'a', 'b'} for word in samples)
+    assert len(set(samples)) == 20
+
+
+@pytest.mark.parametrize('make', [lab5_grammar,
+                                  lambda: Grammar({'S'}, {'a'}, [('S', ('S', 'S')), ('S', ('a',))], 'S')])
+def test_cnf_counts_and_samples(make):
+    grammar = make().to_cnf('bin_first')
+    sampler = grammar.sampler()
+    parser = grammar.cyk()
+    rng = sampler.rng(0)
+    for n in range(8):
+        assert sampler.count(n) == sum(count_derivations(grammar, word) for word in words(grammar.VT, n))
+        if sampler.count(n):
+            assert all(parser.recognize(word) for word in sampler.sample_many(n, 100, rng))
+    assert isinstance(sampler.count(300), int)
+
+
+def test_cnf_sampler_rejects_other_grammars():
+    with pytest.raises(ValueError):
+        CNFSampler(lab5_grammar())
+
+
+@pytest.mark.parametrize('count, chunk_size', [(0, 4), (1, 4), (10, 4), (12, 4), (1000, 65536)])
+def test_write_samples_writes_count_lines(tmp_path, count, chunk_size):
+    sampler = FiniteAutomaton.grammar_to_DFA(lab1_grammar()).sampler()
+    path = tmp_path / 'samples.txt'
+    assert write_samples(path, sampler, 6, count, seed=2, chunk_size=chunk_size) == count
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == count
+    assert all(len(line) == 6 for line in lines)
+    cnf = lab5_grammar().to_cnf()
+    assert write_samples(path, cnf.sampler(), 5, count, seed=2, chunk_size=chunk_size) == count
+    assert len(path.read_text(encoding='utf-8').splitlines()) == count
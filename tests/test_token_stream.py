@@ -0,0 +1,31 @@
+import random
+
+from src.lexer import sql_lexer
+from src.parser import Parser, sql_parser
+from src.token_stream import lex_spans
+
+FRAGMENTS = ['SELECT', 'FROM', 'WHERE', 'a', 'price', 'é', 'SELECTé', 'naïve', '日本', '12', '12x', '١٢٣',
+             "'é'", "'red'", "'open", '=', '<=', '(', ')', ',', ' ', ' ', '\n', '#']
+
+
+def test_bytes_spans_match_sql_lexer_on_non_ascii_input():
+    rng = random.Random(0)
+    for _ in range(1000):
+        query = ''.join(rng.choice(FRAGMENTS) + rng.choice(['', ' ']) for _ in range(rng.randint(1, 20)))
+        data = query.encode('utf-8')
+        stream = lex_spans(data)
+        assert list(stream) == sql_lexer(query) == list(lex_spans(query)), query
+        assert [bytes(stream.view(i)).decode('utf-8') for i in range(len(stream))] == \
+            [value for _, value in sql_lexer(query)]
+
+
+def test_parser_reads_non_ascii_byte_stream():
+    query = "SELECT name FROM t WHERE name = 'é' AND x = ١٢٣"
+    assert Parser(iter(lex_spans(query.encode('utf-8')))).parse() == sql_parser(query)
+
+
+def test_bytes_spans_match_sql_lexer_on_ascii_control_characters():
+    # str \s also matches the separators \x1c-\x1f, bytes \s does not
+    query = ''.join(map(chr, range(128)))
+    for text in (query, 'a\x1cb', 'SELECT\x1fa\x1dFROM\x1et', '\x0b\x0c12\x1c'):
+        assert list(lex_spans(text.encode('ascii'))) == sql_lexer(text) == list(lex_spans(text)), repr(text)